@@ -22,6 +22,9 @@ df = pd.read_csv(features_path)
 
 print("Preparing feature matrix...")
 X = df.drop(columns=["url", "label"], errors="ignore")
+# a model trained before the body features were added only knows its own columns
+if hasattr(model, "feature_names_in_"):
+    X = X[list(model.feature_names_in_)]
 
 print("Running predictions...")
 preds = model.predict(X)
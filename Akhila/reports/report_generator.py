@@ -1,77 +1,92 @@
 # reports/report_generator.py
 
 import os
-from collections import Counter
 from datetime import datetime
+from string import Template
 
+from reports.html_stream import HTMLStreamWriter
 
-def generate_report_html(target_url, vulnerabilities):
-    os.makedirs("reports/output", exist_ok=True)
-
-    severity_count = Counter(v["severity"] for v in vulnerabilities)
-
-    rows = ""
-    for v in vulnerabilities:
-        rows += f"""
-        <tr>
-            <td>{v["vulnerability"]}</td>
-            <td>{v["endpoint"]}</td>
-            <td class="{v["severity"]}">{v["severity"]}</td>
-            <td>{v["mitigation"]}</td>
-        </tr>
-        """
-
-    html = f"""
+REPORT_HEAD = Template("""
 <!DOCTYPE html>
 <html>
 <head>
     <title>WebScanPro Security Report</title>
     <style>
-        body {{ font-family: Arial; padding: 20px; }}
-        h1 {{ color: #333; }}
-        table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-        th, td {{ border: 1px solid #ccc; padding: 8px; text-align: left; }}
-        th {{ background: #f4f4f4; }}
-        .High {{ color: red; font-weight: bold; }}
-        .Medium {{ color: orange; font-weight: bold; }}
-        .Low {{ color: green; font-weight: bold; }}
+        body { font-family: Arial; padding: 20px; }
+        h1 { color: #333; }
+        table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+        th, td { border: 1px solid #ccc; padding: 8px; text-align: left; }
+        th { background: #f4f4f4; }
+        .High { color: red; font-weight: bold; }
+        .Medium { color: orange; font-weight: bold; }
+        .Low { color: green; font-weight: bold; }
     </style>
 </head>
 <body>
 
 <h1>WebScanPro – Vulnerability Scan Report</h1>
 
-<p><b>Target:</b> {target_url}</p>
-<p><b>Scan Date:</b> {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}</p>
+<p><b>Target:</b> $target_url</p>
+<p><b>Scan Date:</b> $scan_date</p>
+
+<h2>Detailed Findings</h2>
+
+""")
 
+# written after the findings: the counts come from the same pass as the rows
+REPORT_SUMMARY = Template("""
 <h2>Summary</h2>
 <ul>
-    <li>Total vulnerabilities: {len(vulnerabilities)}</li>
-    <li>High: {severity_count.get("High", 0)}</li>
-    <li>Medium: {severity_count.get("Medium", 0)}</li>
-    <li>Low: {severity_count.get("Low", 0)}</li>
+    <li>Total vulnerabilities: $total</li>
+    <li>High: $high</li>
+    <li>Medium: $medium</li>
+    <li>Low: $low</li>
 </ul>
+""")
 
-<h2>Detailed Findings</h2>
-
-<table>
+TABLE_HEADER = """
 <tr>
     <th>Vulnerability</th>
     <th>Affected Endpoint</th>
     <th>Severity</th>
     <th>Suggested Mitigation</th>
 </tr>
+"""
 
-{rows}
+REPORT_ROW = Template("""
+        <tr>
+            <td>$vulnerability</td>
+            <td>$endpoint</td>
+            <td class="$severity">$severity</td>
+            <td>$mitigation</td>
+        </tr>
+""")
 
-</table>
+REPORT_FOOT = """
 
 </body>
 </html>
 """
 
-    output_path = "reports/output/webscanpro_report.html"
-    with open(output_path, "w", encoding="utf-8") as f:
-        f.write(html)
+
+def generate_report_html(target_url, vulnerabilities, compress=False):
+    """`vulnerabilities` may be any iterable of findings, e.g. a generator; it is read once."""
+    os.makedirs("reports/output", exist_ok=True)
+
+    output_path = "reports/output/webscanpro_report.html" + (".gz" if compress else "")
+    with HTMLStreamWriter(output_path, compress=compress) as out:
+        out.write(REPORT_HEAD, {
+            "target_url": target_url,
+            "scan_date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        })
+        severity_count = out.table(TABLE_HEADER, REPORT_ROW, vulnerabilities, page_size=500,
+                                   tally=lambda v: v["severity"])
+        out.write(REPORT_SUMMARY, {
+            "total": sum(severity_count.values()),
+            "high": severity_count.get("High", 0),
+            "medium": severity_count.get("Medium", 0),
+            "low": severity_count.get("Low", 0)
+        })
+        out.raw(REPORT_FOOT)
 
     return output_path
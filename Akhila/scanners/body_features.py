@@ -0,0 +1,115 @@
+# body_features.py
+import numpy as np
+from urllib.parse import urlparse, parse_qsl
+
+# feature name -> value for records crawled before these were collected
+BODY_FEATURES = {
+    "body_entropy": 0.0,
+    "tag_density": 0.0,
+    "script_density": 0.0,
+    "num_scripts": 0,
+    "reflected_params": 0,
+    "has_csp": 0,
+    "has_hsts": 0,
+    "has_xfo": 0,
+    "has_xcto": 0,
+    "sets_cookie": 0,
+}
+
+SECURITY_HEADERS = {
+    "has_csp": "content-security-policy",
+    "has_hsts": "strict-transport-security",
+    "has_xfo": "x-frame-options",
+    "has_xcto": "x-content-type-options",
+    "sets_cookie": "set-cookie",
+}
+
+MIN_REFLECTED_LEN = 3
+# bincount casts its input to intp, so bodies are counted this many bytes at a time
+HIST_BLOCK = 1 << 20
+
+
+def byte_entropy(data):
+    """Shannon entropy (bits per byte) from a single bincount over the raw bytes."""
+    if not data:
+        return 0.0
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8), minlength=256)
+    p = counts[counts > 0] / len(data)
+    return float(-(p * np.log2(p)).sum())
+
+
+def reflected_params(url, body):
+    """Number of query parameter values that appear verbatim in the response body."""
+    values = {v for _, v in parse_qsl(urlparse(url).query) if len(v) >= MIN_REFLECTED_LEN}
+    return sum(1 for v in values if v.encode("utf-8", "ignore") in body)
+
+
+def compute_batch(pages):
+    """
+    pages: list of (url, body bytes, headers dict). Returns one feature dict per page.
+    Each body is histogrammed with bincount over a uint8 view of its bytes,
+    HIST_BLOCK bytes at a time, so temporary memory does not grow with body or
+    batch size; entropy and tag density are then computed for the whole batch
+    on the (n, 256) histogram matrix.
+    """
+    n = len(pages)
+    if n == 0:
+        return []
+
+    bodies = [body or b"" for _, body, _ in pages]
+    lengths = np.fromiter((len(b) for b in bodies), dtype=np.int64, count=n)
+
+    # (n, 256) byte histogram -> entropy per page
+    hist = np.zeros((n, 256), dtype=np.int64)
+    for i, body in enumerate(bodies):
+        view = np.frombuffer(body, dtype=np.uint8)
+        for start in range(0, len(view), HIST_BLOCK):
+            hist[i] += np.bincount(view[start:start + HIST_BLOCK], minlength=256)
+    safe_len = np.maximum(lengths, 1)[:, None]
+    p = hist / safe_len
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = np.where(hist > 0, -p * np.log2(p), 0.0).sum(axis=1)
+
+    # '<' per byte approximates tag density
+    tags = hist[:, ord("<")]
+    scripts = np.fromiter((b.lower().count(b"<script") for b in bodies), dtype=np.int64, count=n)
+
+    results = []
+    for i, (url, _, headers) in enumerate(pages):
+        names = {k.lower() for k in (headers or {})}
+        row = {
+            "body_entropy": round(float(entropy[i]), 4),
+            "tag_density": round(float(tags[i] / safe_len[i, 0]), 6),
+            "script_density": round(float(scripts[i] / safe_len[i, 0]), 6),
+            "num_scripts": int(scripts[i]),
+            "reflected_params": reflected_params(url, bodies[i]),
+        }
+        for feature, header in SECURITY_HEADERS.items():
+            row[feature] = int(header in names)
+        results.append(row)
+    return results
+
+
+class BodyFeatureBatcher:
+    """
+    Collects crawled pages and computes their body features batch_size at a time.
+    add() and flush() return the records that are ready, each with its body features
+    merged in; the raw bodies are dropped once the batch is done.
+    """
+
+    def __init__(self, batch_size=32):
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, record, body):
+        self.pending.append((record, body))
+        if len(self.pending) >= self.batch_size:
+            return self.flush()
+        return []
+
+    def flush(self):
+        batch, self.pending = self.pending, []
+        features = compute_batch([(r["url"], body, r.get("headers")) for r, body in batch])
+        for (record, _), feats in zip(batch, features):
+            record.update(feats)
+        return [record for record, _ in batch]
@@ -9,6 +9,10 @@ import queue
 import re
 import os
 from urllib import robotparser as rp  
+try:
+    from scanners.body_features import BodyFeatureBatcher
+except ImportError:
+    from body_features import BodyFeatureBatcher
 
 START_URL = os.getenv("START_URL", "https://owasp.org/www-project-juice-shop/")
 MAX_PAGES = int(os.getenv("MAX_PAGES", "500"))
@@ -19,6 +23,9 @@ visited = set()
 q = queue.Queue()
 q.put(START_URL)
 lock = threading.Lock()
+# body features are computed over raw bytes a batch of pages at a time
+body_batcher = BodyFeatureBatcher(int(os.getenv("BODY_FEATURE_BATCH", "32")))
+write_lock = threading.Lock()
 
 session = requests.Session()
 session.headers.update({"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"})
@@ -67,6 +74,13 @@ def normalize_url(u, base):
     # remove fragment
     return parsed._replace(fragment="").geturl()
 
+def write_records(records):
+    if not records:
+        return
+    with open(OUTPUT_FILE, "a", encoding="utf-8") as fh:
+        for record in records:
+            fh.write(json.dumps(record) + "\n")
+
 def crawl_worker():
     while True:
         try:
@@ -118,9 +132,9 @@ def crawl_worker():
             record["num_textareas"] = sum(1 for _ in soup.find_all("textarea"))
             record["contains_js"] = bool(soup.find("script"))
 
-        # write record to output
-        with open(OUTPUT_FILE, "a", encoding="utf-8") as fh:
-            fh.write(json.dumps(record) + "\n")
+        # queue the page for body features; a full batch is written to output
+        with write_lock:
+            write_records(body_batcher.add(record, resp.content))
 
         q.task_done()
 
@@ -134,6 +148,8 @@ def main():
     q.join()
     for t in threads:
         t.join()
+    with write_lock:
+        write_records(body_batcher.flush())
 
 if __name__ == "__main__":
     main()
@@ -1,44 +1,177 @@
 # features.py
+import argparse
 import json
-import math
+import os
 import numpy as np
 import pandas as pd
-from collections import Counter
 from urllib.parse import urlparse, parse_qs
+try:
+    from scanners.body_features import BODY_FEATURES, byte_entropy
+except ImportError:
+    from body_features import BODY_FEATURES, byte_entropy
 
 INPUT = "data/collected_endpoints.jsonl"
 OUT_CSV = "data/features.csv"
+CHUNK_SIZE = 50000
+
+# column -> dtype, in output order. A missing/None status_code is written as
+# 0 (int); the old DataFrame.fillna(0) path turned the whole column into
+# float64 (200.0) whenever one record lacked it. train_rf.py and predict.py
+# hand the values to sklearn, which casts to float either way.
+FEATURE_COLUMNS = {
+    "url": object,
+    "status_code": np.int32,
+    "content_length": np.int64,
+    "num_links": np.int32,
+    "num_forms": np.int32,
+    "num_inputs": np.int32,
+    "contains_js": np.int8,
+    "num_query_params": np.int32,
+    "avg_param_name_len": np.float64,
+    "server_header_len": np.int32,
+}
+# computed by the crawler (see body_features.py); 0 for older crawl files
+FEATURE_COLUMNS.update(
+    (name, np.float64 if isinstance(default, float) else np.int32)
+    for name, default in BODY_FEATURES.items()
+)
+
 
 def entropy(s):
-    if not s:
-        return 0.0
-    probs = [float(s.count(c))/len(s) for c in set(s)]
-    return -sum(p*math.log2(p) for p in probs)
-
-rows = []
-with open(INPUT, 'r', encoding='utf-8') as fh:
-    for line in fh:
-        r = json.loads(line)
-        parsed = urlparse(r["url"])
-        params = parse_qs(parsed.query)
-        row = {}
-        row["url"] = r["url"]
-        row["status_code"] = r.get("status_code",0)
-        row["content_length"] = r.get("content_length",0)
-        row["num_links"] = len(r.get("links",[]))
-        row["num_forms"] = len(r.get("forms",[]))
-        row["num_inputs"] = r.get("num_inputs",0)
-        row["contains_js"] = int(r.get("contains_js", False))
+    if isinstance(s, str):
+        s = s.encode("utf-8")
+    return byte_entropy(s)
+
+
+def record_features(r):
+    """One crawl record -> tuple of feature values in FEATURE_COLUMNS order."""
+    params = parse_qs(urlparse(r["url"]).query)
+    # heuristic: presence of suspicious server header
+    server = (r.get("headers") or {}).get("server", "").lower()
+    return (
+        r["url"],
+        r.get("status_code") or 0,
+        r.get("content_length") or 0,
+        len(r.get("links") or []),
+        len(r.get("forms") or []),
+        r.get("num_inputs") or 0,
+        int(bool(r.get("contains_js", False))),
         # features about query params
-        row["num_query_params"] = len(params)
-        row["avg_param_name_len"] = (sum(len(k) for k in params.keys())/max(1,len(params)))
-        # entropy of response body not collected here, but could be:
-        # row["body_entropy"] = entropy(r.get("body",""))
-        # heuristic: presence of suspicious server header
-        server = r.get("headers",{}).get("server","").lower()
-        row["server_header_len"] = len(server)
-        rows.append(row)
-
-df = pd.DataFrame(rows).fillna(0)
-df.to_csv(OUT_CSV, index=False)
-print("Wrote features to", OUT_CSV)
+        len(params),
+        sum(len(k) for k in params.keys()) / max(1, len(params)),
+        len(server),
+    ) + tuple(r.get(name, default) for name, default in BODY_FEATURES.items())
+
+
+def iter_records(path):
+    with open(path, "r", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_chunks(records, chunk_size=CHUNK_SIZE):
+    """
+    Yields dicts of column -> numpy array with at most chunk_size rows each.
+    The arrays are allocated once per chunk with their final dtype, so memory
+    is bounded by chunk_size no matter how large the input is.
+    """
+    names = list(FEATURE_COLUMNS)
+    records = iter(records)
+    while True:
+        columns = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in FEATURE_COLUMNS.items()}
+        n = 0
+        for r in records:
+            for name, value in zip(names, record_features(r)):
+                columns[name][n] = value
+            n += 1
+            if n == chunk_size:
+                break
+        if n == 0:
+            return
+        yield {name: col[:n] for name, col in columns.items()}
+        if n < chunk_size:
+            return
+
+
+def write_csv(chunks, out_path):
+    """Appends every chunk to one CSV file; the header is written once."""
+    rows = 0
+    with open(out_path, "w", encoding="utf-8", newline="") as fh:
+        for i, chunk in enumerate(chunks):
+            pd.DataFrame(chunk).to_csv(fh, index=False, header=(i == 0))
+            rows += len(chunk["url"])
+        if rows == 0:
+            fh.write(",".join(FEATURE_COLUMNS) + "\n")
+    return rows
+
+
+def write_csv_partitions(chunks, out_dir):
+    """One part-NNNNN.csv per chunk inside out_dir."""
+    os.makedirs(out_dir, exist_ok=True)
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        pd.DataFrame(chunk).to_csv(os.path.join(out_dir, f"part-{i:05d}.csv"), index=False)
+        rows += len(chunk["url"])
+    return rows
+
+
+def write_parquet(chunks, out_path):
+    """One row group per chunk, written as soon as the chunk is built (needs pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("Parquet output needs pyarrow: pip install pyarrow")
+
+    schema = pa.schema([
+        (name, pa.string() if dtype is object else pa.from_numpy_dtype(dtype))
+        for name, dtype in FEATURE_COLUMNS.items()
+    ])
+    rows = 0
+    with pq.ParquetWriter(out_path, schema) as writer:
+        for chunk in chunks:
+            writer.write_table(pa.Table.from_pydict(chunk, schema=schema))
+            rows += len(chunk["url"])
+    return rows
+
+
+def extract(input_path=INPUT, output_path=OUT_CSV, fmt=None, chunk_size=CHUNK_SIZE):
+    """
+    Streams input_path (JSONL) into output_path and returns the number of rows.
+    fmt: "csv", "parquet" or "csv-parts" (a directory of partitioned CSVs);
+    guessed from output_path when not given.
+    """
+    if fmt is None:
+        if output_path.endswith(".parquet"):
+            fmt = "parquet"
+        elif output_path.endswith(".csv"):
+            fmt = "csv"
+        else:
+            fmt = "csv-parts"
+
+    chunks = iter_chunks(iter_records(input_path), chunk_size)
+    if fmt == "parquet":
+        return write_parquet(chunks, output_path)
+    if fmt == "csv-parts":
+        return write_csv_partitions(chunks, output_path)
+    if fmt == "csv":
+        return write_csv(chunks, output_path)
+    raise ValueError(f"Unknown output format: {fmt}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract ML features from crawled endpoints")
+    parser.add_argument("input", nargs="?", default=INPUT, help="collected_endpoints.jsonl")
+    parser.add_argument("output", nargs="?", default=OUT_CSV,
+                        help=".csv, .parquet or a directory for partitioned CSV")
+    parser.add_argument("--format", choices=["csv", "parquet", "csv-parts"], default=None)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    rows = extract(args.input, args.output, args.format, args.chunk_size)
+    print(f"Wrote {rows} rows of features to", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# train_incremental.py
+"""
+Incremental alternative to train_rf.py: instead of refitting on all of
+data/features.csv, new labeled rows are consumed in chunks with partial_fit.
+
+- features are hashed (FeatureHasher), so columns added later, such as the
+  body features, need no retrain from scratch;
+- each chunk is scored before it is trained on and the last WINDOW rows form
+  a rolling validation window;
+- model, window and the number of rows consumed are checkpointed after every
+  chunk, so the next run (or --follow) only reads rows appended since. The
+  checkpoint also keeps the size and a fingerprint of the consumed part of
+  the CSV: features.py and label_data.py rewrite it on every run, and a
+  rewritten file is consumed again from the start.
+"""
+import argparse
+import hashlib
+import os
+import time
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import roc_auc_score
+
+FEATURES_CSV = "data/features.csv"
+CHECKPOINT = "models/rf_webscanpro_online.joblib"
+CHUNK_SIZE = 5000
+WINDOW = 20000
+DROP_COLUMNS = ["url", "label"]
+FINGERPRINT_BYTES = 1 << 16
+
+hasher = FeatureHasher(n_features=2 ** 10, input_type="dict", alternate_sign=False)
+
+
+def hashed(df):
+    X = df.drop(columns=DROP_COLUMNS, errors="ignore").apply(pd.to_numeric, errors="coerce").fillna(0)
+    # signed log keeps content_length and friends on the same scale as the flags
+    X = np.sign(X) * np.log1p(X.abs())
+    return hasher.transform(X.to_dict("records"))
+
+
+def new_checkpoint():
+    return {
+        "model": SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42),
+        "classes": None,
+        "rows": 0,
+        "offset": None,  # {"rows", "size", "fingerprint"} of the CSV consumed so far
+        "window": deque(maxlen=WINDOW),
+    }
+
+
+def load_checkpoint(path):
+    if os.path.exists(path):
+        return joblib.load(path)
+    return new_checkpoint()
+
+
+def save_checkpoint(state, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(state, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def window_metrics(state):
+    out = {"rows": state["rows"], "window": len(state["window"])}
+    if state["window"]:
+        proba, y = map(np.array, zip(*state["window"]))
+        out["accuracy"] = round(float(((proba >= 0.5) == y).mean()), 4)
+        if len(set(y.tolist())) == 2:
+            out["auc"] = round(float(roc_auc_score(y, proba)), 4)
+    return out
+
+
+def train_chunk(state, chunk):
+    if "label" not in chunk.columns:
+        raise SystemExit("Add a 'label' column to data/features.csv before training")
+    X = hashed(chunk)
+    y = chunk["label"].astype(int).to_numpy()
+    model = state["model"]
+    if state["classes"] is not None:
+        # test-then-train: the rolling window only holds rows the model had not seen
+        proba = model.predict_proba(X)[:, 1]
+        state["window"].extend(zip(proba.tolist(), y.tolist()))
+    else:
+        state["classes"] = np.array([0, 1])
+    model.partial_fit(X, y, classes=state["classes"])
+    state["rows"] += len(chunk)
+
+
+def csv_fingerprint(path, size):
+    """Hash of the first and last FINGERPRINT_BYTES of the file's first `size` bytes."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read(min(size, FINGERPRINT_BYTES)))
+        f.seek(max(size - FINGERPRINT_BYTES, 0))
+        h.update(f.read(min(size, FINGERPRINT_BYTES)))
+    return h.hexdigest()
+
+
+def csv_resume_offset(path, offset):
+    """Rows to skip: the consumed count if the consumed prefix is unchanged, else 0 (file was rewritten)."""
+    if not offset:
+        return 0
+    if os.path.getsize(path) < offset["size"] or csv_fingerprint(path, offset["size"]) != offset["fingerprint"]:
+        print(f"[csv] {path} was rewritten since the last run, consuming it from the start")
+        return 0
+    return offset["rows"]
+
+
+def consume(state, features_csv, checkpoint, chunk_size=CHUNK_SIZE):
+    if "offset" not in state:
+        # checkpoint from before fingerprints: trust its row count once
+        state["offset"] = {"rows": state["rows"], "size": 0, "fingerprint": csv_fingerprint(features_csv, 0)}
+    # the rows consumed below cover at least the first `size` bytes, so that prefix identifies them
+    size = os.path.getsize(features_csv)
+    skip = csv_resume_offset(features_csv, state["offset"])
+    offset = {"rows": skip, "size": size, "fingerprint": csv_fingerprint(features_csv, size)}
+
+    reader = pd.read_csv(features_csv, chunksize=chunk_size, skiprows=range(1, skip + 1))
+    for chunk in reader:
+        if chunk.empty:
+            continue
+        train_chunk(state, chunk)
+        offset["rows"] += len(chunk)
+        state["offset"] = dict(offset)
+        save_checkpoint(state, checkpoint)
+        print(f"+{len(chunk)} rows:", window_metrics(state))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental training on data/features.csv")
+    parser.add_argument("--features", default=FEATURES_CSV)
+    parser.add_argument("--checkpoint", default=CHECKPOINT)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--follow", action="store_true", help="keep polling for appended rows")
+    parser.add_argument("--interval", type=float, default=30.0)
+    args = parser.parse_args()
+
+    state = load_checkpoint(args.checkpoint)
+    while True:
+        consume(state, args.features, args.checkpoint, args.chunk_size)
+        if not args.follow:
+            break
+        time.sleep(args.interval)
+    print("Saved checkpoint to", args.checkpoint, window_metrics(state))
+
+
+if __name__ == "__main__":
+    main()
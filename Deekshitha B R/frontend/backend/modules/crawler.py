@@ -7,52 +7,91 @@ from urllib.parse import urljoin, urlparse
 logger = logging.getLogger(__name__)
 
 class WebCrawler:
-    def __init__(self, base_url: str):
+    """Breadth-first crawler: one shared aiohttp session and a fixed pool of
+    workers pulling (url, depth) from an asyncio.Queue. HTML parsing runs in
+    the default executor so the event loop keeps serving the API."""
+
+    def __init__(self, base_url: str, max_depth: int = 3, workers: int = 5, timeout: float = 10):
         self.base_url = base_url
+        self.max_depth = max_depth
+        self.workers = workers
+        self.timeout = timeout
         self.visited = set()
         self.pages = []
     
     async def crawl(self, max_pages: int = 20) -> List[Dict[str, Any]]:
         """Crawl website and discover pages, forms, and parameters"""
         try:
-            await self._crawl_page(self.base_url, max_pages)
+            await self._crawl(max_pages)
             return self.pages
         except Exception as e:
             logger.error(f"Crawling failed: {str(e)}")
             return self._generate_mock_pages()
     
-    async def _crawl_page(self, url: str, max_pages: int):
-        if len(self.pages) >= max_pages or url in self.visited:
-            return
-        
-        self.visited.add(url)
-        
+    async def _crawl(self, max_pages: int):
+        import aiohttp
+
+        queue: asyncio.Queue = asyncio.Queue()
+        self.visited.add(self.base_url)
+        queue.put_nowait((self.base_url, 0))
+
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            workers = [
+                asyncio.create_task(self._worker(session, queue, max_pages))
+                for _ in range(self.workers)
+            ]
+            try:
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+    
+    async def _worker(self, session, queue: asyncio.Queue, max_pages: int):
+        while True:
+            url, depth = await queue.get()
+            try:
+                if len(self.pages) < max_pages:
+                    await self._crawl_page(session, queue, url, depth, max_pages)
+            except Exception as e:
+                # a page that fails to parse must not take the worker down, or queue.join() never returns
+                logger.warning(f"Failed to process {url}: {str(e)}")
+            finally:
+                queue.task_done()
+    
+    async def _crawl_page(self, session, queue: asyncio.Queue, url: str, depth: int, max_pages: int):
         try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status != 200:
-                        return
-                    
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'html.parser')
-                    
-                    page_data = {
-                        'url': url,
-                        'forms': self._extract_forms(soup, url),
-                        'links': self._extract_links(soup, url),
-                        'inputs': self._extract_inputs(soup),
-                        'params': self._extract_url_params(url)
-                    }
-                    
-                    self.pages.append(page_data)
-                    
-                    for link in page_data['links'][:5]:
-                        if self._is_same_domain(link, self.base_url):
-                            await self._crawl_page(link, max_pages)
-        
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return
+                html = await response.text()
         except Exception as e:
             logger.warning(f"Failed to crawl {url}: {str(e)}")
+            return
+
+        loop = asyncio.get_running_loop()
+        page_data = await loop.run_in_executor(None, self._parse_page, url, html)
+        if len(self.pages) >= max_pages:
+            return
+        self.pages.append(page_data)
+
+        if depth >= self.max_depth or len(self.pages) >= max_pages:
+            return
+        for link in page_data['links']:
+            link = link.split('#')[0]
+            if link not in self.visited and self._is_same_domain(link, self.base_url):
+                self.visited.add(link)
+                queue.put_nowait((link, depth + 1))
+    
+    def _parse_page(self, url: str, html: str) -> Dict[str, Any]:
+        soup = BeautifulSoup(html, 'html.parser')
+        return {
+            'url': url,
+            'forms': self._extract_forms(soup, url),
+            'links': self._extract_links(soup, url),
+            'inputs': self._extract_inputs(soup),
+            'params': self._extract_url_params(url)
+        }
     
     def _extract_forms(self, soup: BeautifulSoup, base_url: str) -> List[Dict]:
         forms = []
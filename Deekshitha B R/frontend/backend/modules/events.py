@@ -0,0 +1,135 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_PHASES = ("completed", "failed", "cancelled")
+
+
+class _ScanChannel:
+    __slots__ = ("events", "next_id", "subscribers", "finished", "touched")
+
+    def __init__(self, max_events: int):
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self.next_id = 1
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.finished = False
+        self.touched = time.monotonic()
+
+
+class ScanEventBus:
+    """In-memory pub/sub of scan events, one bounded channel per scan.
+
+    Each channel keeps the last `max_events` events so a late subscriber gets a
+    replay before the live stream. A subscriber whose queue fills up is dropped;
+    it can reconnect with Last-Event-ID and resume from the replay buffer.
+
+    Only publish() creates channels. A channel without subscribers is evicted
+    once nothing was published to it for `retention` seconds, whether its scan
+    finished, crashed or never started; the sweep runs from publish() and
+    subscribe(), at most every `sweep_interval` seconds.
+    """
+
+    def __init__(self, max_events: int = 500, subscriber_buffer: int = 100, retention: float = 300,
+                 sweep_interval: float = 60):
+        self.max_events = max_events
+        self.subscriber_buffer = subscriber_buffer
+        self.retention = retention
+        self.sweep_interval = sweep_interval
+        self.channels: Dict[str, _ScanChannel] = {}
+        self._next_sweep = 0.0
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """Drops channels with no subscribers that were idle for `retention` seconds. Returns how many."""
+        now = time.monotonic() if now is None else now
+        self._next_sweep = now + self.sweep_interval
+        idle = [scan_id for scan_id, channel in self.channels.items()
+                if not channel.subscribers and now - channel.touched >= self.retention]
+        for scan_id in idle:
+            del self.channels[scan_id]
+        return len(idle)
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self.evict_idle(now)
+
+    def publish(self, scan_id: str, event_type: str, data: Dict[str, Any]) -> None:
+        self._sweep()
+        channel = self.channels.get(scan_id)
+        if channel is None:
+            channel = self.channels[scan_id] = _ScanChannel(self.max_events)
+        if channel.finished:
+            return
+
+        event = {"id": channel.next_id, "event": event_type, "data": data}
+        channel.next_id += 1
+        channel.touched = time.monotonic()
+        channel.events.append(event)
+
+        for queue in list(channel.subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # make room for the end-of-stream marker; the client resumes via Last-Event-ID
+                channel.subscribers.discard(queue)
+                queue.get_nowait()
+                queue.put_nowait(None)
+                logger.info(f"Dropped slow event subscriber for scan {scan_id}")
+
+        if event_type == "phase" and data.get("status") in TERMINAL_PHASES:
+            channel.finished = True
+            for queue in list(channel.subscribers):
+                if queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    def has(self, scan_id: str) -> bool:
+        return scan_id in self.channels
+
+    async def subscribe(self, scan_id: str, last_event_id: Optional[int] = None,
+                        keepalive: float = 15) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Replays buffered events after `last_event_id`, then yields live ones.
+
+        Yields None when nothing happened for `keepalive` seconds; ends once the
+        scan reached a terminal phase or the subscriber was dropped. Ends at once
+        for a scan with no channel (publish a snapshot first to open one).
+        """
+        self._sweep()
+        channel = self.channels.get(scan_id)
+        if channel is None:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.subscriber_buffer)
+        replay = [e for e in channel.events if last_event_id is None or e["id"] > last_event_id]
+        if not channel.finished:
+            channel.subscribers.add(queue)
+
+        try:
+            for event in replay:
+                yield event
+            if channel.finished:
+                return
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            channel.subscribers.discard(queue)
+            channel.touched = time.monotonic()
+
+
+def format_sse(event: Optional[Dict[str, Any]]) -> str:
+    if event is None:
+        return ": keepalive\n\n"
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
@@ -0,0 +1,75 @@
+import gzip
+import html
+from collections import Counter
+from itertools import chain, groupby, islice
+
+
+class Markup(str):
+    """Trusted HTML: inserted as is instead of being escaped."""
+
+
+def escape(value):
+    if isinstance(value, Markup):
+        return value
+    return html.escape("" if value is None else str(value), quote=True)
+
+
+class HTMLStreamWriter:
+    """Streams an HTML report to `path` (gzip if compress or .gz) or to an open text `fileobj`."""
+
+    def __init__(self, path=None, compress=None, fileobj=None):
+        self.path = path
+        self.compress = str(path).endswith(".gz") if compress is None else compress
+        self.fileobj = fileobj
+        self.f = None
+
+    def __enter__(self):
+        if self.fileobj is not None:
+            self.f = self.fileobj
+        else:
+            opener = gzip.open if self.compress else open
+            self.f = opener(self.path, "wt", encoding="utf-8")
+        return self
+
+    def __exit__(self, *exc):
+        if self.fileobj is None:
+            self.f.close()
+        self.f = None
+
+    def raw(self, text):
+        self.f.write(text)
+
+    def write(self, template, values=None):
+        """Substitutes `values` (a mapping) into a compiled Template; every value is escaped unless it is Markup."""
+        self.f.write(template.substitute({k: escape(v) for k, v in (values or {}).items()}))
+
+    def table(self, header, row_template, rows, row_values=None, page_size=None,
+              group_key=None, group_template=None, table_open="<table>", table_close="</table>\n",
+              tally=None):
+        """
+        Writes `rows` (any iterable; it is consumed once) one at a time.
+
+        Rows are split into pages of at most `page_size`, each wrapped in
+        table_open + the trusted `header` markup ... table_close. With
+        `group_key` the rows, which must arrive sorted by it, are cut into
+        sections introduced by `group_template` ($group). row_values(row)
+        gives a row's template fields (default: the row itself).
+
+        Returns a Counter of tally(row) over the rows written, so summary
+        figures come out of the same pass; without `tally` every row counts
+        under None.
+        """
+        counts = Counter()
+        groups = groupby(rows, key=group_key) if group_key else [(None, rows)]
+        for group, group_rows in groups:
+            if group_template is not None:
+                self.write(group_template, {"group": group})
+            group_rows = iter(group_rows)
+            for first in group_rows:
+                self.f.write(table_open)
+                self.f.write(header)
+                for row in chain([first], islice(group_rows, page_size - 1 if page_size else None)):
+                    counts[tally(row) if tally else None] += 1
+                    self.write(row_template, row_values(row) if row_values else row)
+                self.f.write(table_close)
+        return counts
@@ -0,0 +1,101 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse, parse_qs, urlunparse
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+
+
+def normalize_action(page_url: str, action: Optional[str]) -> str:
+    """Absolute action URL with lower-case host and no fragment, query values or trailing slash"""
+    parsed = urlparse(urljoin(page_url, action or page_url))
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = "&".join(sorted(parse_qs(parsed.query, keep_blank_values=True).keys()))
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, "", query, ""))
+
+
+class InjectionPoint:
+    """A form or URL parameter set, shared by every page that links to it"""
+
+    __slots__ = ("method", "action", "url", "params", "inputs", "pages", "status")
+
+    def __init__(self, method: str, action: str, url: str, inputs: Tuple[Tuple[str, str], ...]):
+        self.method = method
+        self.action = action
+        self.url = url
+        self.inputs = inputs
+        self.params = tuple(sorted({name for name, _ in inputs}))
+        self.pages = 1
+        self.status: Dict[str, str] = {}
+
+    @property
+    def key(self) -> Tuple[str, str, Tuple[str, ...]]:
+        return (self.method, self.action, self.params)
+
+
+class InjectionPointRegistry:
+    """Injection points keyed by (method, normalized action, parameter set).
+
+    Checks claim a point before testing it, so a form linked from many pages
+    is tested once per scan.
+    """
+
+    def __init__(self):
+        self.points: Dict[Tuple, InjectionPoint] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_pages(cls, pages: List[Dict]) -> "InjectionPointRegistry":
+        registry = cls()
+        for page in pages:
+            for form in page.get('forms', []):
+                registry.add_form(page['url'], form)
+        return registry
+
+    def add_form(self, page_url: str, form: Dict) -> Optional[InjectionPoint]:
+        inputs = tuple(
+            (inp['name'], inp.get('type', 'text'))
+            for inp in form.get('inputs', [])
+            if inp.get('name')
+        )
+        if not inputs:
+            return None
+
+        action = form.get('action') or page_url
+        point = InjectionPoint(
+            form.get('method', 'get').upper(),
+            normalize_action(page_url, action),
+            urljoin(page_url, action),
+            inputs
+        )
+        existing = self.points.get(point.key)
+        if existing:
+            existing.pages += 1
+            return existing
+        self.points[point.key] = point
+        return point
+
+    def get_form(self, page_url: str, form: Dict) -> Optional[InjectionPoint]:
+        inputs = {inp['name'] for inp in form.get('inputs', []) if inp.get('name')}
+        action = form.get('action') or page_url
+        key = (form.get('method', 'get').upper(), normalize_action(page_url, action), tuple(sorted(inputs)))
+        return self.points.get(key)
+
+    def claim(self, point: Optional[InjectionPoint], check: str) -> bool:
+        if point is None:
+            return False
+        with self._lock:
+            if point.status.get(check, PENDING) != PENDING:
+                return False
+            point.status[check] = RUNNING
+            return True
+
+    def mark_done(self, point: InjectionPoint, check: str):
+        with self._lock:
+            point.status[check] = DONE
+
+    def __len__(self) -> int:
+        return len(self.points)
@@ -0,0 +1,193 @@
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    host TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    request TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS jobs_host ON jobs (host, status);
+"""
+
+
+class JobQueue:
+    """Scan jobs in a local SQLite file, shared by the API process and the workers.
+
+    Every call opens its own connection, so one JobQueue can be used from any
+    thread or process. Claiming is done inside BEGIN IMMEDIATE so two workers
+    never take the same job.
+    """
+
+    def __init__(self, path: str, per_target_limit: int = 1, max_attempts: int = 3):
+        self.path = path
+        self.per_target_limit = per_target_limit
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def _row(self, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job['request'] = json.loads(job['request'])
+        job['state'] = json.loads(job['state'])
+        return job
+
+    def enqueue(self, job_id: str, request: Dict[str, Any], state: Dict[str, Any], priority: int = 0) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, host, priority, status, request, state, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, urlparse(request['target_url']).netloc.lower(), priority, QUEUED,
+                 json.dumps(request), json.dumps(state, default=str), now, now)
+            )
+
+    def claim(self, worker: str) -> Optional[Dict[str, Any]]:
+        """Highest-priority queued job whose target is below the per-target cap, marked running."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? AND host NOT IN ("
+                    "  SELECT host FROM jobs WHERE status = ? GROUP BY host HAVING COUNT(*) >= ?"
+                    ") ORDER BY priority DESC, created_at LIMIT 1",
+                    (QUEUED, RUNNING, self.per_target_limit)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, worker = ?, attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        (RUNNING, worker, time.time(), row['id'])
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job = self._row(row)
+        if job:
+            job['status'] = RUNNING
+            job['worker'] = worker
+            job['attempts'] += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            return self._row(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def update_state(self, job_id: str, state: Dict[str, Any], status: Optional[str] = None) -> None:
+        with self._connect() as conn:
+            if status:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, status = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(state, default=str), status, time.time(), job_id)
+                )
+            else:
+                conn.execute(
+                    "UPDATE jobs SET state = ?, updated_at = ? WHERE id = ?",
+                    (json.dumps(state, default=str), time.time(), job_id)
+                )
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancels a queued job at once; a running one is flagged for its worker. Returns the new status."""
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT status, state FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            if row['status'] == QUEUED:
+                state = json.loads(row['state'])
+                state['status'] = CANCELLED
+                conn.execute(
+                    "UPDATE jobs SET status = ?, state = ?, updated_at = ? WHERE id = ?",
+                    (CANCELLED, json.dumps(state, default=str), time.time(), job_id)
+                )
+                status = CANCELLED
+            elif row['status'] == RUNNING:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+                status = "cancelling"
+            else:
+                status = row['status']
+            conn.execute("COMMIT")
+            return status
+
+    def cancel_requested(self, job_id: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return bool(row and row['cancel_requested'])
+
+    def requeue(self, worker: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Puts running jobs back in the queue (all of them, or one dead worker's).
+
+        Jobs that already used up max_attempts are failed instead, so a scan
+        that keeps crashing its worker cannot loop forever. Returns the new
+        state of every job touched, keyed by id (its 'status' is queued,
+        failed or cancelled).
+        """
+        query = "SELECT id, attempts, cancel_requested, state FROM jobs WHERE status = ?"
+        args: List[Any] = [RUNNING]
+        if worker is not None:
+            query += " AND worker = ?"
+            args.append(worker)
+
+        changed = {}
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for row in conn.execute(query, args).fetchall():
+                state = json.loads(row['state'])
+                if row['cancel_requested']:
+                    state.update(status=CANCELLED)
+                    new_status = CANCELLED
+                elif row['attempts'] >= self.max_attempts:
+                    state.update(status=FAILED, error="Worker crashed too many times")
+                    new_status = FAILED
+                else:
+                    state.update(status=QUEUED, progress=0)
+                    new_status = QUEUED
+                changed[row['id']] = state
+                conn.execute(
+                    "UPDATE jobs SET status = ?, state = ?, worker = NULL, updated_at = ? WHERE id = ?",
+                    (new_status, json.dumps(state, default=str), time.time(), row['id'])
+                )
+            conn.execute("COMMIT")
+        return changed
+
+    def purge(self, older_than: float) -> int:
+        """Drops finished jobs last updated more than `older_than` seconds ago (Mongo keeps the results)."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM jobs WHERE status IN ({','.join('?' * len(FINISHED))}) AND updated_at < ?",
+                (*FINISHED, time.time() - older_than)
+            )
+            return cursor.rowcount
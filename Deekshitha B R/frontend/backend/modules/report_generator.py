@@ -1,114 +1,291 @@
+import asyncio
+import hashlib
+import io
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
+import multiprocessing
+import time
 from datetime import datetime
+from string import Template
+
+from modules.html_stream import HTMLStreamWriter, Markup
 
 logger = logging.getLogger(__name__)
 
-class ReportGenerator:
-    def __init__(self):
-        self.reports_dir = Path("/app/backend/reports")
-        self.reports_dir.mkdir(exist_ok=True)
+# cached reports older than this, or beyond this total size (oldest first), are deleted
+REPORT_CACHE_MAX_AGE = int(os.environ.get('REPORT_CACHE_MAX_AGE', str(7 * 24 * 3600)))
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+REPORT_HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <title>WebScanPro Security Report</title>
+    <style>$styles</style>
+</head>
+<body>
+    <div class="header">
+        <h1>WebScanPro Security Assessment Report</h1>
+        <p class="subtitle">Automated Vulnerability Scan Results</p>
+    </div>
     
-    async def generate_pdf(self, scan_data: Dict) -> str:
-        """Generate PDF report"""
+    <div class="scan-info">
+        <p><strong>Target:</strong> $target_url</p>
+        <p><strong>Scan Date:</strong> $scan_date</p>
+    </div>
+    
+    <div class="vulnerabilities">
+        <h2>Detailed Findings</h2>
+""")
+
+# written after the findings: the counts come from the same pass as the blocks
+REPORT_SUMMARY = Template("""
+    </div>
+    
+    <div class="executive-summary">
+        <h2>Executive Summary</h2>
+        <p><strong>Total Vulnerabilities:</strong> $total</p>
+        
+        <div class="severity-summary">
+            <div class="severity-box critical">
+                <div class="count">$critical</div>
+                <div class="label">Critical</div>
+            </div>
+            <div class="severity-box high">
+                <div class="count">$high</div>
+                <div class="label">High</div>
+            </div>
+            <div class="severity-box medium">
+                <div class="count">$medium</div>
+                <div class="label">Medium</div>
+            </div>
+            <div class="severity-box low">
+                <div class="count">$low</div>
+                <div class="label">Low</div>
+            </div>
+        </div>
+    </div>
+""")
+
+VULNERABILITY_BLOCK = Template("""
+        <div class="vulnerability $css_class">
+            <h3>$type</h3>
+            <p><strong>Endpoint:</strong> $endpoint</p>
+            <p><strong>Severity:</strong> <span class="badge $css_class">$severity</span></p>
+            <p><strong>Description:</strong> $description</p>
+            <p><strong>Evidence:</strong> $evidence</p>
+            <p><strong>Mitigation:</strong> $mitigation</p>
+        </div>
+""")
+
+REPORT_FOOT = """
+    <div class="footer">
+        <p>Generated by WebScanPro - Automated Security Scanner</p>
+        <p>This report is confidential and intended for authorized personnel only.</p>
+    </div>
+</body>
+</html>
+"""
+
+TEMPLATE_VERSION = "4"
+REPORT_FORMATS = ("pdf", "html")
+DEFAULT_REPORTS_DIR = Path("/app/backend/reports")
+
+
+def report_key(scan_data: Dict, fmt: str) -> str:
+    """Content address of a report: scan document + template version + format."""
+    payload = json.dumps(scan_data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{TEMPLATE_VERSION}\0{fmt}\0{payload}".encode()).hexdigest()[:32]
+
+
+def render_report(scan_data: Dict, fmt: str, path: str) -> str:
+    """Renders one report to `path`; runs in a worker process."""
+    generator = ReportGenerator(Path(path).parent)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    if fmt == "pdf":
+        from weasyprint import HTML, CSS
+
+        html_path = f"{tmp_path}.html"
+        generator.write_html(scan_data, HTMLStreamWriter(html_path))
         try:
-            from weasyprint import HTML, CSS
-            
-            html_content = await self.generate_html(scan_data)
-            
-            report_filename = f"report_{scan_data['id']}.pdf"
-            report_path = self.reports_dir / report_filename
-            
-            HTML(string=html_content).write_pdf(
-                report_path,
-                stylesheets=[CSS(string=self._get_pdf_styles())]
+            HTML(filename=html_path).write_pdf(
+                tmp_path,
+                stylesheets=[CSS(string=generator._get_pdf_styles())]
             )
-            
-            return str(report_path)
-        
+        finally:
+            os.remove(html_path)
+    else:
+        generator.write_html(scan_data, HTMLStreamWriter(tmp_path))
+
+    # readers only ever see a complete file
+    os.replace(tmp_path, path)
+    return path
+
+
+class ReportGenerator:
+    """Builds scan reports; files are cached under reports_dir by report_key().
+
+    Rendering runs in a shared process pool. Concurrent requests for the same
+    report wait on a single render instead of starting their own. The cache is
+    pruned after each render; see prune().
+    """
+
+    _executor: Optional[ProcessPoolExecutor] = None
+    _inflight: Dict[str, "asyncio.Future[str]"] = {}
+
+    def __init__(self, reports_dir: Optional[Path] = None,
+                 max_age: Optional[int] = None, max_bytes: Optional[int] = None):
+        self.reports_dir = Path(reports_dir or DEFAULT_REPORTS_DIR)
+        self.reports_dir.mkdir(exist_ok=True)
+        self.max_age = REPORT_CACHE_MAX_AGE if max_age is None else max_age
+        self.max_bytes = REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+
+    @classmethod
+    def executor(cls) -> ProcessPoolExecutor:
+        if cls._executor is None:
+            # spawn, like the scan WorkerPool: forking the threaded API server can deadlock
+            cls._executor = ProcessPoolExecutor(
+                max_workers=int(os.environ.get('REPORT_WORKERS', '2')),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return cls._executor
+
+    @classmethod
+    def shutdown(cls) -> None:
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False, cancel_futures=True)
+            cls._executor = None
+
+    def report_path(self, scan_data: Dict, fmt: str) -> Path:
+        return self.reports_dir / f"report_{scan_data['id']}_{report_key(scan_data, fmt)}.{fmt}"
+
+    async def render(self, scan_data: Dict, fmt: str) -> str:
+        """Path of the cached report, rendering it first if needed."""
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format: {fmt}")
+
+        path = self.report_path(scan_data, fmt)
+        if path.exists():
+            try:
+                # mtime doubles as last use, so prune() evicts least recently used first
+                os.utime(path)
+                return str(path)
+            except FileNotFoundError:
+                pass  # pruned in between; render it again
+
+        key = path.name
+        future = self._inflight.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor(), render_report, scan_data, fmt, str(path))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        try:
+            # shield: one caller disconnecting must not cancel the shared render
+            result = await asyncio.shield(future)
         except Exception as e:
-            logger.error(f"PDF generation failed: {str(e)}")
+            logger.error(f"{fmt.upper()} generation failed: {str(e)}")
             raise
+        await asyncio.to_thread(self.prune, keep={path})
+        return result
+
+    def prune(self, now: Optional[float] = None, keep=()) -> int:
+        """Deletes cached reports past max_age, then the least recently used ones
+        until the cache fits in max_bytes. Paths in `keep` and renders still in
+        flight are left alone. Returns the number of files removed."""
+        now = time.time() if now is None else now
+        protected = {Path(p) for p in keep} | {self.reports_dir / key for key in self._inflight}
+        entries = []
+        for path in self.reports_dir.glob("report_*"):
+            if path.suffix.lstrip(".") not in REPORT_FORMATS or path in protected:
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        kept = sum(p.stat().st_size for p in protected if p.exists())
+        removed = 0
+        for mtime, size, path in entries:
+            if now - mtime < self.max_age and total + kept <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        if removed:
+            logger.info(f"Pruned {removed} cached report(s) from {self.reports_dir}")
+        return removed
+
+    async def generate_pdf(self, scan_data: Dict) -> str:
+        """Generate PDF report"""
+        return await self.render(scan_data, "pdf")
+
+    async def generate_html_file(self, scan_data: Dict) -> str:
+        """Generate HTML report file"""
+        return await self.render(scan_data, "html")
     
     async def generate_html(self, scan_data: Dict) -> str:
         """Generate HTML report"""
-        vulnerabilities = scan_data.get('vulnerabilities', [])
-        
-        severity_counts = {
-            'Critical': sum(1 for v in vulnerabilities if v.get('severity') == 'Critical'),
-            'High': sum(1 for v in vulnerabilities if v.get('severity') == 'High'),
-            'Medium': sum(1 for v in vulnerabilities if v.get('severity') == 'Medium'),
-            'Low': sum(1 for v in vulnerabilities if v.get('severity') == 'Low')
+        return self.build_html(scan_data)
+    
+    def build_html(self, scan_data: Dict) -> str:
+        buffer = io.StringIO()
+        self.write_html(scan_data, HTMLStreamWriter(fileobj=buffer))
+        return buffer.getvalue()
+    
+    def write_html(self, scan_data: Dict, writer: HTMLStreamWriter) -> None:
+        """Streams the report through `writer`; scan_data['vulnerabilities'] may be any iterable and is read once."""
+        with writer as out:
+            out.write(REPORT_HEAD, {
+                'styles': Markup(self._get_html_styles()),
+                'target_url': scan_data.get('target_url', 'N/A'),
+                'scan_date': self._scan_date(scan_data)
+            })
+            severity_counts = out.table(
+                "", VULNERABILITY_BLOCK, scan_data.get('vulnerabilities', []), self._vulnerability_fields,
+                table_open="", table_close="", tally=lambda v: v.get('severity')
+            )
+            if not severity_counts:
+                out.raw("<p>No vulnerabilities detected.</p>")
+            out.write(REPORT_SUMMARY, {
+                'total': sum(severity_counts.values()),
+                'critical': severity_counts['Critical'],
+                'high': severity_counts['High'],
+                'medium': severity_counts['Medium'],
+                'low': severity_counts['Low']
+            })
+            out.raw(REPORT_FOOT)
+    
+    def _vulnerability_fields(self, vuln: Dict) -> Dict[str, Any]:
+        severity = vuln.get('severity', 'Low')
+        return {
+            'css_class': severity.lower(),
+            'type': vuln.get('type', 'Unknown'),
+            'endpoint': vuln.get('endpoint', 'N/A'),
+            'severity': severity,
+            'description': vuln.get('description', 'No description'),
+            'evidence': vuln.get('evidence', 'No evidence'),
+            'mitigation': vuln.get('mitigation', 'No mitigation')
         }
-        
-        vuln_html = ""
-        for vuln in vulnerabilities:
-            vuln_html += f"""
-            <div class="vulnerability {vuln.get('severity', 'Low').lower()}">
-                <h3>{vuln.get('type', 'Unknown')}</h3>
-                <p><strong>Endpoint:</strong> {vuln.get('endpoint', 'N/A')}</p>
-                <p><strong>Severity:</strong> <span class="badge {vuln.get('severity', 'Low').lower()}">{vuln.get('severity', 'Low')}</span></p>
-                <p><strong>Description:</strong> {vuln.get('description', 'No description')}</p>
-                <p><strong>Evidence:</strong> {vuln.get('evidence', 'No evidence')}</p>
-                <p><strong>Mitigation:</strong> {vuln.get('mitigation', 'No mitigation')}</p>
-            </div>
-            """
-        
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>WebScanPro Security Report</title>
-            <style>{self._get_html_styles()}</style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>WebScanPro Security Assessment Report</h1>
-                <p class="subtitle">Automated Vulnerability Scan Results</p>
-            </div>
-            
-            <div class="executive-summary">
-                <h2>Executive Summary</h2>
-                <p><strong>Target:</strong> {scan_data.get('target_url', 'N/A')}</p>
-                <p><strong>Scan Date:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-                <p><strong>Total Vulnerabilities:</strong> {len(vulnerabilities)}</p>
-                
-                <div class="severity-summary">
-                    <div class="severity-box critical">
-                        <div class="count">{severity_counts['Critical']}</div>
-                        <div class="label">Critical</div>
-                    </div>
-                    <div class="severity-box high">
-                        <div class="count">{severity_counts['High']}</div>
-                        <div class="label">High</div>
-                    </div>
-                    <div class="severity-box medium">
-                        <div class="count">{severity_counts['Medium']}</div>
-                        <div class="label">Medium</div>
-                    </div>
-                    <div class="severity-box low">
-                        <div class="count">{severity_counts['Low']}</div>
-                        <div class="label">Low</div>
-                    </div>
-                </div>
-            </div>
-            
-            <div class="vulnerabilities">
-                <h2>Detailed Findings</h2>
-                {vuln_html if vuln_html else '<p>No vulnerabilities detected.</p>'}
-            </div>
-            
-            <div class="footer">
-                <p>Generated by WebScanPro - Automated Security Scanner</p>
-                <p>This report is confidential and intended for authorized personnel only.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        return html
+    
+    def _scan_date(self, scan_data: Dict) -> str:
+        # the scan's own timestamp keeps the output a pure function of the scan document
+        timestamp = scan_data.get('timestamp')
+        try:
+            return datetime.fromisoformat(str(timestamp)).strftime('%Y-%m-%d %H:%M:%S')
+        except ValueError:
+            return str(timestamp or 'N/A')
     
     def _get_html_styles(self) -> str:
         return """
@@ -137,7 +314,7 @@ class ReportGenerator:
             font-size: 1.2em;
             opacity: 0.9;
         }
-        .executive-summary {
+        .scan-info, .executive-summary {
             background: white;
             padding: 30px;
             border-radius: 8px;
@@ -172,6 +349,7 @@ class ReportGenerator:
             background: white;
             padding: 30px;
             border-radius: 8px;
+            margin-bottom: 30px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.1);
         }
         .vulnerability {
@@ -0,0 +1,153 @@
+import asyncio
+import base64
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Fields returned by the scan list; the findings live in their own collection
+SUMMARY_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "target_url": 1,
+    "status": 1,
+    "progress": 1,
+    "timestamp": 1,
+    "total_pages": 1,
+    "scan_duration": 1,
+    "vulnerability_count": 1,
+    "severity_counts": 1,
+    "config": 1,
+}
+
+
+def encode_cursor(timestamp: str, scan_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([timestamp, scan_id]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        timestamp, scan_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return timestamp, scan_id
+
+
+class ScanStore:
+    """Scan summaries in `scans`, one document per finding in `findings`."""
+
+    def __init__(self, db):
+        self.scans = db.scans
+        self.findings = db.findings
+
+    async def ensure_indexes(self) -> None:
+        await self.scans.create_index("id", unique=True)
+        await self.scans.create_index([("timestamp", -1), ("id", -1)])
+        await self.scans.create_index("target_url")
+        await self.findings.create_index([("scan_id", 1), ("seq", 1)])
+
+    async def insert_scan(self, doc: Dict[str, Any]) -> None:
+        doc = {k: v for k, v in doc.items() if k != "vulnerabilities"}
+        doc.setdefault("vulnerability_count", 0)
+        doc.setdefault("severity_counts", {})
+        await self.scans.insert_one(doc)
+
+    async def update_scan(self, scan_id: str, fields: Dict[str, Any]) -> None:
+        fields = {k: v for k, v in fields.items() if k != "vulnerabilities"}
+        await self.scans.update_one({"id": scan_id}, {"$set": fields})
+
+    async def clear_findings(self, scan_id: str) -> None:
+        await self.findings.delete_many({"scan_id": scan_id})
+        await self.scans.update_one(
+            {"id": scan_id},
+            {"$set": {"vulnerability_count": 0, "severity_counts": {}}}
+        )
+
+    async def add_findings(self, scan_id: str, findings: List[Dict[str, Any]], first_seq: int) -> None:
+        """One bulk insert for the batch plus one $inc for the summary counters."""
+        if not findings:
+            return
+        docs = [dict(f, scan_id=scan_id, seq=first_seq + i) for i, f in enumerate(findings)]
+        await self.findings.insert_many(docs, ordered=False)
+
+        inc: Dict[str, int] = {"vulnerability_count": len(findings)}
+        for f in findings:
+            key = f"severity_counts.{f.get('severity', 'Unknown')}"
+            inc[key] = inc.get(key, 0) + 1
+        await self.scans.update_one({"id": scan_id}, {"$inc": inc})
+
+    async def get_findings(self, scan_id: str) -> List[Dict[str, Any]]:
+        cursor = self.findings.find({"scan_id": scan_id}, {"_id": 0, "scan_id": 0, "seq": 0}).sort("seq", 1)
+        return await cursor.to_list(None)
+
+    async def get_scan(self, scan_id: str) -> Optional[Dict[str, Any]]:
+        """Full scan document with its findings joined back in as `vulnerabilities`."""
+        scan = await self.scans.find_one({"id": scan_id}, {"_id": 0})
+        if not scan:
+            return None
+        findings = await self.get_findings(scan_id)
+        # scans stored before findings got their own collection keep the embedded array
+        if findings or not scan.get("vulnerabilities"):
+            scan["vulnerabilities"] = findings
+        return scan
+
+    async def list_scans(self, limit: int = 20, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Newest first, keyset-paginated on (timestamp, id)."""
+        query: Dict[str, Any] = {}
+        if cursor:
+            timestamp, scan_id = decode_cursor(cursor)
+            query = {"$or": [
+                {"timestamp": {"$lt": timestamp}},
+                {"timestamp": timestamp, "id": {"$lt": scan_id}},
+            ]}
+
+        docs = await (
+            self.scans.find(query, SUMMARY_PROJECTION)
+            .sort([("timestamp", -1), ("id", -1)])
+            .limit(limit + 1)
+            .to_list(limit + 1)
+        )
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1]["timestamp"], docs[-1]["id"])
+        return {"scans": docs, "next_cursor": next_cursor}
+
+
+class FindingWriter:
+    """Buffers findings for one scan and writes them in batches while the scan runs.
+
+    add() is synchronous so it can be called from the scanner's progress
+    callback; a full batch is flushed in a background task. close() flushes
+    the rest and waits for every write.
+    """
+
+    def __init__(self, store: ScanStore, scan_id: str, batch_size: int = 50):
+        self.store = store
+        self.scan_id = scan_id
+        self.batch_size = batch_size
+        self.buffer: List[Dict[str, Any]] = []
+        self.written = 0
+        self._tasks: List[asyncio.Task] = []
+        self._lock = asyncio.Lock()
+
+    def add(self, finding: Dict[str, Any]) -> None:
+        self.buffer.append(finding)
+        if len(self.buffer) >= self.batch_size:
+            self._tasks.append(asyncio.ensure_future(self.flush()))
+
+    async def flush(self) -> None:
+        async with self._lock:
+            batch, self.buffer = self.buffer, []
+            if not batch:
+                return
+            first_seq = self.written
+            self.written += len(batch)
+            await self.store.add_findings(self.scan_id, batch, first_seq)
+
+    async def close(self) -> None:
+        await self.flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        self._tasks = []
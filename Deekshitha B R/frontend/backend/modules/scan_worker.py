@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue as queue_module
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from modules.job_queue import JobQueue, COMPLETED, FAILED, CANCELLED
+from modules.scan_store import ScanStore, FindingWriter
+
+logger = logging.getLogger(__name__)
+
+
+async def perform_scan(queue: JobQueue, store: ScanStore, job: Dict[str, Any], events=None):
+    """Crawl -> scan -> optional AI pass for one job.
+
+    State is written back to the job queue as it changes; phase, progress and
+    vulnerability events also go to `events` (a multiprocessing queue drained by the API).
+    Findings are bulk-written to the findings collection while the scan runs.
+    """
+    from modules.crawler import WebCrawler
+    from modules.scanner import VulnerabilityScanner
+    from modules.ai_engine import AIVulnerabilityEngine
+
+    scan_id = job['id']
+    request = job['request']
+    config = SimpleNamespace(**request['config'])
+    state = job['state']
+    start_time = time.time()
+    writer = FindingWriter(store, scan_id)
+
+    def emit(event_type: str, data: Dict[str, Any]):
+        if events is None:
+            return
+        try:
+            events.put_nowait((scan_id, event_type, data))
+        except queue_module.Full:
+            logger.warning(f"Event queue full, dropped {event_type} event for {scan_id}")
+
+    def save(job_status: Optional[str] = None, **fields):
+        phase_changed = 'status' in fields and fields['status'] != state.get('status')
+        state.update(fields)
+        queue.update_state(scan_id, state, job_status)
+        if phase_changed:
+            emit('phase', {'status': state['status'], 'progress': state.get('progress', 0), 'error': state.get('error')})
+        elif 'progress' in fields:
+            emit('progress', {'progress': state['progress'], 'check_timings': state.get('check_timings', {})})
+
+    try:
+        # a requeued job starts over, so drop whatever the crashed attempt wrote
+        await store.clear_findings(scan_id)
+
+        crawler = WebCrawler(request['target_url'])
+        save(status='crawling', progress=10)
+
+        pages = await crawler.crawl()
+        save(progress=30, total_pages=len(pages))
+
+        scanner = VulnerabilityScanner(config)
+        save(status='scanning', progress=40)
+
+        def on_progress(update: Dict[str, Any]):
+            # scanning covers 40-70% of the overall progress bar
+            for vuln in update['vulnerabilities']:
+                writer.add(vuln.model_dump())
+                emit('vulnerability', vuln.model_dump())
+            save(
+                progress=40 + int(30 * update['done'] / max(update['total'], 1)),
+                check_timings=update['timings']
+            )
+
+        vulnerabilities = await scanner.scan(pages, progress=on_progress)
+        await writer.close()
+        save(progress=70, check_timings=scanner.timings)
+
+        if config.enable_ai:
+            ai_engine = AIVulnerabilityEngine()
+            save(status='ai_analysis', progress=80)
+
+            enhanced_vulns = await ai_engine.analyze(vulnerabilities, pages)
+            vulnerabilities = enhanced_vulns
+
+            await store.clear_findings(scan_id)
+            writer = FindingWriter(store, scan_id)
+            for vuln in vulnerabilities:
+                writer.add(vuln.model_dump())
+            await writer.close()
+
+        state['vulnerabilities'] = [v.model_dump() for v in vulnerabilities]
+        state['scan_duration'] = time.time() - start_time
+        save(COMPLETED, status=COMPLETED, progress=100)
+
+        await store.update_scan(scan_id, state)
+
+    except asyncio.CancelledError:
+        logger.info(f"Scan {scan_id} cancelled")
+        save(CANCELLED, status=CANCELLED)
+        await writer.close()
+        await store.update_scan(scan_id, {"status": CANCELLED})
+
+    except Exception as e:
+        logger.error(f"Scan failed: {str(e)}")
+        save(FAILED, status=FAILED, error=str(e))
+        await store.update_scan(scan_id, {"status": "failed", "error": str(e)})
+
+
+async def _watch_cancel(queue: JobQueue, job_id: str, task: asyncio.Task, interval: float):
+    while not task.done():
+        await asyncio.sleep(interval)
+        if await asyncio.to_thread(queue.cancel_requested, job_id):
+            task.cancel()
+            return
+
+
+async def _worker_loop(queue: JobQueue, worker: str, poll_interval: float, events=None):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    store = ScanStore(client[os.environ['DB_NAME']])
+    try:
+        while True:
+            job = await asyncio.to_thread(queue.claim, worker)
+            if job is None:
+                await asyncio.sleep(poll_interval)
+                continue
+
+            logger.info(f"{worker} picked up scan {job['id']} ({job['request']['target_url']})")
+            task = asyncio.create_task(perform_scan(queue, store, job, events))
+            watcher = asyncio.create_task(_watch_cancel(queue, job['id'], task, poll_interval))
+            await asyncio.gather(task, return_exceptions=True)
+            watcher.cancel()
+    finally:
+        client.close()
+
+
+def worker_main(queue_path: str, per_target_limit: int, worker: str, events=None, poll_interval: float = 1.0):
+    """Entry point of a worker process: claims and runs one scan at a time until terminated."""
+    from dotenv import load_dotenv
+    from pathlib import Path
+
+    load_dotenv(Path(__file__).parent.parent / '.env')
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    queue = JobQueue(queue_path, per_target_limit)
+    asyncio.run(_worker_loop(queue, worker, poll_interval, events))
+
+
+class WorkerPool:
+    """A fixed number of scan worker processes plus a monitor thread.
+
+    The monitor restarts any worker that died and puts the job it was running
+    back in the queue; it also purges finished jobs past `retention` seconds.
+    Workers report scan events on `events`, a bounded multiprocessing queue.
+    """
+
+    def __init__(self, queue: JobQueue, processes: int = 2, retention: float = 24 * 3600,
+                 check_interval: float = 5.0):
+        self.queue = queue
+        self.processes = processes
+        self.retention = retention
+        self.check_interval = check_interval
+        self.workers: Dict[str, multiprocessing.Process] = {}
+        self._context = multiprocessing.get_context("spawn")
+        self._stopping = threading.Event()
+        self._monitor: Optional[threading.Thread] = None
+        self._generation = 0
+        self.events = self._context.Queue(maxsize=10000)
+
+    def _spawn(self, slot: int) -> None:
+        self._generation += 1
+        name = f"scan-worker-{slot}-{self._generation}"
+        process = self._context.Process(
+            target=worker_main,
+            args=(self.queue.path, self.queue.per_target_limit, name, self.events),
+            name=name,
+            daemon=True
+        )
+        process.start()
+        self.workers[name] = process
+
+    def _requeue(self, worker: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """JobQueue.requeue() plus a phase event per job, so SSE subscribers see the
+        job go back to queued, or their stream ends if it failed or was cancelled."""
+        changed = self.queue.requeue(worker=worker)
+        for job_id, state in changed.items():
+            try:
+                self.events.put_nowait((job_id, 'phase', {
+                    'status': state['status'], 'progress': state.get('progress', 0), 'error': state.get('error')
+                }))
+            except queue_module.Full:
+                logger.warning(f"Event queue full, dropped requeue event for {job_id}")
+        return changed
+
+    def start(self) -> "WorkerPool":
+        # anything still "running" belongs to a previous server process that died
+        recovered = self._requeue()
+        if recovered:
+            logger.info(f"Recovered {len(recovered)} interrupted scan(s)")
+        for slot in range(self.processes):
+            self._spawn(slot)
+        self._monitor = threading.Thread(target=self._watch, name="scan-worker-monitor", daemon=True)
+        self._monitor.start()
+        return self
+
+    def _watch(self) -> None:
+        last_purge = 0.0
+        while not self._stopping.wait(self.check_interval):
+            for name, process in list(self.workers.items()):
+                if process.is_alive():
+                    continue
+                logger.warning(f"{name} exited with code {process.exitcode}; restarting")
+                del self.workers[name]
+                self._requeue(worker=name)
+                self._spawn(int(name.split('-')[2]))
+
+            if time.time() - last_purge > 3600:
+                last_purge = time.time()
+                purged = self.queue.purge(self.retention)
+                if purged:
+                    logger.info(f"Purged {purged} finished job(s)")
+
+    def stop(self) -> List[str]:
+        self._stopping.set()
+        if self._monitor:
+            self._monitor.join()
+        names = list(self.workers)
+        for process in self.workers.values():
+            process.terminate()
+        for process in self.workers.values():
+            process.join(timeout=5)
+        self.workers = {}
+        return names
+
+    def next_event(self, timeout: float = 1.0):
+        """Blocking read of one (scan_id, event_type, data) tuple; None on timeout."""
+        try:
+            return self.events.get(timeout=timeout)
+        except queue_module.Empty:
+            return None
@@ -1,11 +1,23 @@
 import asyncio
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, Awaitable, Callable, Optional
+from urllib.parse import urlparse
 import logging
 from pydantic import BaseModel, Field
 import uuid
 
+from modules.injection_registry import InjectionPointRegistry
+
 logger = logging.getLogger(__name__)
 
+CHECK_BY_TYPE = {
+    "SQL Injection": "sqli",
+    "Cross-Site Scripting (XSS)": "xss",
+    "Weak Authentication": "auth",
+    "Session Management": "auth",
+    "Insecure Direct Object Reference (IDOR)": "idor",
+}
+
 class VulnerabilityModel(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     type: str
@@ -16,9 +28,30 @@ class VulnerabilityModel(BaseModel):
     mitigation: str
     payload: str = ""
 
+SQL_ERRORS = ['sql syntax', 'mysql', 'sqlite', 'postgresql', 'ora-', 'syntax error']
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
 class VulnerabilityScanner:
-    def __init__(self, config):
+    """Runs every enabled check over every page concurrently.
+
+    All probes go through one aiohttp.ClientSession, bounded by a global and a
+    per-host semaphore. The payloads for one field race each other and the rest
+    are cancelled as soon as one confirms the field.
+    """
+
+    def __init__(self, config, max_concurrency: int = 20, per_host: int = 5, timeout: float = 10):
         self.config = config
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.registry = InjectionPointRegistry()
+        self.timings: Dict[str, Dict[str, Any]] = {}
+        self.requests_made = 0
+        self._session = None
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
         self.sqli_payloads = [
             "' OR '1'='1",
             "1' OR '1'='1'--",
@@ -34,79 +67,195 @@ class VulnerabilityScanner:
             "'\"><script>alert('XSS')</script>"
         ]
     
-    async def scan(self, pages: List[Dict]) -> List[VulnerabilityModel]:
+    async def scan(self, pages: List[Dict], progress: Optional[ProgressCallback] = None) -> List[VulnerabilityModel]:
+        import aiohttp
+
+        self.registry = InjectionPointRegistry.from_pages(pages)
+        logger.info(f"{len(self.registry)} unique injection points across {len(pages)} pages")
+
+        checks = [
+            (name, scan_page)
+            for name, enabled, scan_page in (
+                ('sqli', self.config.enable_sqli, self._scan_sqli),
+                ('xss', self.config.enable_xss, self._scan_xss),
+                ('auth', self.config.enable_auth, self._scan_auth),
+                ('idor', self.config.enable_idor, self._scan_idor),
+            )
+            if enabled
+        ]
+        self.timings = {name: {'tasks': 0, 'done': 0, 'seconds': 0.0, 'findings': 0} for name, _ in checks}
+        total = len(pages) * len(checks)
+        done = 0
+
+        async def timed(name: str, scan_page, page: Dict) -> List[VulnerabilityModel]:
+            nonlocal done
+            started = time.monotonic()
+            found: List[VulnerabilityModel] = []
+            try:
+                found = await scan_page(page)
+                return found
+            finally:
+                timing = self.timings[name]
+                timing['seconds'] += time.monotonic() - started
+                timing['done'] += 1
+                done += 1
+                if progress:
+                    progress({
+                        'check': name,
+                        'done': done,
+                        'total': total,
+                        'timings': self.timings,
+                        'vulnerabilities': found
+                    })
+
+        self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        self._host_limits = {}
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        ) as session:
+            self._session = session
+            tasks = []
+            for page in pages:
+                for name, scan_page in checks:
+                    self.timings[name]['tasks'] += 1
+                    tasks.append(timed(name, scan_page, page))
+            # same order as the old page-by-page loop
+            results = await asyncio.gather(*tasks)
+            self._session = None
+
         vulnerabilities = []
-        
-        for page in pages:
-            if self.config.enable_sqli:
-                vulns = await self._scan_sqli(page)
-                vulnerabilities.extend(vulns)
-            
-            if self.config.enable_xss:
-                vulns = await self._scan_xss(page)
-                vulnerabilities.extend(vulns)
-            
-            if self.config.enable_auth:
-                vulns = await self._scan_auth(page)
-                vulnerabilities.extend(vulns)
-            
-            if self.config.enable_idor:
-                vulns = await self._scan_idor(page)
-                vulnerabilities.extend(vulns)
-        
+        for vulns in results:
+            vulnerabilities.extend(vulns)
+        for vuln in vulnerabilities:
+            check = CHECK_BY_TYPE.get(vuln.type)
+            if check in self.timings:
+                self.timings[check]['findings'] += 1
+
+        for name, timing in self.timings.items():
+            logger.info(f"{name}: {timing['done']} pages, {timing['findings']} findings, {timing['seconds']:.2f}s task time")
+        logger.info(f"{self.requests_made} probe requests")
         return vulnerabilities
-    
+
+    async def _request(self, method: str, url: str, params: Dict[str, str]) -> Optional[str]:
+        """One probe through the shared session; None if it failed."""
+        host = urlparse(url).netloc
+        host_limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+        kwargs = {'data': params} if method == 'POST' else {'params': params}
+
+        async with self._global_limit, host_limit:
+            self.requests_made += 1
+            try:
+                async with self._session.request(method, url, allow_redirects=False, **kwargs) as response:
+                    return await response.text(errors='replace')
+            except Exception as e:
+                logger.debug(f"Probe failed {method} {url}: {e}")
+                return None
+
+    def _form_params(self, form: Dict, field: str, payload: str) -> Dict[str, str]:
+        params = {
+            inp['name']: 'test'
+            for inp in form.get('inputs', [])
+            if inp.get('name') and inp.get('type') not in ('submit', 'button', 'file')
+        }
+        params[field] = payload
+        return params
+
+    async def _first_confirmed(self, probes: List[Awaitable[bool]]) -> Optional[int]:
+        """Runs the probes concurrently; returns the index of the first that confirms and cancels the rest."""
+        tasks = [asyncio.ensure_future(probe) for probe in probes]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                if await next_done:
+                    break
+            else:
+                return None
+            for index, task in enumerate(tasks):
+                if task.done() and not task.cancelled() and task.result():
+                    return index
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
     async def _scan_sqli(self, page: Dict) -> List[VulnerabilityModel]:
         vulnerabilities = []
         
         for form in page.get('forms', []):
-            for input_field in form.get('inputs', []):
-                if input_field.get('name'):
-                    for payload in self.sqli_payloads[:2]:
-                        is_vulnerable = await self._test_sqli(form['action'], input_field['name'], payload)
-                        
-                        if is_vulnerable:
-                            vulnerabilities.append(VulnerabilityModel(
-                                type="SQL Injection",
-                                endpoint=form['action'],
-                                severity="Critical",
-                                description=f"SQL Injection vulnerability detected in parameter '{input_field['name']}'",
-                                evidence=f"Payload: {payload} - Error-based SQL injection detected",
-                                mitigation="Use parameterized queries, prepared statements, and input validation",
-                                payload=payload
-                            ))
-                            break
+            point = self.registry.get_form(page['url'], form)
+            if not self.registry.claim(point, 'sqli'):
+                continue
+            
+            fields = [inp['name'] for inp in form.get('inputs', []) if inp.get('name')]
+            confirmed = await asyncio.gather(*[
+                self._first_confirmed([self._test_sqli(form, field, payload) for payload in self.sqli_payloads])
+                for field in fields
+            ])
+
+            for field, index in zip(fields, confirmed):
+                if index is None:
+                    continue
+                payload = self.sqli_payloads[index]
+                vulnerabilities.append(VulnerabilityModel(
+                    type="SQL Injection",
+                    endpoint=form['action'],
+                    severity="Critical",
+                    description=f"SQL Injection vulnerability detected in parameter '{field}'",
+                    evidence=f"Payload: {payload} - Error-based SQL injection detected",
+                    mitigation="Use parameterized queries, prepared statements, and input validation",
+                    payload=payload
+                ))
+            
+            self.registry.mark_done(point, 'sqli')
         
         return vulnerabilities
     
-    async def _test_sqli(self, url: str, param: str, payload: str) -> bool:
-        sql_errors = ['sql syntax', 'mysql', 'sqlite', 'postgresql', 'ora-', 'syntax error']
-        return 'login' in url.lower() or 'search' in url.lower()
+    async def _test_sqli(self, form: Dict, param: str, payload: str) -> bool:
+        body = await self._request(form.get('method', 'get').upper(), form['action'], self._form_params(form, param, payload))
+        if body is None:
+            return False
+        body = body.lower()
+        return any(error in body for error in SQL_ERRORS)
     
     async def _scan_xss(self, page: Dict) -> List[VulnerabilityModel]:
         vulnerabilities = []
         
         for form in page.get('forms', []):
-            for input_field in form.get('inputs', []):
-                if input_field.get('type') in ['text', 'textarea', 'search']:
-                    payload = self.xss_payloads[0]
-                    is_vulnerable = await self._test_xss(form['action'], input_field['name'], payload)
-                    
-                    if is_vulnerable:
-                        vulnerabilities.append(VulnerabilityModel(
-                            type="Cross-Site Scripting (XSS)",
-                            endpoint=form['action'],
-                            severity="High",
-                            description=f"Reflected XSS vulnerability in parameter '{input_field['name']}'",
-                            evidence=f"Payload: {payload} - Script executed in response",
-                            mitigation="Implement output encoding, Content Security Policy, and input sanitization",
-                            payload=payload
-                        ))
+            point = self.registry.get_form(page['url'], form)
+            if not self.registry.claim(point, 'xss'):
+                continue
+            
+            fields = [
+                inp['name'] for inp in form.get('inputs', [])
+                if inp.get('name') and inp.get('type') in ['text', 'textarea', 'search']
+            ]
+            confirmed = await asyncio.gather(*[
+                self._first_confirmed([self._test_xss(form, field, payload) for payload in self.xss_payloads])
+                for field in fields
+            ])
+
+            for field, index in zip(fields, confirmed):
+                if index is None:
+                    continue
+                payload = self.xss_payloads[index]
+                vulnerabilities.append(VulnerabilityModel(
+                    type="Cross-Site Scripting (XSS)",
+                    endpoint=form['action'],
+                    severity="High",
+                    description=f"Reflected XSS vulnerability in parameter '{field}'",
+                    evidence=f"Payload: {payload} - Payload reflected unencoded in response",
+                    mitigation="Implement output encoding, Content Security Policy, and input sanitization",
+                    payload=payload
+                ))
+            
+            self.registry.mark_done(point, 'xss')
         
         return vulnerabilities
     
-    async def _test_xss(self, url: str, param: str, payload: str) -> bool:
-        return 'search' in url.lower() or 'comment' in url.lower()
+    async def _test_xss(self, form: Dict, param: str, payload: str) -> bool:
+        body = await self._request(form.get('method', 'get').upper(), form['action'], self._form_params(form, param, payload))
+        return body is not None and payload in body
     
     async def _scan_auth(self, page: Dict) -> List[VulnerabilityModel]:
         vulnerabilities = []
@@ -1,7 +1,8 @@
-from fastapi import FastAPI, APIRouter, HTTPException, BackgroundTasks
+from fastapi import FastAPI, APIRouter, HTTPException, Request
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 import logging
 from pathlib import Path
@@ -9,12 +10,13 @@ from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any
 import uuid
 from datetime import datetime, timezone
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, StreamingResponse
 
-from modules.crawler import WebCrawler
-from modules.scanner import VulnerabilityScanner
-from modules.ai_engine import AIVulnerabilityEngine
 from modules.report_generator import ReportGenerator
+from modules.job_queue import JobQueue
+from modules.scan_worker import WorkerPool
+from modules.events import ScanEventBus, TERMINAL_PHASES, format_sse
+from modules.scan_store import ScanStore
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -22,6 +24,7 @@ load_dotenv(ROOT_DIR / '.env')
 mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
+store = ScanStore(db)
 
 app = FastAPI()
 api_router = APIRouter(prefix="/api")
@@ -39,6 +42,7 @@ class ScanConfig(BaseModel):
 class ScanRequest(BaseModel):
     target_url: str
     config: ScanConfig
+    priority: int = 0
 
 class VulnerabilityModel(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -62,102 +66,105 @@ class ScanResultModel(BaseModel):
     config: ScanConfig
     total_pages: int = 0
     scan_duration: Optional[float] = None
+    check_timings: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
 
-scans_storage = {}
+job_queue = JobQueue(
+    os.environ.get('SCAN_QUEUE_PATH', str(ROOT_DIR / 'scan_jobs.db')),
+    per_target_limit=int(os.environ.get('SCAN_PER_TARGET_LIMIT', '1'))
+)
+worker_pool = WorkerPool(job_queue, processes=int(os.environ.get('SCAN_WORKERS', '2')))
+event_bus = ScanEventBus()
 
 @api_router.get("/")
 async def root():
     return {"message": "WebScanPro API"}
 
 @api_router.post("/scan/start")
-async def start_scan(scan_request: ScanRequest, background_tasks: BackgroundTasks):
+async def start_scan(scan_request: ScanRequest):
     scan_id = str(uuid.uuid4())
     
     scan_result = ScanResultModel(
         id=scan_id,
         target_url=scan_request.target_url,
-        status="running",
+        status="queued",
         progress=0,
         vulnerabilities=[],
         config=scan_request.config
     )
     
-    scans_storage[scan_id] = scan_result.model_dump()
-    
     doc = scan_result.model_dump()
     doc['timestamp'] = doc['timestamp'].isoformat()
-    await db.scans.insert_one(doc)
+    await store.insert_scan(doc)
+    
+    await asyncio.to_thread(
+        job_queue.enqueue, scan_id, scan_request.model_dump(), doc, scan_request.priority
+    )
     
-    background_tasks.add_task(perform_scan, scan_id, scan_request)
+    event_bus.publish(scan_id, "phase", {"status": "queued", "progress": 0})
     
-    return {"scan_id": scan_id, "status": "started"}
+    return {"scan_id": scan_id, "status": "queued"}
 
-async def perform_scan(scan_id: str, scan_request: ScanRequest):
-    import time
-    start_time = time.time()
+@api_router.post("/scan/{scan_id}/cancel")
+async def cancel_scan(scan_id: str):
+    status = await asyncio.to_thread(job_queue.cancel, scan_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Scan not found")
     
-    try:
-        crawler = WebCrawler(scan_request.target_url)
-        scans_storage[scan_id]['progress'] = 10
-        scans_storage[scan_id]['status'] = 'crawling'
-        
-        pages = await crawler.crawl()
-        scans_storage[scan_id]['progress'] = 30
-        scans_storage[scan_id]['total_pages'] = len(pages)
-        
-        scanner = VulnerabilityScanner(scan_request.config)
-        scans_storage[scan_id]['status'] = 'scanning'
-        scans_storage[scan_id]['progress'] = 40
-        
-        vulnerabilities = await scanner.scan(pages)
-        scans_storage[scan_id]['progress'] = 70
-        
-        if scan_request.config.enable_ai:
-            ai_engine = AIVulnerabilityEngine()
-            scans_storage[scan_id]['status'] = 'ai_analysis'
-            scans_storage[scan_id]['progress'] = 80
-            
-            enhanced_vulns = await ai_engine.analyze(vulnerabilities, pages)
-            vulnerabilities = enhanced_vulns
-        
-        scans_storage[scan_id]['vulnerabilities'] = [v.model_dump() for v in vulnerabilities]
-        scans_storage[scan_id]['progress'] = 100
-        scans_storage[scan_id]['status'] = 'completed'
-        scans_storage[scan_id]['scan_duration'] = time.time() - start_time
-        
-        await db.scans.update_one(
-            {"id": scan_id},
-            {"$set": scans_storage[scan_id]}
-        )
-        
-    except Exception as e:
-        logger.error(f"Scan failed: {str(e)}")
-        scans_storage[scan_id]['status'] = 'failed'
-        scans_storage[scan_id]['error'] = str(e)
-        await db.scans.update_one(
-            {"id": scan_id},
-            {"$set": {"status": "failed", "error": str(e)}}
-        )
+    if status == "cancelled":
+        await store.update_scan(scan_id, {"status": "cancelled"})
+        event_bus.publish(scan_id, "phase", {"status": "cancelled", "progress": 0})
+    
+    return {"scan_id": scan_id, "status": status}
 
 @api_router.get("/scan/{scan_id}")
 async def get_scan_status(scan_id: str):
-    if scan_id in scans_storage:
-        return scans_storage[scan_id]
+    job = await asyncio.to_thread(job_queue.get, scan_id)
+    if job:
+        return job['state']
     
-    scan = await db.scans.find_one({"id": scan_id}, {"_id": 0})
+    scan = await store.get_scan(scan_id)
     if scan:
         return scan
     
     raise HTTPException(status_code=404, detail="Scan not found")
 
+@api_router.get("/scan/{scan_id}/events")
+async def scan_events(scan_id: str, request: Request):
+    last_event_id = request.headers.get("last-event-id")
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+    
+    if not event_bus.has(scan_id):
+        # channel evicted or server restarted: start from a snapshot of the stored state
+        job = await asyncio.to_thread(job_queue.get, scan_id)
+        scan = job['state'] if job else await store.get_scan(scan_id)
+        if not scan:
+            raise HTTPException(status_code=404, detail="Scan not found")
+        
+        if scan.get('status') in TERMINAL_PHASES:
+            snapshot = format_sse({"id": 0, "event": "snapshot", "data": scan})
+            return StreamingResponse(iter([snapshot]), media_type="text/event-stream")
+        event_bus.publish(scan_id, "snapshot", scan)
+    
+    async def stream():
+        async for event in event_bus.subscribe(scan_id, last_event_id):
+            yield format_sse(event)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @api_router.get("/scans")
-async def get_all_scans():
-    scans = await db.scans.find({}, {"_id": 0}).sort("timestamp", -1).to_list(100)
-    return scans
+async def get_all_scans(limit: int = 20, cursor: Optional[str] = None):
+    try:
+        return await store.list_scans(min(max(limit, 1), 100), cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @api_router.post("/report/generate/{scan_id}")
 async def generate_report(scan_id: str, format: str = "pdf"):
-    scan = await db.scans.find_one({"id": scan_id}, {"_id": 0})
+    scan = await store.get_scan(scan_id)
     
     if not scan:
         raise HTTPException(status_code=404, detail="Scan not found")
@@ -172,8 +179,8 @@ async def generate_report(scan_id: str, format: str = "pdf"):
             filename=f"scan_report_{scan_id}.pdf"
         )
     elif format == "html":
-        html_content = await generator.generate_html(scan)
-        return Response(content=html_content, media_type="text/html")
+        report_path = await generator.generate_html_file(scan)
+        return FileResponse(report_path, media_type="text/html")
     else:
         raise HTTPException(status_code=400, detail="Invalid format")
 
@@ -192,6 +199,22 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
+async def pump_scan_events():
+    """Moves events reported by the worker processes onto the in-memory bus."""
+    while True:
+        item = await asyncio.to_thread(worker_pool.next_event)
+        if item is not None:
+            event_bus.publish(*item)
+
+@app.on_event("startup")
+async def start_scan_workers():
+    await store.ensure_indexes()
+    worker_pool.start()
+    app.state.event_pump = asyncio.create_task(pump_scan_events())
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    app.state.event_pump.cancel()
+    worker_pool.stop()
+    ReportGenerator.shutdown()
     client.close()
\ No newline at end of file
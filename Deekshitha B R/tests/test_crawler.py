@@ -0,0 +1,45 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "frontend" / "backend"))
+
+web = pytest.importorskip("aiohttp.web")
+pytest.importorskip("bs4")
+
+from modules.crawler import WebCrawler  # noqa: E402
+
+
+def test_parse_errors_do_not_stall_the_crawl():
+    async def run():
+        app = web.Application()
+
+        async def page(request):
+            return web.Response(text='<a href="/a">a</a> <a href="/b">b</a>', content_type="text/html")
+
+        app.router.add_get("/{tail:.*}", page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            crawler = WebCrawler(f"http://127.0.0.1:{port}/", workers=1)
+
+            parse = crawler._parse_page
+
+            def broken_links(url, html):
+                # /a and /b both fail; whichever runs first leaves the other queued for the only worker
+                if not url.endswith("/"):
+                    raise ValueError("unparseable page")
+                return parse(url, html)
+
+            crawler._parse_page = broken_links
+            await asyncio.wait_for(crawler._crawl(max_pages=5), timeout=5)
+            return sorted(p["url"].rsplit("/", 1)[1] for p in crawler.pages)
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(run()) == [""]
@@ -0,0 +1,63 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "frontend" / "backend"))
+
+from modules.events import ScanEventBus  # noqa: E402
+
+
+async def collect(bus, scan_id, last_event_id=None):
+    return [e async for e in bus.subscribe(scan_id, last_event_id, keepalive=1)]
+
+
+def test_subscribing_to_an_unknown_scan_creates_no_channel():
+    bus = ScanEventBus()
+    assert asyncio.run(collect(bus, "nope")) == []
+    assert not bus.has("nope")
+
+
+def test_replay_then_live_events_until_a_terminal_phase():
+    async def run():
+        bus = ScanEventBus()
+        bus.publish("s", "phase", {"status": "scanning"})
+        bus.publish("s", "progress", {"progress": 10})
+        task = asyncio.create_task(collect(bus, "s", last_event_id=1))
+        await asyncio.sleep(0)
+        bus.publish("s", "phase", {"status": "completed"})
+        return await task
+
+    assert [e["id"] for e in asyncio.run(run())] == [2, 3]
+
+
+def test_idle_channels_are_evicted_after_retention():
+    bus = ScanEventBus(retention=300)
+    bus.publish("crashed", "phase", {"status": "scanning"})
+    bus.publish("done", "phase", {"status": "completed"})
+    now = time.monotonic()
+
+    assert bus.evict_idle(now + 299) == 0
+    assert bus.evict_idle(now + 301) == 2
+    assert bus.channels == {}
+
+
+def test_channels_with_subscribers_are_kept():
+    async def run():
+        bus = ScanEventBus(retention=0)
+        bus.publish("s", "phase", {"status": "scanning"})
+        stream = bus.subscribe("s", keepalive=1)
+        await stream.__anext__()  # replayed event; the subscriber is now registered
+        assert bus.evict_idle(time.monotonic() + 10) == 0
+        await stream.aclose()
+        assert bus.evict_idle(time.monotonic() + 10) == 1
+
+    asyncio.run(run())
+
+
+def test_publish_sweeps_idle_channels():
+    bus = ScanEventBus(retention=0, sweep_interval=0)
+    bus.publish("old", "phase", {"status": "scanning"})
+    bus.publish("new", "phase", {"status": "scanning"})
+    assert not bus.has("old")
+    assert bus.has("new")
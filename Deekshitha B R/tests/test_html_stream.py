@@ -0,0 +1,67 @@
+import gzip
+import io
+import sys
+from pathlib import Path
+from string import Template
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "frontend" / "backend"))
+
+from modules.html_stream import HTMLStreamWriter, Markup  # noqa: E402
+from modules.report_generator import ReportGenerator  # noqa: E402
+
+ROW = Template("<tr><td>$name</td><td>$template</td></tr>")
+GROUP = Template("<h3>$group</h3>")
+
+
+def render(**table_args):
+    buffer = io.StringIO()
+    with HTMLStreamWriter(fileobj=buffer) as out:
+        counts = out.table("<tr><th>h</th></tr>", ROW, **table_args)
+    return buffer.getvalue(), counts
+
+
+def rows(n, severity="High"):
+    for i in range(n):
+        yield {"name": f"r{i}", "template": "t", "severity": severity}
+
+
+def test_rows_are_escaped_and_may_have_a_template_key():
+    html, counts = render(rows=[{"name": "<script>", "template": Markup("<b>ok</b>")}])
+    assert "&lt;script&gt;" in html
+    assert "<b>ok</b>" in html
+    assert sum(counts.values()) == 1
+
+
+def test_pages_repeat_the_header():
+    html, counts = render(rows=rows(7), page_size=3)
+    assert html.count("<table>") == html.count("<th>h</th>") == 3
+    assert counts == {None: 7}
+
+
+def test_groups_start_new_sections_and_tally_counts_in_the_same_pass():
+    findings = (row for sev, n in (("Critical", 2), ("High", 3)) for row in rows(n, sev))
+    html, counts = render(rows=findings, page_size=2, group_key=lambda r: r["severity"],
+                          group_template=GROUP, tally=lambda r: r["severity"])
+    assert html.index("<h3>Critical</h3>") < html.index("<h3>High</h3>")
+    # Critical: one page of 2; High: pages of 2 and 1
+    assert html.count("<table>") == 3
+    assert counts == {"Critical": 2, "High": 3}
+
+
+def test_gzip_output(tmp_path):
+    path = tmp_path / "report.html.gz"
+    with HTMLStreamWriter(path) as out:
+        out.table("", ROW, rows(2))
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert f.read().count("<tr>") == 2
+
+
+def test_report_streams_findings_from_a_generator():
+    generator = ReportGenerator.__new__(ReportGenerator)
+    findings = ({"type": "XSS", "severity": sev, "endpoint": f"/p{i}"}
+                for i, sev in enumerate(["Critical", "High", "High"]))
+    html = generator.build_html({"target_url": "http://t", "timestamp": "2025-01-01T00:00:00",
+                                 "vulnerabilities": findings})
+    assert html.count('class="vulnerability ') == 3
+    assert "<strong>Total Vulnerabilities:</strong> 3" in html
+    assert html.index("Detailed Findings") < html.index("Executive Summary")
@@ -0,0 +1,117 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "frontend" / "backend"))
+
+from modules.job_queue import JobQueue, COMPLETED  # noqa: E402
+from modules.scan_worker import WorkerPool  # noqa: E402
+
+
+def make_queue(tmp_path, **kwargs):
+    return JobQueue(str(tmp_path / "jobs.sqlite"), **kwargs)
+
+
+def enqueue(queue, job_id, host="t.test", priority=0):
+    queue.enqueue(job_id, {"target_url": f"http://{host}/scan"}, {"status": "queued"}, priority)
+
+
+def test_claim_takes_highest_priority_then_oldest(tmp_path):
+    queue = make_queue(tmp_path, per_target_limit=10)
+    for job_id, priority in (("low", 0), ("high-1", 5), ("mid", 1), ("high-2", 5)):
+        enqueue(queue, job_id, priority=priority)
+
+    claimed = [queue.claim("w")["id"] for _ in range(4)]
+    assert claimed == ["high-1", "high-2", "mid", "low"]
+    assert queue.claim("w") is None
+
+
+def test_per_target_cap_holds_back_jobs_for_a_busy_host(tmp_path):
+    queue = make_queue(tmp_path, per_target_limit=1)
+    enqueue(queue, "a1", "a.test", priority=9)
+    enqueue(queue, "a2", "A.test", priority=9)  # hosts compare case-insensitively
+    enqueue(queue, "b1", "b.test")
+
+    first = queue.claim("w1")
+    assert (first["id"], first["status"], first["worker"]) == ("a1", "running", "w1")
+    # a2 outranks b1 but a.test is at its cap
+    assert queue.claim("w2")["id"] == "b1"
+    assert queue.claim("w3") is None
+
+    queue.update_state("a1", {"status": COMPLETED}, COMPLETED)
+    assert queue.claim("w3")["id"] == "a2"
+
+
+def test_cancel_queued_running_and_unknown_jobs(tmp_path):
+    queue = make_queue(tmp_path, per_target_limit=10)
+    enqueue(queue, "queued")
+    enqueue(queue, "running", priority=1)
+    queue.claim("w")
+
+    assert queue.cancel("queued") == "cancelled"
+    assert queue.get("queued")["state"]["status"] == "cancelled"
+    assert queue.claim("w") is None
+
+    assert queue.cancel("running") == "cancelling"
+    assert queue.cancel_requested("running")
+    assert queue.cancel("missing") is None
+
+    # the worker died before it saw the flag: requeue finishes the cancellation
+    assert queue.requeue()["running"]["status"] == "cancelled"
+    assert queue.get("running")["status"] == "cancelled"
+
+
+def test_requeue_recovers_crashed_jobs_until_max_attempts(tmp_path):
+    queue = make_queue(tmp_path, per_target_limit=10, max_attempts=2)
+    enqueue(queue, "a")
+    enqueue(queue, "b")
+    queue.claim("dead")
+    queue.claim("alive")
+
+    # only the dead worker's job goes back
+    assert list(queue.requeue(worker="dead")) == ["a"]
+    assert queue.get("a")["status"] == "queued"
+    assert queue.get("a")["worker"] is None
+    assert queue.get("b")["status"] == "running"
+
+    job = queue.claim("dead")
+    assert (job["id"], job["attempts"]) == ("a", 2)
+    assert queue.requeue(worker="dead")["a"]["status"] == "failed"
+    assert queue.get("a")["state"]["error"] == "Worker crashed too many times"
+    assert queue.claim("w") is None
+
+
+def test_purge_drops_only_old_finished_jobs(tmp_path):
+    queue = make_queue(tmp_path)
+    enqueue(queue, "done")
+    enqueue(queue, "waiting", "other.test")
+    queue.update_state("done", {"status": COMPLETED}, COMPLETED)
+
+    assert queue.purge(older_than=3600) == 0
+    assert queue.purge(older_than=-1) == 1
+    assert queue.get("done") is None
+    assert queue.get("waiting") is not None
+
+
+def drain(pool):
+    events = {}
+    while (item := pool.next_event(timeout=0.5)) is not None:
+        events[item[0]] = item[1:]
+    return events
+
+
+def test_requeue_publishes_a_phase_event_per_job(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite"), max_attempts=2)
+    for job_id, host in (("a", "one.test"), ("b", "two.test")):
+        queue.enqueue(job_id, {"target_url": f"http://{host}/"}, {"status": "scanning"})
+        queue.claim("w1")
+    pool = WorkerPool(queue, processes=0)
+
+    assert set(pool._requeue()) == {"a", "b"}
+    assert drain(pool) == {job_id: ("phase", {"status": "queued", "progress": 0, "error": None})
+                           for job_id in ("a", "b")}
+
+    # second crash: "a" has used up its attempts and its stream gets a terminal event
+    queue.claim("w2")
+    pool._requeue(worker="w2")
+    event_type, data = drain(pool)["a"]
+    assert (event_type, data["status"], data["error"]) == ("phase", "failed", "Worker crashed too many times")
@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "frontend" / "backend"))
+
+from modules import report_generator  # noqa: E402
+from modules.report_generator import ReportGenerator  # noqa: E402
+
+NOW = 1_000_000.0
+
+
+def cached(directory, name, size, age):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    os.utime(path, (NOW - age, NOW - age))
+    return path
+
+
+def test_prune_drops_reports_past_max_age(tmp_path):
+    generator = ReportGenerator(tmp_path, max_age=3600, max_bytes=10_000)
+    old = cached(tmp_path, "report_a_1.html", 10, 7200)
+    fresh = cached(tmp_path, "report_b_2.pdf", 10, 60)
+
+    assert generator.prune(now=NOW) == 1
+    assert not old.exists()
+    assert fresh.exists()
+
+
+def test_prune_evicts_least_recently_used_until_under_max_bytes(tmp_path):
+    generator = ReportGenerator(tmp_path, max_age=3600, max_bytes=250)
+    oldest = cached(tmp_path, "report_a_1.html", 100, 300)
+    middle = cached(tmp_path, "report_b_2.html", 100, 200)
+    newest = cached(tmp_path, "report_c_3.pdf", 100, 100)
+
+    assert generator.prune(now=NOW) == 1
+    assert not oldest.exists()
+    assert middle.exists() and newest.exists()
+
+
+def test_prune_leaves_kept_temp_and_unrelated_files(tmp_path):
+    generator = ReportGenerator(tmp_path, max_age=10, max_bytes=0)
+    kept = cached(tmp_path, "report_a_1.html", 10, 100)
+    partial = cached(tmp_path, "report_b_2.html.tmp", 10, 100)
+    other = cached(tmp_path, "notes.txt", 10, 100)
+
+    assert generator.prune(now=NOW, keep={kept}) == 0
+    assert kept.exists() and partial.exists() and other.exists()
+
+
+def test_render_prunes_older_reports(tmp_path, monkeypatch):
+    def fake_render(scan_data, fmt, path):
+        Path(path).write_text("report")
+        return path
+
+    class InlineExecutor:
+        def submit(self, fn, *args):
+            from concurrent.futures import Future
+            future = Future()
+            future.set_result(fn(*args))
+            return future
+
+    monkeypatch.setattr(report_generator, "render_report", fake_render)
+    monkeypatch.setattr(ReportGenerator, "executor", classmethod(lambda cls: InlineExecutor()))
+    generator = ReportGenerator(tmp_path, max_age=3600, max_bytes=10_000)
+    stale = cached(tmp_path, "report_old_0.html", 10, 7200)
+
+    path = asyncio.run(generator.render({"id": "s1", "vulnerabilities": []}, "html"))
+
+    assert Path(path).exists()
+    assert not stale.exists()
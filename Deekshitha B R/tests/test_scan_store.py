@@ -0,0 +1,119 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "frontend" / "backend"))
+
+mongomock_motor = pytest.importorskip("mongomock_motor")
+
+from modules.scan_store import ScanStore, FindingWriter, decode_cursor  # noqa: E402
+
+
+def make_store():
+    return ScanStore(mongomock_motor.AsyncMongoMockClient()["webscanpro_test"])
+
+
+def scan_doc(scan_id, timestamp, target="http://example.com"):
+    return {
+        "id": scan_id,
+        "target_url": target,
+        "status": "completed",
+        "progress": 100,
+        "timestamp": timestamp,
+        "config": {"enable_sqli": True},
+        "vulnerabilities": [],
+    }
+
+
+def finding(i, severity="High"):
+    return {"id": f"v{i}", "type": "SQL Injection", "severity": severity, "endpoint": f"/p{i}"}
+
+
+def test_insert_scan_does_not_embed_vulnerabilities():
+    async def run():
+        store = make_store()
+        await store.ensure_indexes()
+        await store.insert_scan(scan_doc("s1", "2025-01-01T00:00:00"))
+        raw = await store.scans.find_one({"id": "s1"}, {"_id": 0})
+        assert "vulnerabilities" not in raw
+        assert raw["vulnerability_count"] == 0
+
+    asyncio.run(run())
+
+
+def test_finding_writer_batches_and_counts():
+    async def run():
+        store = make_store()
+        await store.insert_scan(scan_doc("s1", "2025-01-01T00:00:00"))
+
+        writer = FindingWriter(store, "s1", batch_size=2)
+        for i in range(5):
+            writer.add(finding(i, "High" if i % 2 else "Critical"))
+        await writer.close()
+
+        scan = await store.get_scan("s1")
+        assert [v["id"] for v in scan["vulnerabilities"]] == [f"v{i}" for i in range(5)]
+        assert scan["vulnerability_count"] == 5
+        assert scan["severity_counts"] == {"Critical": 3, "High": 2}
+
+    asyncio.run(run())
+
+
+def test_clear_findings_resets_counters():
+    async def run():
+        store = make_store()
+        await store.insert_scan(scan_doc("s1", "2025-01-01T00:00:00"))
+        await store.add_findings("s1", [finding(0), finding(1)], 0)
+        await store.clear_findings("s1")
+
+        scan = await store.get_scan("s1")
+        assert scan["vulnerabilities"] == []
+        assert scan["vulnerability_count"] == 0
+
+    asyncio.run(run())
+
+
+def test_legacy_embedded_vulnerabilities_are_kept():
+    async def run():
+        store = make_store()
+        legacy = scan_doc("old", "2024-01-01T00:00:00")
+        legacy["vulnerabilities"] = [finding(0)]
+        await store.scans.insert_one(legacy)
+
+        scan = await store.get_scan("old")
+        assert scan["vulnerabilities"][0]["id"] == "v0"
+
+    asyncio.run(run())
+
+
+def test_list_scans_paginates_without_findings():
+    async def run():
+        store = make_store()
+        for i in range(5):
+            await store.insert_scan(scan_doc(f"s{i}", f"2025-01-0{i + 1}T00:00:00"))
+        # same timestamp as s4: the id breaks the tie
+        await store.insert_scan(scan_doc("s9", "2025-01-05T00:00:00"))
+        await store.add_findings("s4", [finding(0)], 0)
+
+        seen = []
+        cursor = None
+        while True:
+            page = await store.list_scans(limit=2, cursor=cursor)
+            for doc in page["scans"]:
+                assert "vulnerabilities" not in doc
+                assert "_id" not in doc
+            seen.extend(doc["id"] for doc in page["scans"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        assert seen == ["s9", "s4", "s3", "s2", "s1", "s0"]
+
+    asyncio.run(run())
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
@@ -11,74 +11,45 @@ load_dotenv()
 
 
 class SimpleCrawlerBS4:
-    def __init__(self, base_url, login_url=None, username=None, password=None):
+    def __init__(self, base_url, session_manager=None, site=None, role="admin"):
         self.base_url = base_url.rstrip("/")
         self.session = requests.Session()
         self.visited = set()
         self.to_crawl = [self.base_url]
         self.results = []
-        self.login_url = login_url
-        self.username = username
-        self.password = password
-
-    def get_csrf_token(self, html):
-        soup = BeautifulSoup(html, "html.parser")
-        token = soup.find("input", {"type": "hidden"})
-        if token and token.get("value"):
-            return token["value"]
-        return None
+        self.session_manager = session_manager
+        self.site = site
+        self.role = role
 
     def login(self):
-        if not self.login_url:
+        if not self.session_manager or not self.site:
             return
 
         try:
-            print(f"[LOGIN] GET {self.login_url}")
-            response = self.session.get(self.login_url)
-            csrf = self.get_csrf_token(response.text)
-
-            # ---------------- DVWA LOGIN ----------------
-            if "localhost" in self.base_url and "8080" not in self.base_url:
-                login_data = {
-                    "username": self.username,
-                    "password": self.password,
-                    "Login": "Login",
-                }
-                if csrf:
-                    login_data["user_token"] = csrf
-
-            # ---------------- bWAPP LOGIN ----------------
-            elif "8080" in self.base_url:
-                login_data = {
-                    "login": self.username,
-                    "password": self.password,
-                    "security_level": "0",
-                    "form": "submit"
-                }
-                if csrf:
-                    login_data["token"] = csrf
-
-            else:
-                login_data = {
-                    "username": self.username,
-                    "password": self.password
-                }
-
-            print(f"[LOGIN] POST {self.login_url}")
-            post_response = self.session.post(self.login_url, data=login_data)
-
-            if post_response.status_code == 200:
-                print("[LOGIN] Successful")
-            else:
-                print(f"[LOGIN][ERROR] Status: {post_response.status_code}")
-
+            # shared, already-authenticated session for this site/role
+            self.session = self.session_manager.session(self.site, self.role)
         except Exception as e:
             print(f"[LOGIN][ERROR] {e}")
 
+    def get(self, url):
+        """GET through the session manager when logged in, so an expired session is renewed mid-crawl."""
+        if self.session_manager and self.site:
+            return self.session_manager.request(self.site, self.role, "GET", url, timeout=5, allow_redirects=True)
+        return self.session.get(url, timeout=5)
+
+    def export_cookies(self):
+        """Session cookies after login, so testers can reuse the authenticated session."""
+        if self.session_manager and self.site:
+            return self.session_manager.cookies(self.site, self.role)
+        return self.session.cookies.get_dict()
+
     def extract_links(self, soup, current_url):
         links = set()
         for tag in soup.find_all("a", href=True):
             abs_url = urljoin(current_url, tag["href"])
+            # following logout would end the shared session for every tester
+            if "logout" in abs_url.lower():
+                continue
             if abs_url.startswith(self.base_url):
                 links.add(abs_url)
         return list(links)
@@ -113,7 +84,7 @@ class SimpleCrawlerBS4:
             print(f"[CRAWL] {url}")
 
             try:
-                response = self.session.get(url, timeout=5)
+                response = self.get(url)
                 soup = BeautifulSoup(response.text, "html.parser")
 
                 page_data = {
@@ -154,7 +125,7 @@ class SimpleCrawlerBS4:
         for url in targets:
             try:
                 print(f"[CRAWL][SQLi] {url}")
-                r = self.session.get(url)
+                r = self.get(url)
                 soup = BeautifulSoup(r.text, "html.parser")
                 self.results.append({
                     "url": url,
@@ -181,7 +152,7 @@ class SimpleCrawlerBS4:
         for url in targets:
             try:
                 print(f"[CRAWL][XSS] {url}")
-                r = self.session.get(url)
+                r = self.get(url)
                 soup = BeautifulSoup(r.text, "html.parser")
                 self.results.append({
                     "url": url,
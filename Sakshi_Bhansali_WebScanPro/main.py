@@ -1,41 +1,59 @@
 import os
+import json
 from scanner.sql_injection_llm import SQLInjectionTesterLLM
 from scanner.xss_tester import XSSTester
 from scanner.auth_session_tester import AuthSessionTester
 from scanner.access_control_idor_tester import AccessControlIDORTester
-import subprocess
-import sys
+from scanner.access_matrix_tester import AccessMatrixTester
+from scanner.injection_registry import InjectionPointRegistry
+from scanner.session_manager import SessionManager
+from run_all_crawlers import run_all_crawlers
 
 def ensure_directories():
     """Make sure required folders exist."""
     os.makedirs("data", exist_ok=True)
 
-def run_crawlers():
+def run_crawlers(sessions=None):
     print("Running all crawlers...")
-    subprocess.run([sys.executable, "run_all_crawlers.py"])
+    run_all_crawlers(sessions)
     print("Crawler output saved to data/discovered_inputs.json")
 
-def run_sql_injection_tests():
-    tester = SQLInjectionTesterLLM()
+def build_injection_registry():
+    """One registry per scan, shared by the SQLi and XSS testers."""
+    with open("data/discovered_inputs.json", "r") as f:
+        registry = InjectionPointRegistry.from_crawl(json.load(f))
+    print(f"Injection points: {registry.summary()}")
+    return registry
+
+def run_sql_injection_tests(registry=None, sessions=None):
+    tester = SQLInjectionTesterLLM(registry=registry, session_manager=sessions)
     tester.run()
 
-def run_xss_tests():
+def run_xss_tests(registry=None, sessions=None):
     print("Running XSS Tests...")
-    tester = XSSTester()
+    tester = XSSTester(registry=registry, session_manager=sessions)
+    tester.run()
+
+def run_auth_session_tests(sessions=None):
+    tester = AuthSessionTester(session_manager=sessions)
     tester.run()
 
-def run_auth_session_tests():
-    tester = AuthSessionTester()
+def run_access_control_idor_tests(sessions=None):
+    tester = AccessControlIDORTester(session_manager=sessions)
     tester.run()
 
-def run_access_control_idor_tests():
-    tester = AccessControlIDORTester()
+def run_access_matrix_tests(sessions=None):
+    tester = AccessMatrixTester(session_manager=sessions)
     tester.run()
 
 if __name__ == "__main__":
     ensure_directories()
-    run_crawlers()
-    run_sql_injection_tests()
-    run_xss_tests()
-    run_auth_session_tests()
-    run_access_control_idor_tests()
\ No newline at end of file
+    # one manager for the whole run: every target logs in once, crawl included
+    sessions = SessionManager()
+    run_crawlers(sessions)
+    registry = build_injection_registry()
+    run_sql_injection_tests(registry, sessions)
+    run_xss_tests(registry, sessions)
+    run_auth_session_tests(sessions)
+    run_access_control_idor_tests(sessions)
+    run_access_matrix_tests(sessions)
\ No newline at end of file
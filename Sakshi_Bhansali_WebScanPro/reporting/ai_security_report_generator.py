@@ -6,6 +6,60 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import MinMaxScaler
 import numpy as np
 from datetime import datetime
+from string import Template
+
+try:
+    from reporting.html_stream import HTMLStreamWriter
+except ImportError:  # run as a script from the project root
+    from html_stream import HTMLStreamWriter
+
+REPORT_HEAD = Template("""<html>
+<head>
+    <title>WebScanPro Security Report</title>
+    <style>
+        body { font-family: Arial; margin: 40px; }
+        h1 { color: #b30000; }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { border: 1px solid #ccc; padding: 8px; }
+        th { background-color: #f2f2f2; }
+    </style>
+</head>
+<body>
+
+<h1>WebScanPro – AI Security Assessment Report</h1>
+<p><strong>Date:</strong> $date</p>
+
+<h2>Detected Vulnerabilities</h2>
+""")
+
+# written after the table: the severity counts come from the same pass as the rows
+REPORT_SUMMARY = Template("""
+<h2>Executive Summary</h2>
+<p>$summary</p>
+""")
+
+TABLE_HEADER = """<tr>
+    <th>Vulnerability</th>
+    <th>Affected Endpoint</th>
+    <th>Severity</th>
+    <th>Risk Score</th>
+    <th>Suggested Mitigation</th>
+</tr>
+"""
+
+REPORT_ROW = Template("""<tr>
+    <td>$type</td>
+    <td>$endpoint</td>
+    <td>$ai_severity</td>
+    <td>$risk_score</td>
+    <td>$recommendation</td>
+</tr>
+""")
+
+REPORT_FOOT = """
+</body>
+</html>
+"""
 
 
 class AISecurityReportGenerator:
@@ -15,7 +69,8 @@ class AISecurityReportGenerator:
             "data/vulnerability_logs.json",
             "data/xss_results.json",
             "data/auth_session_results.json",
-            "data/access_control_findings.json"
+            "data/access_control_findings.json",
+            "data/access_matrix_findings.json"
         ]
 
         self.output_json = "reports/security_report_data.json"
@@ -31,9 +86,13 @@ class AISecurityReportGenerator:
             "dom-xss": "Cross-Site Scripting (XSS)",
 
             "Weak / Default Credentials": "Authentication Misconfiguration",
+            "No Brute-force Protection": "Authentication Misconfiguration",
             "Session Fixation": "Session Management Vulnerability",
 
-            "Insecure Direct Object Reference (IDOR)": "Insecure Direct Object Reference (IDOR)"
+            "Insecure Direct Object Reference (IDOR)": "Insecure Direct Object Reference (IDOR)",
+
+            "Vertical Privilege Escalation": "Broken Access Control",
+            "Horizontal Privilege Escalation": "Broken Access Control"
         }
 
         self.DEFAULT_MITIGATIONS = {
@@ -58,16 +117,31 @@ class AISecurityReportGenerator:
                 "Bind objects to authenticated user identity. "
                 "Use indirect object references. "
                 "Implement RBAC or ABAC policies."
+            ),
+            "Broken Access Control": (
+                "Check the caller's role on every request server-side. "
+                "Deny by default and allow per role. "
+                "Bind object access to the authenticated user."
             )
         }
 
+    def load_json_or_jsonl(self, path):
+        # vulnerability_logs.json is streamed as JSONL by the SQLi tester
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+        try:
+            data = json.loads(text)
+            # a JSONL file with a single finding parses as one object
+            return [data] if isinstance(data, dict) else data
+        except json.JSONDecodeError:
+            return [json.loads(line) for line in text.splitlines() if line.strip()]
+
     def load_results(self):
         for file in self.input_files:
             if os.path.exists(file):
-                with open(file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        self.vulnerabilities.extend(data)
+                data = self.load_json_or_jsonl(file)
+                if isinstance(data, list):
+                    self.vulnerabilities.extend(data)
 
     def normalize_vulnerabilities(self):
         normalized = []
@@ -156,9 +230,10 @@ class AISecurityReportGenerator:
         for i, v in enumerate(self.vulnerabilities):
             v["risk_score"] = int(scaled[i][0])
 
-    def generate_executive_summary(self):
-        count = len(self.vulnerabilities)
-        sev_counts = Counter(v["ai_severity"] for v in self.vulnerabilities)
+    def generate_executive_summary(self, sev_counts=None):
+        if sev_counts is None:
+            sev_counts = Counter(v["ai_severity"] for v in self.vulnerabilities)
+        count = sum(sev_counts.values())
 
         return (
             f"This security assessment identified {count} vulnerabilities across the application. "
@@ -170,59 +245,19 @@ class AISecurityReportGenerator:
         with open(self.output_json, "w", encoding="utf-8") as f:
             json.dump(self.vulnerabilities, f, indent=4)
 
-    def export_html(self):
-        summary = self.generate_executive_summary()
-        rows = ""
+    def export_html(self, compress=False, vulnerabilities=None):
+        """Streams `vulnerabilities` (default self.vulnerabilities; any iterable, read once) to the HTML report."""
+        path = self.output_html + (".gz" if compress else "")
+        rows = self.vulnerabilities if vulnerabilities is None else vulnerabilities
 
-        for v in self.vulnerabilities:
-            rows += f"""
-            <tr>
-                <td>{v['type']}</td>
-                <td>{v['endpoint']}</td>
-                <td>{v['ai_severity']}</td>
-                <td>{v['risk_score']}</td>
-                <td>{v['recommendation']}</td>
-            </tr>
-            """
-
-        html = f"""
-        <html>
-        <head>
-            <title>WebScanPro Security Report</title>
-            <style>
-                body {{ font-family: Arial; margin: 40px; }}
-                h1 {{ color: #b30000; }}
-                table {{ width: 100%; border-collapse: collapse; }}
-                th, td {{ border: 1px solid #ccc; padding: 8px; }}
-                th {{ background-color: #f2f2f2; }}
-            </style>
-        </head>
-        <body>
-
-        <h1>WebScanPro – AI Security Assessment Report</h1>
-        <p><strong>Date:</strong> {datetime.now().strftime('%Y-%m-%d')}</p>
-
-        <h2>Executive Summary</h2>
-        <p>{summary}</p>
-
-        <h2>Detected Vulnerabilities</h2>
-        <table>
-            <tr>
-                <th>Vulnerability</th>
-                <th>Affected Endpoint</th>
-                <th>Severity</th>
-                <th>Risk Score</th>
-                <th>Suggested Mitigation</th>
-            </tr>
-            {rows}
-        </table>
-
-        </body>
-        </html>
-        """
-
-        with open(self.output_html, "w", encoding="utf-8") as f:
-            f.write(html)
+        with HTMLStreamWriter(path, compress=compress) as out:
+            out.write(REPORT_HEAD, {"date": datetime.now().strftime('%Y-%m-%d')})
+            sev_counts = out.table(TABLE_HEADER, REPORT_ROW, rows, page_size=500,
+                                   tally=lambda v: v["ai_severity"])
+            out.write(REPORT_SUMMARY, {"summary": self.generate_executive_summary(sev_counts)})
+            out.raw(REPORT_FOOT)
+
+        return path
 
     def run(self):
         print("Generating AI Security Report (Week 7)")
@@ -1,150 +1,71 @@
 import json
-import requests
-from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
 import os
 
+from scanner.idor_engine import IDOREngine, find_id_slots
+from scanner.session_manager import SessionManager
+
 
 class AccessControlIDORTester:
 
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, session_manager=None, id_range=range(1, 51), max_requests=1000, rate=20):
+        self.sessions = session_manager or SessionManager()
+        self.id_range = id_range
+        self.max_requests = max_requests
+        self.rate = rate
         self.findings = []
         self.debug_logs = []
 
         self.output_file = "data/access_control_findings.json"
         self.debug_file = "data/access_control_debug.log"
 
-        self.dvwa_user = os.getenv("DVWA_USER", "admin")
-        self.dvwa_pass = os.getenv("DVWA_PASS", "password")
-
-        self.bwapp_user = os.getenv("BWAPP_USER", "bee")
-        self.bwapp_pass = os.getenv("BWAPP_PASS", "bug")
-
     def debug(self, msg):
         print(msg)
         self.debug_logs.append(msg)
 
-    # Authentication
-    def login_dvwa_bwapp(self):
-        try:
-            # DVWA
-            dvwa_login = "http://localhost/login.php"
-            r = self.session.get(dvwa_login, timeout=5)
-            soup = BeautifulSoup(r.text, "html.parser")
-            token = soup.find("input", {"name": "user_token"})
-
-            data = {
-                "username": self.dvwa_user,
-                "password": self.dvwa_pass,
-                "Login": "Login"
-            }
-            if token:
-                data["user_token"] = token.get("value")
-
-            self.session.post(dvwa_login, data=data, timeout=5)
-            self.session.cookies.set("security", "low", domain="localhost", path="/")
-            self.debug("[LOGIN] DVWA authenticated")
-
-            # bWAPP
-            self.session.post(
-                "http://localhost:8080/login.php",
-                data={
-                    "login": self.bwapp_user,
-                    "password": self.bwapp_pass,
-                    "form": "submit"
-                },
-                timeout=5
-            )
-            self.debug("[LOGIN] bWAPP authenticated")
-
-        except Exception as e:
-            self.debug(f"[LOGIN ERROR] {e}")
-
-    # IDOR PARAMETER MANIPULATION
-    def mutate_id_param(self, url):
-        parsed = urlparse(url)
-        qs = parse_qs(parsed.query)
-
-        if "id" not in qs:
-            return None
-
-        original_id = qs["id"][0]
-        mutated_urls = []
-
-        for test_id in ["1", "2", "3", "999"]:
-            if test_id != original_id:
-                qs["id"] = test_id
-                new_query = urlencode(qs, doseq=True)
-                mutated_urls.append(
-                    urlunparse(parsed._replace(query=new_query))
-                )
-
-        return mutated_urls
-
-    # IDOR DETECTION LOGIC
-    def detect_idor(self, baseline, injected):
-        baseline_lower = baseline.lower()
-        injected_lower = injected.lower()
-
-        baseline_count = baseline_lower.count("first name")
-        injected_count = injected_lower.count("first name")
-
-        if injected_count > baseline_count:
-            return True
+    def collect_targets(self, path="data/discovered_inputs.json"):
+        targets = [
+            "http://localhost/vulnerabilities/sqli/?id=1&Submit=Submit",
+            "http://localhost/vulnerabilities/fi/?page=include.php",
+            "http://localhost:8080/userinfo.php?id=1"
+        ]
 
-        if baseline != injected:
-            return True
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for pages in json.load(f).values():
+                    for page in pages:
+                        for url in [page["url"]] + [urljoin(page["url"], l) for l in page.get("links", [])]:
+                            if url not in targets and find_id_slots(url):
+                                targets.append(url)
 
-        return False
+        return targets
 
     def run(self):
         print("\n=== Access Control & IDOR Tester ===\n")
 
-        self.login_dvwa_bwapp()
-
-        test_targets = [
-            "http://localhost/vulnerabilities/sqli/?id=1&Submit=Submit",
-            "http://localhost/vulnerabilities/fi/?page=include.php",
-            "http://localhost:8080/userinfo.php?id=1"
-        ]
+        # DVWA and bWAPP share "localhost", so each site is swept with its own session
+        by_site = {}
+        for url in self.collect_targets():
+            self.debug(f"[TEST] {url} slots={find_id_slots(url)}")
+            by_site.setdefault(self.sessions.site_for_url(url), []).append(url)
+
+        budget = self.max_requests
+        for site, urls in by_site.items():
+            self.debug(f"[LOGIN] {site or 'unauthenticated'}: {len(urls)} target(s)")
+
+            engine = IDOREngine(
+                id_range=self.id_range,
+                max_requests=budget,
+                rate=self.rate,
+                session_manager=self.sessions if site else None,
+                site=site
+            )
+            for vuln in engine.run(urls):
+                self.findings.append(vuln)
+                self.debug(f"[VULN] {vuln['original_url']} {vuln['parameter']} -> {vuln['accessible_count']} ids ({vuln['fingerprint']})")
+            budget -= engine.requests_made
 
-        for url in test_targets:
-            self.debug(f"[TEST] {url}")
-
-            try:
-                baseline = self.session.get(url, timeout=6).text
-            except Exception:
-                continue
-
-            mutated_urls = self.mutate_id_param(url)
-            if not mutated_urls:
-                continue
-
-            for test_url in mutated_urls:
-                try:
-                    r = self.session.get(test_url, timeout=6)
-
-                    if self.detect_idor(baseline, r.text):
-                        vuln = {
-                            "issue": "Insecure Direct Object Reference (IDOR)",
-                            "url": test_url,
-                            "original_url": url,
-                            "impact": "Unauthorized access to another user's data",
-                            "severity": "High",
-                            "recommendation": [
-                                "Enforce server-side authorization checks",
-                                "Bind objects to authenticated user identity",
-                                "Use indirect object references",
-                                "Implement RBAC or ABAC policies"
-                            ]
-                        }
-                        self.findings.append(vuln)
-                        self.debug(f"[VULN] {vuln}")
-                        break
-
-                except Exception:
-                    pass
+        self.debug(f"[BUDGET] {self.max_requests - budget}/{self.max_requests} requests used")
 
         with open(self.output_file, "w", encoding="utf-8") as f:
             json.dump(self.findings, f, indent=4)
@@ -0,0 +1,197 @@
+# scanner/access_matrix_tester.py
+import asyncio
+import hashlib
+import itertools
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlparse
+
+from scanner.async_executor import AsyncRequestExecutor
+from scanner.idor_engine import find_id_slots
+from scanner.session_manager import SessionManager, ROLE_LEVELS
+
+# Replaying these under a logged-in role would end or reset its session
+UNSAFE_PATH_RE = re.compile(r"logout|setup|reset|delete|security\.php|password", re.I)
+ADMIN_PATH_RE = re.compile(r"admin|administration|setup|config|phpinfo|users?\b|manage", re.I)
+TOKEN_RE = re.compile(r"\w+")
+LOGIN_FORM_RE = re.compile(r"type=[\"']?password", re.I)
+
+SIMILAR = 0.9
+
+
+def simhash(text):
+    """64-bit SimHash over word tokens: near-identical pages differ in only a few bits."""
+    weights = [0] * 64
+    for token in set(TOKEN_RE.findall(text.lower())):
+        h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def similarity(a, b):
+    return 1.0 - bin(a ^ b).count("1") / 64.0
+
+
+def role_level(role):
+    if role in ROLE_LEVELS:
+        return ROLE_LEVELS[role]
+    # "user2", "admin_b" etc. share the level of their base role
+    return ROLE_LEVELS.get(re.sub(r"([_-][a-z0-9]+|\d+)$", "", role), ROLE_LEVELS["user"])
+
+
+class AccessMatrixTester:
+    """
+    Replays every discovered endpoint once per role (anonymous, user, admin),
+    builds an endpoint x role matrix and flags escalation where a lower role
+    gets the same response as a role that should be required.
+    """
+
+    def __init__(self, session_manager=None, discovered_inputs_path="data/discovered_inputs.json",
+                 max_concurrency=20, per_host=5):
+        self.sessions = session_manager or SessionManager()
+        self.discovered_inputs_path = discovered_inputs_path
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.output_file = "data/access_matrix.json"
+        self.findings_file = "data/access_matrix_findings.json"
+        self.matrix = {}
+        self.findings = []
+
+    def collect_endpoints(self):
+        with open(self.discovered_inputs_path, "r", encoding="utf-8") as f:
+            inputs = json.load(f)
+
+        endpoints = {}
+        for site, pages in inputs.items():
+            if site not in self.sessions.sites:
+                continue
+            base = self.sessions.sites[site]["base_url"]
+            urls = set()
+            for page in pages:
+                for url in [page["url"]] + [urljoin(page["url"], l) for l in page.get("links", [])]:
+                    if url.startswith(base) and not UNSAFE_PATH_RE.search(urlparse(url).path):
+                        urls.add(url.split("#")[0])
+            endpoints[site] = sorted(urls)
+        return endpoints
+
+    def login_all(self, sites):
+        """Logs every (site, role) in concurrently before the replay starts."""
+        keys = [(site, role) for site in sites for role in self.sessions.roles(site)]
+        with ThreadPoolExecutor(max_workers=max(1, len(keys))) as ex:
+            list(ex.map(lambda k: self.sessions.session(*k), keys))
+
+    async def _fetch(self, executor, site, role, url):
+        try:
+            # through the session manager, so a role whose session expires mid-run logs in again
+            status, body = await self.sessions.fetch(executor, site, role, "GET", url)
+        except Exception as e:
+            return {"status": None, "error": str(e)[:100]}
+
+        return {
+            "status": status,
+            "length": len(body),
+            "simhash": simhash(body),
+            "login_page": bool(LOGIN_FORM_RE.search(body))
+        }
+
+    def is_denied(self, cell, url):
+        if cell["status"] is None:
+            return True
+        if cell["status"] in (401, 403, 404) or 300 <= cell["status"] < 400:
+            return True
+        return cell["login_page"] and "login" not in url.lower()
+
+    def required_level(self, url, row):
+        if ADMIN_PATH_RE.search(urlparse(url).path):
+            return ROLE_LEVELS["admin"]
+        if self.is_denied(row["anonymous"], url):
+            return ROLE_LEVELS["user"]
+        return ROLE_LEVELS["anonymous"]
+
+    def analyse(self, site, url, row):
+        required = self.required_level(url, row)
+        allowed = {r: c for r, c in row.items() if not self.is_denied(c, url)}
+
+        for low, low_cell in allowed.items():
+            for high, high_cell in allowed.items():
+                if not role_level(low) < required <= role_level(high):
+                    continue
+                sim = similarity(low_cell["simhash"], high_cell["simhash"])
+                if sim >= SIMILAR:
+                    self.findings.append({
+                        "issue": "Vertical Privilege Escalation",
+                        "site": site,
+                        "url": url,
+                        "role": low,
+                        "matches_role": high,
+                        "similarity": round(sim, 3),
+                        "severity": "High",
+                        "impact": f"'{low}' receives the same response as '{high}'"
+                    })
+                    break
+
+        if not find_id_slots(url):
+            return
+        for a, b in itertools.combinations(sorted(allowed), 2):
+            if role_level(a) != role_level(b) or role_level(a) < ROLE_LEVELS["user"]:
+                continue
+            sim = similarity(allowed[a]["simhash"], allowed[b]["simhash"])
+            if sim >= SIMILAR:
+                self.findings.append({
+                    "issue": "Horizontal Privilege Escalation",
+                    "site": site,
+                    "url": url,
+                    "role": a,
+                    "matches_role": b,
+                    "similarity": round(sim, 3),
+                    "severity": "High",
+                    "impact": "Two accounts at the same level see the same object"
+                })
+
+    def horizontal_pairs(self, site):
+        """Same-level logged-in role pairs the horizontal check can compare."""
+        roles = [r for r in self.sessions.roles(site) if role_level(r) >= ROLE_LEVELS["user"]]
+        return [(a, b) for a, b in itertools.combinations(roles, 2) if role_level(a) == role_level(b)]
+
+    async def run_async(self, endpoints):
+        async with AsyncRequestExecutor(self.max_concurrency, self.per_host) as executor:
+            jobs = [
+                (site, url, role)
+                for site, urls in endpoints.items()
+                for url in urls
+                for role in self.sessions.roles(site)
+            ]
+            cells = await asyncio.gather(*[
+                self._fetch(executor, site, role, url) for site, url, role in jobs
+            ])
+
+        for (site, url, role), cell in zip(jobs, cells):
+            self.matrix.setdefault(site, {}).setdefault(url, {})[role] = cell
+
+    def run(self):
+        print("\n=== Multi-role Access Control Matrix ===\n")
+
+        endpoints = self.collect_endpoints()
+        self.login_all(endpoints.keys())
+        for site in endpoints:
+            if not self.horizontal_pairs(site):
+                print(f"[MATRIX] {site}: horizontal escalation check skipped "
+                      f"(needs two accounts at the same level in SITES['{site}']['roles'])")
+        print(f"[MATRIX] {sum(len(u) for u in endpoints.values())} endpoints x roles {[self.sessions.roles(s) for s in endpoints]}")
+
+        asyncio.run(self.run_async(endpoints))
+
+        for site, rows in self.matrix.items():
+            for url, row in rows.items():
+                self.analyse(site, url, row)
+
+        with open(self.output_file, "w", encoding="utf-8") as f:
+            json.dump(self.matrix, f, indent=4)
+        with open(self.findings_file, "w", encoding="utf-8") as f:
+            json.dump(self.findings, f, indent=4)
+
+        print(f"✓ Matrix saved to {self.output_file}")
+        print(f"✓ Escalation findings: {len(self.findings)} -> {self.findings_file}")
+        return self.findings
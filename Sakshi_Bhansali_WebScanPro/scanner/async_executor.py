@@ -0,0 +1,93 @@
+# scanner/async_executor.py
+import asyncio
+import json
+import os
+from urllib.parse import urlparse
+
+import aiohttp
+
+
+class AsyncRequestExecutor:
+    """
+    Pooled async HTTP client shared by the testers.
+    - One aiohttp.ClientSession / TCPConnector for the whole run (keep-alive).
+    - Global concurrency limit plus a per-host limit (semaphore per netloc).
+    - Cookies are passed per request so DVWA and bWAPP (both on localhost)
+      never overwrite each other's PHPSESSID.
+    """
+
+    def __init__(self, max_concurrency=20, per_host=5, timeout=7):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.session = None
+        self._global_sem = None
+        self._host_sems = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.per_host
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            cookie_jar=aiohttp.DummyCookieJar()
+        )
+        self._global_sem = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self.session = None
+
+    def _host_sem(self, url):
+        host = urlparse(url).netloc
+        if host not in self._host_sems:
+            self._host_sems[host] = asyncio.Semaphore(self.per_host)
+        return self._host_sems[host]
+
+    async def fetch(self, method, url, params=None, data=None, cookies=None, allow_redirects=False):
+        """Returns (status, text). Raises on network errors."""
+        status, text, _ = await self.fetch_with_location(method, url, params, data, cookies, allow_redirects)
+        return status, text
+
+    async def fetch_with_location(self, method, url, params=None, data=None, cookies=None, allow_redirects=False):
+        """Like fetch(), plus the Location header ("" if none) so callers can spot login redirects."""
+        async with self._global_sem, self._host_sem(url):
+            async with self.session.request(
+                method.upper(),
+                url,
+                params=params,
+                data=data,
+                cookies=cookies,
+                allow_redirects=allow_redirects
+            ) as resp:
+                text = await resp.text(errors="replace")
+                return resp.status, text, resp.headers.get("Location", "")
+
+
+class JSONLWriter:
+    """Appends one JSON object per line and flushes, so results are visible mid-run."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.fh = open(path, "w", encoding="utf-8")
+        self.count = 0
+
+    def write(self, record):
+        self.fh.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.fh.flush()
+        self.count += 1
+
+    def close(self):
+        self.fh.close()
+
+
+def load_session_cookies(path="data/session_cookies.json"):
+    """Cookies saved by run_all_crawlers.py after login, keyed by site name."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
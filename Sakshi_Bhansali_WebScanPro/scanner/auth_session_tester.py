@@ -1,96 +1,67 @@
 import json
 import requests
 import os
-from bs4 import BeautifulSoup
+
+from scanner.credential_engine import CredentialEngine
+from scanner.session_manager import SessionManager
 
 
 class AuthSessionTester:
 
-    def __init__(self):
+    def __init__(self, session_manager=None,
+                 usernames="data/wordlists/usernames.txt",
+                 passwords="data/wordlists/passwords.txt"):
         self.session = requests.Session()
+        self.sessions = session_manager or SessionManager()
+        self.usernames = usernames
+        self.passwords = passwords
         self.results_file = "data/auth_session_results.json"
         self.findings = []
 
     def log(self, finding):
         self.findings.append(finding)
 
-    def test_default_credentials_dvwa(self):
-        url = "http://localhost/login.php"
-
-        creds = [
-            ("admin", "password"),
-            ("admin", "admin"),
-            ("test", "test")
-        ]
-
-        for user, pwd in creds:
-            s = requests.Session()
-            r = s.get(url)
-            soup = BeautifulSoup(r.text, "html.parser")
-            token = soup.find("input", {"name": "user_token"})
-
-            data = {
-                "username": user,
-                "password": pwd,
-                "Login": "Login"
-            }
+    def test_default_credentials(self, site):
+        engine = CredentialEngine(self.sessions, site)
 
-            if token:
-                data["user_token"] = token.get("value")
-
-            resp = s.post(url, data=data)
-
-            if "logout.php" in resp.text.lower():
-                self.log({
-                    "site": "DVWA",
-                    "issue": "Weak / Default Credentials",
-                    "username": user,
-                    "password": pwd,
-                    "severity": "High"
-                })
-                break
-
-    def test_default_credentials_bwapp(self):
-        url = "http://localhost:8080/login.php"
-
-        creds = [
-            ("bee", "bug"),
-            ("admin", "admin")
-        ]
-
-        for user, pwd in creds:
-            r = self.session.post(
-                url,
-                data={
-                    "login": user,
-                    "password": pwd,
-                    "security_level": "0",
-                    "form": "submit"
-                }
-            )
-
-            if "logout.php" in r.text.lower():
+        for hit in engine.run(self.usernames, self.passwords):
+            if hit.get("locked_out"):
                 self.log({
-                    "site": "bWAPP",
-                    "issue": "Weak / Default Credentials",
-                    "username": user,
-                    "password": pwd,
-                    "severity": "High"
+                    "site": site,
+                    "issue": "Account Lockout Triggered",
+                    "username": hit["username"],
+                    "attempts": hit["attempts"],
+                    "severity": "Info"
                 })
-                break
+                continue
+
+            self.log({
+                "site": site,
+                "issue": "Weak / Default Credentials",
+                "username": hit["username"],
+                "password": hit["password"],
+                "attempts": hit["attempts"],
+                "severity": "High"
+            })
+
+        if engine.attempts and not engine.lockouts:
+            self.log({
+                "site": site,
+                "issue": "No Brute-force Protection",
+                "attempts": engine.attempts,
+                "impact": "No lockout or rate limiting observed during credential testing",
+                "severity": "Medium"
+            })
 
     def test_session_fixation_dvwa(self):
-        url = "http://localhost/login.php"
+        url = self.sessions.sites["DVWA"]["login_url"]
+        username, password = self.sessions.sites["DVWA"]["roles"]["admin"]
 
-        s = requests.Session()
+        s = self.sessions.new_session()
         s.get(url)
         cookie_before = s.cookies.get_dict()
 
-        s.post(url, data={
-            "username": "admin",
-            "password": "password",
-            "Login": "Login"
-        })
+        self.sessions.attempt_login("DVWA", username, password, session=s)
 
         cookie_after = s.cookies.get_dict()
 
@@ -145,8 +116,8 @@ class AuthSessionTester:
     def run(self):
         print("\n=== Authentication & Session Testing ===\n")
 
-        self.test_default_credentials_dvwa()
-        self.test_default_credentials_bwapp()
+        for site in self.sessions.sites:
+            self.test_default_credentials(site)
         self.test_session_fixation_dvwa()
         self.test_cookie_flags()
         self.recommendations()
@@ -0,0 +1,146 @@
+# scanner/credential_engine.py
+import hashlib
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+LOCKOUT_RE = re.compile(
+    r"locked|too many (login )?attempts|try again (later|in)|temporarily (blocked|disabled)|captcha|rate limit",
+    re.I
+)
+RATE_LIMIT_STATUSES = (429, 503)
+
+
+def iter_wordlist(path_or_list):
+    """Yields non-empty, non-comment entries; files are streamed line by line."""
+    if isinstance(path_or_list, (list, tuple)):
+        yield from path_or_list
+        return
+    with open(path_or_list, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            word = line.rstrip("\r\n")
+            if word and not word.startswith("#"):
+                yield word
+
+
+def login_fingerprint(response):
+    """Where the login landed and what the page looks like, ignoring tokens and values."""
+    tags = " ".join(re.findall(r"<\s*([a-zA-Z][a-zA-Z0-9]*)", response.text))
+    return (
+        response.status_code,
+        urlparse(response.url).path,
+        hashlib.md5(tags.encode()).hexdigest()[:12]
+    )
+
+
+class CredentialEngine:
+    """
+    Tries username x password lists against one site's login form over plain HTTP.
+    - Accounts run in parallel; attempts on the same account are paced by `per_account_delay`.
+    - A single attempt with a random password calibrates the "failed login" fingerprint;
+      any attempt that lands elsewhere (and no longer shows a login form) is a success.
+    - Lockout / rate-limit responses back the account off exponentially; 429/503 also
+      pause every worker for Retry-After seconds.
+    """
+
+    def __init__(self, session_manager, site, max_workers=8, per_account_delay=0.5,
+                 max_attempts_per_account=200, max_backoff=60, max_lockouts=3):
+        self.sessions = session_manager
+        self.site = site
+        self.max_workers = max_workers
+        self.per_account_delay = per_account_delay
+        self.max_attempts_per_account = max_attempts_per_account
+        self.max_backoff = max_backoff
+        self.max_lockouts = max_lockouts
+
+        self.failure_fp = None
+        self.paused_until = 0.0
+        self.attempts = 0
+        self.lockouts = []
+        self._lock = threading.Lock()
+
+    def calibrate(self, username):
+        _, response = self.sessions.attempt_login(self.site, username, "x" + uuid.uuid4().hex)
+        self.failure_fp = login_fingerprint(response)
+        print(f"[CRED] {self.site} failed-login fingerprint: {self.failure_fp}")
+
+    def is_locked_out(self, response):
+        return response.status_code in RATE_LIMIT_STATUSES or bool(LOCKOUT_RE.search(response.text))
+
+    def is_success(self, response):
+        if self.is_locked_out(response):
+            return False
+        return login_fingerprint(response) != self.failure_fp and self.sessions.login_succeeded(response)
+
+    def _wait_global(self):
+        delay = self.paused_until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _pause_all(self, response):
+        try:
+            seconds = float(response.headers.get("Retry-After", 5))
+        except ValueError:
+            seconds = 5.0
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + min(seconds, self.max_backoff))
+
+    def test_account(self, username, passwords):
+        backoff = self.per_account_delay
+        lockouts = 0
+        tried = 0
+
+        for password in iter_wordlist(passwords):
+            if tried >= self.max_attempts_per_account:
+                break
+
+            while True:
+                self._wait_global()
+                try:
+                    _, response = self.sessions.attempt_login(self.site, username, password)
+                except Exception as e:
+                    print(f"[CRED][ERROR] {self.site} {username}: {e}")
+                    return None
+                with self._lock:
+                    self.attempts += 1
+
+                if not self.is_locked_out(response):
+                    break
+
+                lockouts += 1
+                if response.status_code in RATE_LIMIT_STATUSES:
+                    self._pause_all(response)
+                with self._lock:
+                    self.lockouts.append({"username": username, "status": response.status_code, "after_attempts": tried})
+                if lockouts > self.max_lockouts:
+                    print(f"[CRED] {self.site} {username}: still locked out, giving up on account")
+                    return {"username": username, "locked_out": True, "attempts": tried}
+
+                backoff = min(backoff * 2 or 1, self.max_backoff)
+                print(f"[CRED] {self.site} {username}: lockout/rate-limit detected, backing off {backoff:.1f}s")
+                time.sleep(backoff)
+
+            tried += 1
+            if self.is_success(response):
+                return {"username": username, "password": password, "attempts": tried}
+
+            time.sleep(self.per_account_delay)
+
+        return None
+
+    def run(self, usernames, passwords):
+        """Returns a list of hits: {"username", "password", "attempts"} (or "locked_out")."""
+        users = list(iter_wordlist(usernames))
+        if not users:
+            return []
+        if self.failure_fp is None:
+            self.calibrate(users[0])
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(users))) as ex:
+            results = list(ex.map(lambda u: self.test_account(u, passwords), users))
+
+        print(f"[CRED] {self.site}: {self.attempts} attempts, {len(self.lockouts)} lockout responses")
+        return [r for r in results if r]
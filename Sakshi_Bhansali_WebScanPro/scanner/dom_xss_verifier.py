@@ -0,0 +1,194 @@
+# scanner/dom_xss_verifier.py
+import queue
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Installed before any page script runs (CDP), so inline <script>alert()</script>
+# is caught without a modal blocking the driver.
+HOOK_JS = """
+window.__xssHits = [];
+(function () {
+    var record = function (kind) {
+        return function () {
+            window.__xssHits.push(kind + ':' + Array.prototype.join.call(arguments, ' '));
+        };
+    };
+    window.alert = record('alert');
+    window.confirm = record('confirm');
+    window.prompt = record('prompt');
+    var log = console.log;
+    console.log = function () {
+        record('console').apply(null, arguments);
+        return log.apply(console, arguments);
+    };
+})();
+"""
+
+# Each template lands in a different HTML/JS context; {c} is the canary token.
+CANARY_TEMPLATES = [
+    "<script>alert('{c}')</script>",
+    "\"><img src=x onerror=alert('{c}')>",
+    "'><svg/onload=alert('{c}')>",
+    "';alert('{c}');//",
+]
+
+SUBMIT_FORM_JS = """
+var fields = arguments[1];
+var form = document.createElement('form');
+form.method = 'POST';
+form.action = arguments[0];
+Object.keys(fields).forEach(function (name) {
+    var input = document.createElement('input');
+    input.type = 'hidden';
+    input.name = name;
+    input.value = fields[name];
+    form.appendChild(input);
+});
+document.body.appendChild(form);
+form.submit();
+"""
+
+
+class BrowserPool:
+    """A fixed set of warm headless Chrome instances, checked out one per verification."""
+
+    def __init__(self, size=2, cookies=None):
+        self.size = size
+        self.cookies = cookies or {}
+        self.browsers = queue.Queue()
+        self.all = []
+
+    def start(self):
+        opts = Options()
+        opts.add_argument("--headless=new")
+        opts.add_argument("--no-sandbox")
+        opts.add_argument("--disable-dev-shm-usage")
+        opts.add_argument("--disable-gpu")
+
+        for _ in range(self.size):
+            try:
+                driver = webdriver.Chrome(options=opts)
+            except Exception as e:
+                print(f"[WARNING] Selenium initialization failed: {e}")
+                break
+            driver.set_page_load_timeout(10)
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": HOOK_JS})
+            driver.execute_cdp_cmd("Network.enable", {})
+            self.all.append(driver)
+            self.browsers.put(driver)
+
+        return len(self.all)
+
+    def set_cookies(self, driver, url, site):
+        for name, value in self.cookies.get(site, {}).items():
+            driver.execute_cdp_cmd("Network.setCookie", {"name": name, "value": value, "url": url})
+
+    @contextmanager
+    def browser(self):
+        driver = self.browsers.get()
+        try:
+            yield driver
+        finally:
+            self.browsers.put(driver)
+
+    def close(self):
+        for driver in self.all:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self.all = []
+
+
+class DOMXSSVerifier:
+    """
+    Confirms reflected-XSS candidates in a real browser. Every candidate is
+    loaded once with all canary payloads packed into the parameter; a canary
+    counts as executed when it shows up in the alert/console hook.
+    """
+
+    def __init__(self, pool_size=2, cookies=None, timeout=3, settle=0.3):
+        self.pool = BrowserPool(pool_size, cookies)
+        self.timeout = timeout
+        self.settle = settle
+
+    def canaries(self):
+        token = "xss" + uuid.uuid4().hex[:8]
+        return {f"{token}_{i}": tpl for i, tpl in enumerate(CANARY_TEMPLATES)}
+
+    def _load(self, driver, candidate, value):
+        url = candidate["url"]
+        field = candidate["field"]
+
+        if candidate.get("method", "GET").upper() == "POST":
+            driver.get("about:blank")
+            driver.execute_script(SUBMIT_FORM_JS, url, {field: value})
+            WebDriverWait(driver, self.timeout).until(
+                lambda d: d.current_url != "about:blank"
+                and d.execute_script("return document.readyState") == "complete"
+            )
+            return
+
+        parsed = urlparse(url)
+        params = parse_qs(parsed.query)
+        params[field] = [value]
+        driver.get(urlunparse(parsed._replace(query=urlencode(params, doseq=True))))
+
+    def _wait_for_hits(self, driver):
+        """Until the first canary fires, or the page is complete and `settle` seconds passed without one."""
+        complete_at = None
+
+        def done(d):
+            nonlocal complete_at
+            state, hits = d.execute_script("return [document.readyState, (window.__xssHits || []).length]")
+            if hits:
+                return True
+            if state != "complete":
+                return False
+            complete_at = complete_at or time.monotonic()
+            return time.monotonic() - complete_at >= self.settle
+
+        try:
+            WebDriverWait(driver, self.timeout, poll_frequency=0.05).until(done)
+        except Exception:
+            pass
+
+    def verify(self, candidate):
+        """Returns the list of canary payloads that executed (empty if none)."""
+        canaries = self.canaries()
+        value = " ".join(tpl.format(c=c) for c, tpl in canaries.items())
+
+        with self.pool.browser() as driver:
+            try:
+                self.pool.set_cookies(driver, candidate["url"], candidate.get("site"))
+                self._load(driver, candidate, value)
+
+                self._wait_for_hits(driver)
+                hits = " ".join(driver.execute_script("return window.__xssHits || []"))
+            except Exception as e:
+                print(f"    [ERROR] DOM check failed: {e}")
+                return []
+
+        return [tpl.format(c=c) for c, tpl in canaries.items() if c in hits]
+
+    def run(self, candidates):
+        """Verifies candidates in parallel, one per pooled browser. Returns (candidate, fired) pairs."""
+        if not candidates:
+            return []
+        if not self.pool.start():
+            return []
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.pool.all)) as ex:
+                fired = list(ex.map(self.verify, candidates))
+        finally:
+            self.pool.close()
+
+        return [(c, f) for c, f in zip(candidates, fired) if f]
@@ -0,0 +1,201 @@
+# scanner/idor_engine.py
+import asyncio
+import hashlib
+import json
+import re
+import time
+from urllib.parse import urlparse, parse_qsl, urlencode, urlunparse
+
+from scanner.async_executor import AsyncRequestExecutor
+
+# "user_id", "uid", camelCase "userId" / "orderID" and user*/order*/... names; a bare "id"
+# suffix would also catch "paid", "valid", "grid", so camelCase is matched case-sensitively
+ID_PARAM_RE = re.compile(
+    r"(^|_|-)(id|uid|pid|no|num|key)$|(?-i:[a-z](Id|ID))$|^(user|account|order|basket|doc|file|invoice|item|profile)",
+    re.I
+)
+NUMERIC_RE = re.compile(r"^\d{1,12}$")
+NOT_ID_PARAMS = {"page", "limit", "offset", "size", "count", "per_page", "sort", "order_by", "lang", "security"}
+UUID_RE = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I)
+
+# Ids that should never exist; their responses define what "not found" looks like
+NEGATIVE_PROBE_IDS = ["0", "-1", "999999999", "xyzzy"]
+DENIED_STATUSES = (401, 403, 404, 410)
+
+
+def find_id_slots(url):
+    """Identifier-like query parameters and path segments: [(kind, key, value)]."""
+    parsed = urlparse(url)
+    slots = []
+
+    for name, value in parse_qsl(parsed.query, keep_blank_values=True):
+        if name.lower() in NOT_ID_PARAMS:
+            continue
+        if NUMERIC_RE.match(value) or UUID_RE.match(value) or (ID_PARAM_RE.search(name) and value):
+            slots.append(("query", name, value))
+
+    for index, segment in enumerate(parsed.path.split("/")):
+        if NUMERIC_RE.match(segment) or UUID_RE.match(segment):
+            slots.append(("path", index, segment))
+
+    return slots
+
+
+def with_id(url, slot, new_id):
+    parsed = urlparse(url)
+    kind, key, _ = slot
+
+    if kind == "query":
+        query = [(k, str(new_id) if k == key else v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)]
+        return urlunparse(parsed._replace(query=urlencode(query)))
+
+    segments = parsed.path.split("/")
+    segments[key] = str(new_id)
+    return urlunparse(parsed._replace(path="/".join(segments)))
+
+
+def _json_shape(obj):
+    if isinstance(obj, dict):
+        return {k: _json_shape(v) for k, v in sorted(obj.items())}
+    if isinstance(obj, list):
+        return [_json_shape(obj[0])] if obj else []
+    return type(obj).__name__
+
+
+def fingerprint(status, body):
+    """
+    Response template, not content: JSON key structure or the HTML tag sequence,
+    so different objects rendered by the same page share a fingerprint.
+    """
+    try:
+        skeleton = json.dumps(_json_shape(json.loads(body)), sort_keys=True)
+    except ValueError:
+        skeleton = " ".join(re.findall(r"<\s*([a-zA-Z][a-zA-Z0-9]*)", body))
+        if not skeleton:
+            skeleton = re.sub(r"\d+", "0", body.strip())[:2000]
+    return f"{status}:{hashlib.md5(skeleton.encode('utf-8', 'replace')).hexdigest()[:12]}"
+
+
+class RateLimiter:
+    """At most `rate` request starts per second (shared by all tasks)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_slot = 0.0
+        self.lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            delay = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class IDOREngine:
+    """
+    Sweeps identifier slots over an id range concurrently, clusters responses by
+    fingerprint and reports the clusters that are not the "not found / forbidden"
+    responses learned from negative probes. With a session manager and site,
+    requests go through SessionManager.fetch() (re-login on expiry); otherwise
+    the fixed `cookies` are sent.
+    """
+
+    def __init__(self, cookies=None, id_range=range(1, 51), max_requests=1000,
+                 max_concurrency=10, per_host=5, rate=20, session_manager=None, site=None, role="admin"):
+        self.cookies = cookies or {}
+        self.sessions = session_manager
+        self.site = site
+        self.role = role
+        self.id_range = id_range
+        self.max_requests = max_requests
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.rate = rate
+        self.requests_made = 0
+
+    def _take_budget(self):
+        if self.requests_made >= self.max_requests:
+            return False
+        self.requests_made += 1
+        return True
+
+    async def _fetch(self, executor, limiter, url):
+        if not self._take_budget():
+            return None
+        await limiter.wait()
+        try:
+            if self.sessions and self.site:
+                status, body = await self.sessions.fetch(executor, self.site, self.role, "GET", url)
+            else:
+                status, body = await executor.fetch("GET", url, cookies=self.cookies)
+        except Exception:
+            return None
+        return status, body
+
+    async def sweep_slot(self, executor, limiter, url, slot):
+        kind, key, original = slot
+
+        negatives = await asyncio.gather(*[
+            self._fetch(executor, limiter, with_id(url, slot, bad)) for bad in NEGATIVE_PROBE_IDS
+        ])
+        negative_fps = {fingerprint(*r) for r in negatives if r}
+
+        ids = [str(i) for i in self.id_range if str(i) != original]
+        responses = await asyncio.gather(*[
+            self._fetch(executor, limiter, with_id(url, slot, i)) for i in [original] + ids
+        ])
+        if not responses[0]:
+            return []
+
+        original_fp = fingerprint(*responses[0])
+        clusters = {}
+        for test_id, r in zip(ids, responses[1:]):
+            if not r:
+                continue
+            status, body = r
+            fp = fingerprint(status, body)
+            if status in DENIED_STATUSES or 300 <= status < 400 or fp in negative_fps:
+                continue
+            clusters.setdefault(fp, {"status": status, "ids": [], "sample_length": len(body)})["ids"].append(test_id)
+
+        findings = []
+        for fp, cluster in clusters.items():
+            same_as_own = fp == original_fp
+            findings.append({
+                "issue": "Insecure Direct Object Reference (IDOR)",
+                "url": with_id(url, slot, cluster["ids"][0]),
+                "original_url": url,
+                "parameter": key if kind == "query" else f"path[{key}]",
+                "accessible_ids": cluster["ids"][:20],
+                "accessible_count": len(cluster["ids"]),
+                "fingerprint": fp,
+                "status": cluster["status"],
+                "matches_original_object": same_as_own,
+                "impact": "Unauthorized access to another user's data",
+                "severity": "High" if same_as_own else "Medium",
+                "recommendation": [
+                    "Enforce server-side authorization checks",
+                    "Bind objects to authenticated user identity",
+                    "Use indirect object references",
+                    "Implement RBAC or ABAC policies"
+                ]
+            })
+        return findings
+
+    async def run_async(self, urls):
+        limiter = RateLimiter(self.rate)
+        targets = [(url, slot) for url in urls for slot in find_id_slots(url)]
+
+        async with AsyncRequestExecutor(self.max_concurrency, self.per_host) as executor:
+            results = await asyncio.gather(*[
+                self.sweep_slot(executor, limiter, url, slot) for url, slot in targets
+            ])
+
+        return [f for slot_findings in results for f in slot_findings]
+
+    def run(self, urls):
+        return asyncio.run(self.run_async(urls))
@@ -0,0 +1,139 @@
+# scanner/injection_registry.py
+import threading
+from urllib.parse import urljoin, urlparse, parse_qs, urlunparse
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+
+SKIP_INPUT_TYPES = ("submit", "button", "image", "reset")
+
+
+def normalize_action(page_url, action):
+    """Absolute action URL with lower-case host, no fragment, no query values, no trailing slash."""
+    if not action or action == "#":
+        action = page_url
+    parsed = urlparse(urljoin(page_url, action))
+
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = "&".join(sorted(parse_qs(parsed.query, keep_blank_values=True).keys()))
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, "", query, ""))
+
+
+class InjectionPoint:
+    """One form / URL parameter set, however many pages link to it."""
+
+    __slots__ = ("site", "method", "action", "url", "params", "inputs", "pages", "status")
+
+    def __init__(self, site, method, action, url, inputs):
+        self.site = site
+        self.method = method
+        self.action = action          # normalized, used for the key
+        self.url = url                # first absolute URL seen, used for requests
+        self.inputs = inputs          # tuple of (name, type)
+        self.params = tuple(sorted({name for name, _ in inputs}))
+        self.pages = 1
+        self.status = {}              # check name -> PENDING / RUNNING / DONE
+
+    @property
+    def key(self):
+        return (self.method, self.action, self.params)
+
+    def fields(self, skip_types=SKIP_INPUT_TYPES):
+        return [name for name, typ in self.inputs if (typ or "").lower() not in skip_types]
+
+    def to_dict(self):
+        return {
+            "site": self.site,
+            "method": self.method,
+            "url": self.url,
+            "params": list(self.params),
+            "pages": self.pages,
+            "status": dict(self.status)
+        }
+
+
+class InjectionPointRegistry:
+    """
+    Injection points built from data/discovered_inputs.json, keyed by
+    (method, normalized action, parameter set). Testers claim a point per
+    check, so each point is tested exactly once per scan even if the same
+    form is linked from hundreds of pages.
+    """
+
+    def __init__(self):
+        self.points = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_crawl(cls, inputs):
+        registry = cls()
+        for site_name, pages in inputs.items():
+            for page in pages:
+                page_url = page.get("url")
+                if not page_url:
+                    continue
+                registry.add_url(site_name, page_url)
+                for link in page.get("links", []):
+                    registry.add_url(site_name, urljoin(page_url, link))
+                for form in page.get("forms", []):
+                    registry.add_form(site_name, page_url, form)
+        return registry
+
+    def _add(self, site, method, action, url, inputs):
+        if not inputs:
+            return None
+        point = InjectionPoint(site, method, action, url, inputs)
+        existing = self.points.get(point.key)
+        if existing:
+            existing.pages += 1
+            return existing
+        self.points[point.key] = point
+        return point
+
+    def add_form(self, site, page_url, form):
+        method = (form.get("method") or "GET").upper()
+        action = form.get("action")
+        url = urljoin(page_url, action) if action and action != "#" else page_url
+        inputs = tuple(
+            (inp.get("name"), inp.get("type"))
+            for inp in form.get("inputs", [])
+            if inp.get("name")
+        )
+        return self._add(site, method, normalize_action(page_url, action), url, inputs)
+
+    def add_url(self, site, url):
+        params = parse_qs(urlparse(url).query, keep_blank_values=True)
+        inputs = tuple((name, "query") for name in params)
+        return self._add(site, "GET", normalize_action(url, url), url, inputs)
+
+    def claim(self, point, check):
+        """True if this caller should run `check` on `point`; marks it running."""
+        with self._lock:
+            if point.status.get(check, PENDING) != PENDING:
+                return False
+            point.status[check] = RUNNING
+            return True
+
+    def mark_done(self, point, check):
+        with self._lock:
+            point.status[check] = DONE
+
+    def pending(self, check):
+        return [p for p in self.points.values() if p.status.get(check, PENDING) == PENDING]
+
+    def forms(self):
+        return [p for p in self.points.values() if any(t != "query" for _, t in p.inputs)]
+
+    def url_params(self):
+        return [p for p in self.points.values() if all(t == "query" for _, t in p.inputs)]
+
+    def __len__(self):
+        return len(self.points)
+
+    def summary(self):
+        seen = sum(p.pages for p in self.points.values())
+        return f"{len(self.points)} unique injection points ({seen} occurrences in crawl)"
@@ -0,0 +1,201 @@
+# scanner/session_manager.py
+import asyncio
+import os
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+
+# Login recipes for the lab targets. Each role maps to (username, password);
+# "anonymous" never logs in. Roles named after a ROLE_LEVELS key plus a
+# suffix ("user2") share that role's level.
+SITES = {
+    "DVWA": {
+        "base_url": "http://localhost",
+        "login_url": "http://localhost/login.php",
+        "user_field": "username",
+        "pass_field": "password",
+        "token_field": "user_token",
+        "extra": {"Login": "Login"},
+        "cookies": {"security": "low"},
+        "roles": {
+            "admin": (os.getenv("DVWA_USER", "admin"), os.getenv("DVWA_PASS", "password")),
+            "user": (os.getenv("DVWA_LOW_USER", "gordonb"), os.getenv("DVWA_LOW_PASS", "abc123")),
+            # second account at the "user" level, for the horizontal escalation check
+            "user2": (os.getenv("DVWA_LOW_USER2", "pablo"), os.getenv("DVWA_LOW_PASS2", "letmein")),
+        }
+    },
+    "bWAPP": {
+        "base_url": "http://localhost:8080",
+        "login_url": "http://localhost:8080/login.php",
+        "user_field": "login",
+        "pass_field": "password",
+        "token_field": "token",
+        "extra": {"security_level": "0", "form": "submit"},
+        "cookies": {},
+        "roles": {
+            "admin": (os.getenv("BWAPP_USER", "bee"), os.getenv("BWAPP_PASS", "bug")),
+        }
+    }
+}
+
+ROLE_LEVELS = {"anonymous": 0, "user": 1, "admin": 2}
+
+LOGIN_FORM_RE = re.compile(r"<input[^>]+type=[\"']?password", re.I)
+LOGGED_IN_MARKERS = ("logout.php", "logout")
+
+
+class SessionManager:
+    """
+    Logs in once per (site, role) and hands out the authenticated
+    requests.Session / cookie dict to every crawler and tester.
+    - Sessions use a pooled HTTPAdapter and are safe to share across threads.
+    - Async code takes cookies() for the shared AsyncRequestExecutor.
+    - request()/fetch() detect an expired session (redirect to login, 401/403,
+      login form served instead of the page) and log in again transparently.
+      403 is not treated as expiry: it is the normal answer to a role that
+      lacks access, which the access-control testers need to see.
+    """
+
+    def __init__(self, sites=None, pool_size=20, min_relogin_interval=5.0):
+        self.sites = sites or SITES
+        self.pool_size = pool_size
+        self.min_relogin_interval = min_relogin_interval
+        self.sessions = {}
+        self.generations = {}
+        self.logged_in_at = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def roles(self, site):
+        return ["anonymous"] + list(self.sites[site]["roles"])
+
+    def site_for_url(self, url):
+        netloc = urlparse(url).netloc
+        for site, config in self.sites.items():
+            if urlparse(config["base_url"]).netloc == netloc:
+                return site
+        return None
+
+    def new_session(self):
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def attempt_login(self, site, username, password, session=None):
+        """One login attempt with a fresh CSRF token. Returns (session, response); never cached."""
+        config = self.sites[site]
+        session = session or self.new_session()
+
+        r = session.get(config["login_url"], timeout=5)
+        token = BeautifulSoup(r.text, "html.parser").find("input", {"name": config["token_field"]})
+
+        data = {config["user_field"]: username, config["pass_field"]: password}
+        data.update(config["extra"])
+        if token and token.get("value"):
+            data[config["token_field"]] = token["value"]
+
+        response = session.post(config["login_url"], data=data, timeout=5)
+        domain = urlparse(config["base_url"]).hostname
+        for name, value in config["cookies"].items():
+            session.cookies.set(name, value, domain=domain, path="/")
+        return session, response
+
+    def login_succeeded(self, response):
+        body = response.text.lower()
+        return any(marker in body for marker in LOGGED_IN_MARKERS) and not LOGIN_FORM_RE.search(body)
+
+    def _login(self, site, role):
+        if role == "anonymous":
+            return self.new_session()
+
+        username, password = self.sites[site]["roles"][role]
+        session, response = self.attempt_login(site, username, password)
+
+        if self.login_succeeded(response):
+            print(f"[SESSION] {site} logged in as {role} ({username})")
+        else:
+            print(f"[SESSION][WARN] {site} login as {role} ({username}) did not reach a logged-in page")
+        return session
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def session(self, site, role="admin"):
+        key = (site, role)
+        # one lock per (site, role) so different logins can run in parallel
+        with self._key_lock(key):
+            if key not in self.sessions:
+                self._store(key, self._login(site, role))
+            return self.sessions[key]
+
+    def _store(self, key, session):
+        self.sessions[key] = session
+        self.generations[key] = self.generations.get(key, 0) + 1
+        self.logged_in_at[key] = time.monotonic()
+
+    def cookies(self, site, role="admin"):
+        return self.session(site, role).cookies.get_dict()
+
+    def is_expired(self, site, role, url, status, body, location=""):
+        if role == "anonymous":
+            return False
+        login_url = self.sites[site]["login_url"]
+        if url.split("?")[0] == login_url:
+            return False
+        if status == 401:
+            return True
+        if 300 <= status < 400 and "login" in (location or "").lower():
+            return True
+        return bool(LOGIN_FORM_RE.search(body or "")) and "logout" not in (body or "").lower()
+
+    def reauthenticate(self, site, role, seen_generation=None):
+        """
+        Logs in again unless another thread already did since `seen_generation`,
+        or the last login is under min_relogin_interval old (a page that always
+        serves a login form must not cause a login per request).
+        """
+        key = (site, role)
+        with self._key_lock(key):
+            if seen_generation is not None and self.generations.get(key) != seen_generation:
+                return self.sessions[key]
+            if key in self.sessions and time.monotonic() - self.logged_in_at[key] < self.min_relogin_interval:
+                return self.sessions[key]
+            print(f"[SESSION] {site}/{role} expired - logging in again")
+            self._store(key, self._login(site, role))
+            return self.sessions[key]
+
+    def request(self, site, role, method, url, **kwargs):
+        """requests-style call on the shared session, retried once after re-login if it expired."""
+        kwargs.setdefault("timeout", 7)
+        kwargs.setdefault("allow_redirects", False)
+
+        for attempt in range(2):
+            session = self.session(site, role)
+            generation = self.generations.get((site, role))
+            r = session.request(method, url, **kwargs)
+            if attempt or not self.is_expired(site, role, url, r.status_code, r.text, r.headers.get("Location")):
+                return r
+            self.reauthenticate(site, role, generation)
+        return r
+
+    async def fetch(self, executor, site, role, method, url, **kwargs):
+        """Async counterpart of request() on an AsyncRequestExecutor; returns (status, text)."""
+        key = (site, role)
+        for attempt in range(2):
+            # logging in blocks, so only go through a thread when there is no session yet
+            session = self.sessions.get(key) or await asyncio.to_thread(self.session, site, role)
+            generation = self.generations.get((site, role))
+            status, text, location = await executor.fetch_with_location(
+                method, url, cookies=session.cookies.get_dict(), **kwargs)
+            if attempt or not self.is_expired(site, role, url, status, text, location):
+                return status, text
+            await asyncio.to_thread(self.reauthenticate, site, role, generation)
+        return status, text
@@ -1,64 +1,111 @@
 # scanner/sql_injection_llm.py
+import asyncio
 import json
-import requests
 from ai.llm_engine import LLMEngine
+from scanner.async_executor import AsyncRequestExecutor, JSONLWriter, load_session_cookies
+from scanner.injection_registry import InjectionPointRegistry
+
+SQL_ERROR_MARKERS = ["sql", "syntax", "database", "mysql", "warning", "error in your sql"]
+
 
 class SQLInjectionTesterLLM:
 
-    def __init__(self):
+    def __init__(self, registry=None, max_concurrency=20, per_host=5, session_manager=None):
         self.llm = LLMEngine()
+        self.registry = registry
+        self.sessions = session_manager
+        self.cookies = {}
         self.logs_file = "data/vulnerability_logs.json"
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
 
     def load_inputs(self):
         with open("data/discovered_inputs.json", "r") as f:
             return json.load(f)
 
-    def test_sql_injection(self, url, field_name):
-        payloads = self.llm.generate_sql_payloads(url, field_name)
+    def is_sql_error(self, body):
+        body = body.lower()
+        return any(err in body for err in SQL_ERROR_MARKERS)
+
+    async def _request(self, executor, site, method, url, **kwargs):
+        """Through the session manager for known sites (re-login on expiry), else with the saved cookies."""
+        if self.sessions and site in self.sessions.sites:
+            return await self.sessions.fetch(executor, site, "admin", method, url, **kwargs)
+        return await executor.fetch(method, url, cookies=self.cookies.get(site), **kwargs)
+
+    async def _test_payload(self, executor, writer, method, url, field_name, payload, site):
+        print(f"Testing payload: {payload}")
+        data = {field_name: payload}
+        try:
+            if method == "POST":
+                status, text = await self._request(executor, site, "POST", url, data=data)
+            else:
+                status, text = await self._request(executor, site, "GET", url, params=data)
+        except Exception as e:
+            print(f"[!] Request failed: {e}")
+            return None
+
+        if not self.is_sql_error(text):
+            return None
+
+        print(f"[+] SQLi FOUND on {url} field={field_name}")
+        finding = {
+            "url": url,
+            "field": field_name,
+            "payload": payload,
+            "evidence": text[:800]
+        }
+        writer.write(finding)
+        return finding
+
+    async def test_sql_injection(self, executor, writer, method, url, field_name, site=None):
+        # the LLM client blocks; run it in a thread so other injection points keep going
+        payloads = await asyncio.to_thread(self.llm.generate_sql_payloads, url, field_name)
 
         if not payloads:
             print(f"[!] No payloads returned for {url} {field_name}")
             return []
 
-        found_vulns = []
+        results = await asyncio.gather(*[
+            self._test_payload(executor, writer, method, url, field_name, payload, site)
+            for payload in payloads
+        ])
+        return [r for r in results if r]
+
+    async def test_injection_point(self, executor, writer, point):
+        try:
+            results = await asyncio.gather(*[
+                self.test_sql_injection(executor, writer, point.method, point.url, field_name, point.site)
+                for field_name in point.fields()
+            ])
+        finally:
+            self.registry.mark_done(point, "sqli")
+        return [v for vulns in results for v in vulns]
+
+    async def run_async(self):
+        if self.registry is None:
+            self.registry = InjectionPointRegistry.from_crawl(self.load_inputs())
+        if self.sessions is None:
+            self.cookies = load_session_cookies()
+        print(f"[INFO] {self.registry.summary()}")
 
-        for payload in payloads:
-            print(f"Testing payload: {payload}")
-            try:
-                response = requests.get(url, params={field_name: payload}, allow_redirects=False, timeout=7)
-            except Exception as e:
-                print(f"[!] Request failed: {e}")
-                continue
+        points = [p for p in self.registry.pending("sqli") if self.registry.claim(p, "sqli")]
 
-            body = response.text.lower()
-            if any(err in body for err in ["sql", "syntax", "database", "mysql", "warning", "error in your sql"]):
-                print(f"[+] SQLi FOUND on {url} field={field_name}")
-                found_vulns.append({
-                    "url": url,
-                    "field": field_name,
-                    "payload": payload,
-                    "evidence": response.text[:800]
-                })
+        writer = JSONLWriter(self.logs_file)
+        try:
+            async with AsyncRequestExecutor(self.max_concurrency, self.per_host) as executor:
+                results = await asyncio.gather(*[
+                    self.test_injection_point(executor, writer, point)
+                    for point in points
+                ])
+        finally:
+            writer.close()
 
-        return found_vulns
+        return [v for vulns in results for v in vulns]
 
     def run(self):
-        inputs = self.load_inputs()
-        all_vulns = []
-
-        for site_name, items in inputs.items():
-            for item in items:
-                url = item.get("url")
-                for form in item.get("forms", []):
-                    for input_field in form.get("inputs", []):
-                        field_name = input_field.get("name")
-                        if not field_name:
-                            continue
-                        vulns = self.test_sql_injection(url, field_name)
-                        all_vulns.extend(vulns)
-
-        with open(self.logs_file, "w", encoding="utf-8") as f:
-            json.dump(all_vulns, f, indent=4, ensure_ascii=False)
+        all_vulns = asyncio.run(self.run_async())
 
         print("\n[✓] SQL Injection Testing Complete.")
-        print(f"[+] Logged vulnerabilities to {self.logs_file}")
+        print(f"[+] Logged {len(all_vulns)} vulnerabilities to {self.logs_file} (JSONL)")
+        return all_vulns
@@ -1,15 +1,14 @@
 # scanner/xss_tester.py 
 import json
-import time
 import traceback
-import requests
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
 
 from ai.llm_engine import LLMEngine
+from scanner.async_executor import load_session_cookies
+from scanner.dom_xss_verifier import DOMXSSVerifier
+from scanner.injection_registry import InjectionPointRegistry, normalize_action
+from scanner.session_manager import SessionManager
 
 STATIC_XSS_PAYLOADS = [
     "<script>alert(1)</script>",
@@ -23,7 +22,8 @@ STATIC_XSS_PAYLOADS = [
 
 
 class XSSTester:
-    def __init__(self, discovered_inputs_path="data/discovered_inputs.json"):
+    def __init__(self, discovered_inputs_path="data/discovered_inputs.json", registry=None, browser_pool_size=2,
+                 session_manager=None):
 
         self.discovered_inputs_path = discovered_inputs_path
 
@@ -33,30 +33,22 @@ class XSSTester:
             print(f"[WARNING] LLM initialization failed: {e}")
             self.llm_engine = None
 
-        chrome_opts = Options()
-        chrome_opts.add_argument("--headless")
-        chrome_opts.add_argument("--no-sandbox")
-        chrome_opts.add_argument("--disable-dev-shm-usage")
-        chrome_opts.add_argument("--disable-gpu")
-
-        try:
-            self.browser = webdriver.Chrome(options=chrome_opts)
-        except Exception as e:
-            print(f"[WARNING] Selenium initialization failed: {e}")
-            self.browser = None
+        # Browsers are only started if the HTTP pass finds something to verify
+        self.browser_pool_size = browser_pool_size
 
         with open(self.discovered_inputs_path, "r", encoding="utf-8") as f:
             self.targets = json.load(f)
 
+        # shared with the SQLi tester when run from main.py
+        self.registry = registry or InjectionPointRegistry.from_crawl(self.targets)
+        # shared authenticated sessions (re-login on expiry); sites it does not know get a pooled anonymous one
+        self.sessions = session_manager or SessionManager()
+        self.anonymous = self.sessions.new_session()
+
         self.results = []
+        self.dom_candidates = []
         self.tests_run = 0
 
-    def normalize_action(self, page_url, action):
-        if not action or action == "#":
-            return page_url
-        return urljoin(page_url, action)
-
-
     def get_payloads(self):
         """Gets LLM payloads once, falls back to static."""
         if self.llm_engine:
@@ -75,6 +67,13 @@ class XSSTester:
         return STATIC_XSS_PAYLOADS
 
 
+    def _request(self, method, url, site=None, **kwargs):
+        if site not in self.sessions.sites:
+            site = self.sessions.site_for_url(url)
+        if site is None:
+            return self.anonymous.request(method, url, **kwargs)
+        return self.sessions.request(site, "admin", method, url, **kwargs)
+
     def reflected_in_response(self, response_text, payload):
         checks = [
             payload in response_text,
@@ -84,63 +83,65 @@ class XSSTester:
         return any(checks)
 
 
-    def check_dom_xss(self, url, payload):
-        if not self.browser:
-            return False
-            
-        try:
-            self.browser.get(url)
-            time.sleep(1)
+    def add_dom_candidate(self, url, field, method="GET", site=None):
+        """Queue a reflected injection point for browser verification (once per url/field)."""
+        candidate = {"url": url, "field": field, "method": method.upper(), "site": site}
+        if candidate not in self.dom_candidates:
+            self.dom_candidates.append(candidate)
 
-            dom = self.browser.page_source.lower()
-            payload_lower = payload.lower()
+    def verify_dom_candidates(self):
+        if not self.dom_candidates:
+            print("[DOM] No reflected candidates - skipping browser verification")
+            return
 
-            return (
-                payload_lower in dom or
-                payload.replace("<", "&lt;").replace(">", "&gt;").lower() in dom
-            )
-        except Exception as e:
-            print(f"    [ERROR] DOM check failed: {e}")
-            return False
+        print(f"[DOM] Verifying {len(self.dom_candidates)} reflected candidate(s) in {self.browser_pool_size} browser(s)")
+        verifier = DOMXSSVerifier(self.browser_pool_size, load_session_cookies())
 
+        for candidate, fired in verifier.run(self.dom_candidates):
+            self.results.append({
+                "url": candidate["url"],
+                "field": candidate["field"],
+                "method": candidate["method"],
+                "payload": fired[0],
+                "executed_payloads": fired,
+                "type": "dom-xss",
+                "evidence": "Payload executed in headless browser (alert/console hook)"
+            })
+            print(f"    ✓ EXECUTED in browser: {candidate['url']} [{candidate['field']}]")
 
-    def test_forms_from_dict(self, page_url, form_dict, payloads):
-        action = self.normalize_action(page_url, form_dict.get("action"))
-        method = form_dict.get("method", "GET").lower()
-        inputs = form_dict.get("inputs", [])
 
-        print(f"  [FORM] Action: {action}, Method: {method.upper()}")
+    def test_form_point(self, point, payloads):
+        action = point.url
+        method = point.method.lower()
 
-        for field in inputs:
-            name = field.get("name")
-            if not name or field.get("type") in ["submit", "button"]:
-                continue
+        print(f"  [FORM] Action: {action}, Method: {method.upper()} (seen on {point.pages} page(s))")
 
+        for name in point.fields():
             for payload in payloads[:3]:
+                self.tests_run += 1
                 data = {name: payload}
                 try:
                     if method == "post":
-                        r = requests.post(action, data=data, timeout=6)
+                        r = self._request("POST", action, point.site, data=data, timeout=6, allow_redirects=True)
                     else:
-                        r = requests.get(action, params=data, timeout=6)
+                        r = self._request("GET", action, point.site, params=data, timeout=6, allow_redirects=True)
 
                     if self.reflected_in_response(r.text, payload):
-                        finding = (action, name, payload)
-                        if finding not in self.results:
-                            self.results.append({
-                                "url": action,
-                                "field": name,
-                                "payload": payload,
-                                "type": "reflected-xss",
-                                "evidence": r.text[:500]
-                            })
-                            print("      ✓ REFLECTED XSS FOUND")
+                        self.results.append({
+                            "url": action,
+                            "field": name,
+                            "payload": payload,
+                            "type": "reflected-xss",
+                            "evidence": r.text[:500]
+                        })
+                        print("      ✓ REFLECTED XSS FOUND")
+                        self.add_dom_candidate(action, name, point.method, point.site)
                         break
                 except Exception:
                     pass
 
 
-    def test_url_parameters(self, url, payloads):
+    def test_url_parameters(self, url, payloads, site=None):
         """Test URL GET parameters for XSS"""
         parsed = urlparse(url)
         
@@ -158,7 +159,7 @@ class XSSTester:
                     test_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{urlencode(test_params, doseq=True)}"
                     
                     try:
-                        resp = requests.get(test_url, timeout=6, allow_redirects=False)
+                        resp = self._request("GET", test_url, site, timeout=6, allow_redirects=False)
                         print(f"      Payload: {payload[:50]}... -> Status: {resp.status_code}")
                         
                         if self.reflected_in_response(resp.text, payload):
@@ -170,11 +171,14 @@ class XSSTester:
                                 "evidence": resp.text[:500]
                             })
                             print(f"      ✓ REFLECTED XSS FOUND in URL param!")
+                            self.add_dom_candidate(url, param_name, "GET", site)
                             break
                             
                     except Exception as e:
                         print(f"      [ERROR] {str(e)[:100]}")
-        
+
+    def test_injected_parameter(self, url, payloads, site=None):
+        """Appends an extra xss_test parameter to catch pages that echo the whole query string."""
         for payload in payloads[:2]:  
             self.tests_run += 1
             if "?" in url:
@@ -183,7 +187,7 @@ class XSSTester:
                 test_url = f"{url}?xss_test={payload}"
             
             try:
-                resp = requests.get(test_url, timeout=6, allow_redirects=False)
+                resp = self._request("GET", test_url, site, timeout=6, allow_redirects=False)
                 
                 if self.reflected_in_response(resp.text, payload):
                     self.results.append({
@@ -194,6 +198,7 @@ class XSSTester:
                         "evidence": resp.text[:500]
                     })
                     print(f"    ✓ REFLECTED XSS FOUND in injected param!")
+                    self.add_dom_candidate(url, "xss_test", "GET", site)
                     break
                     
             except Exception as e:
@@ -209,41 +214,41 @@ class XSSTester:
         print(f"\n[PAYLOADS] Total: {len(payloads)}")
         print(f"[PAYLOADS] Sample: {payloads[:3]}\n")
 
-        total_pages = sum(len(pages) for pages in self.targets.values())
-        print(f"[TARGETS] Total pages to scan: {total_pages}\n")
+        print(f"[TARGETS] {self.registry.summary()}\n")
 
-        for target_name, pages in self.targets.items():
-            print(f"\n{'='*60}")
-            print(f"=== Scanning {target_name} ({len(pages)} pages) ===")
-            print(f"{'='*60}\n")
+        forms = self.registry.forms()
+        print(f"\n=== Testing {len(forms)} unique forms ===\n")
+        for point in forms:
+            if not self.registry.claim(point, "xss"):
+                continue
+            self.test_form_point(point, payloads)
+            self.registry.mark_done(point, "xss")
 
-            for idx, page in enumerate(pages, 1):
+        url_points = self.registry.url_params()
+        print(f"\n=== Testing {len(url_points)} unique URL parameter sets ===\n")
+        for point in url_points:
+            if not self.registry.claim(point, "xss"):
+                continue
+            print(f"\n[URL] {point.url}")
+            self.test_url_parameters(point.url, payloads, point.site)
+            self.registry.mark_done(point, "xss")
+
+        # Pages and their first links, probed once per normalized URL
+        probed = set()
+        for target_name, pages in self.targets.items():
+            for page in pages:
                 page_url = page["url"]
-                print(f"\n[{idx}/{len(pages)}] Page: {page_url}")
-
-                # Test URL parameters
-                self.test_url_parameters(page_url, payloads)
-
-                forms_data = page.get("forms", [])
-                if forms_data:
-                    print(f"  [FORMS] Found {len(forms_data)} form(s)")
-                    for form_idx, form_dict in enumerate(forms_data, 1):
-                        print(f"  [FORM {form_idx}]")
-                        self.test_forms_from_dict(page_url, form_dict, payloads)
-                else:
-                    print("  [FORMS] No forms found")
-
-               
-                links = page.get("links", [])
-                if links:
-                    print(f"  [LINKS] Found {len(links)} link(s) - testing URLs")
-                    for link in links[:5]:  
-                        self.test_url_parameters(urljoin(page_url, link), payloads)
-
-        if self.browser:
-            self.browser.quit()
-
-     
+                for url in [page_url] + [urljoin(page_url, l) for l in page.get("links", [])[:5]]:
+                    key = normalize_action(url, url)
+                    if key in probed:
+                        continue
+                    probed.add(key)
+                    self.test_injected_parameter(url, payloads, target_name)
+        print(f"[PROBE] Injected-parameter probe on {len(probed)} unique URLs")
+
+        # Browser stage only for what the HTTP reflection pass flagged
+        self.verify_dom_candidates()
+
         with open("data/xss_results.json", "w", encoding="utf-8") as f:
             json.dump(self.results, f, indent=4)
 
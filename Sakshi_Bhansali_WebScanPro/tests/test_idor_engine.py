@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("aiohttp")
+
+from scanner.idor_engine import ID_PARAM_RE, find_id_slots  # noqa: E402
+
+
+@pytest.mark.parametrize("name", ["id", "ID", "user_id", "doc-id", "uid", "pid", "order_no", "userId", "orderID",
+                                  "account", "basket"])
+def test_id_like_parameter_names(name):
+    assert ID_PARAM_RE.search(name)
+
+
+@pytest.mark.parametrize("name", ["paid", "valid", "grid", "void", "squid", "PAID", "q", "search"])
+def test_words_ending_in_id_are_not_id_parameters(name):
+    assert not ID_PARAM_RE.search(name)
+
+
+def test_find_id_slots_skips_non_id_text_parameters():
+    slots = find_id_slots("http://t/orders/42?paid=yes&userId=abc&page=3&q=x")
+    assert slots == [("query", "userId", "abc"), ("path", 2, "42")]
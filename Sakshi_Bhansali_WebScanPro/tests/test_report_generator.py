@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("sklearn")
+
+from reporting.ai_security_report_generator import AISecurityReportGenerator  # noqa: E402
+
+
+def test_export_html_streams_a_generator_and_summarises_after_the_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    generator = AISecurityReportGenerator()
+    findings = ({"type": "XSS", "endpoint": f"/p{i}<", "ai_severity": sev, "risk_score": 50,
+                 "recommendation": "encode"} for i, sev in enumerate(["High"] * 600 + ["Low"]))
+
+    path = generator.export_html(vulnerabilities=findings)
+
+    html = Path(path).read_text(encoding="utf-8")
+    assert html.count("<table>") == 2
+    assert "/p0&lt;" in html
+    assert "identified 601 vulnerabilities" in html
+    assert "Most common severity observed: High" in html
+    assert html.index("Detected Vulnerabilities") < html.index("Executive Summary")
@@ -0,0 +1,108 @@
+import asyncio
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+pytest.importorskip("requests")
+pytest.importorskip("bs4")
+
+from scanner.session_manager import SessionManager  # noqa: E402
+
+LOGIN_FORM = (b'<form method="post"><input name="username"><input type="password" name="password">'
+              b'<input type="hidden" name="user_token" value="tok"></form>')
+
+
+class FakeApp(BaseHTTPRequestHandler):
+    """Login page plus one protected page; expire() invalidates every issued session id."""
+    valid = set()
+    logins = 0
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _sid(self):
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "PHPSESSID":
+                return value
+        return None
+
+    def do_GET(self):
+        if self.path.startswith("/login.php"):
+            return self._send(200, LOGIN_FORM)
+        if self._sid() in self.valid:
+            return self._send(200, b'<a href="logout.php">Logout</a> secret page')
+        return self._send(302, headers=[("Location", "login.php")])
+
+    def do_POST(self):
+        with self.lock:
+            FakeApp.logins += 1
+            sid = f"s{FakeApp.logins}"
+            self.valid.add(sid)
+        self._send(200, b'<a href="logout.php">Logout</a>', [("Set-Cookie", f"PHPSESSID={sid}; Path=/")])
+
+
+@pytest.fixture
+def app():
+    FakeApp.valid = set()
+    FakeApp.logins = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeApp)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    sites = {"Lab": {
+        "base_url": base, "login_url": f"{base}/login.php", "user_field": "username",
+        "pass_field": "password", "token_field": "user_token", "extra": {},
+        "cookies": {"security": "low"}, "roles": {"admin": ("admin", "password")},
+    }}
+    yield SessionManager(sites, min_relogin_interval=0), base
+    server.shutdown()
+
+
+def test_expired_session_triggers_one_relogin_and_retry(app):
+    sessions, base = app
+    assert sessions.request("Lab", "admin", "GET", f"{base}/page").status_code == 200
+    assert FakeApp.logins == 1
+
+    FakeApp.valid.clear()
+    r = sessions.request("Lab", "admin", "GET", f"{base}/page")
+    assert r.status_code == 200 and "secret" in r.text
+    assert FakeApp.logins == 2
+
+
+def test_site_cookies_are_scoped_to_the_target_host(app):
+    sessions, _ = app
+    cookie = next(c for c in sessions.session("Lab").cookies if c.name == "security")
+    assert cookie.domain == "127.0.0.1" and cookie.path == "/"
+
+
+def test_async_fetch_relogs_in_once_for_concurrent_expired_requests(app):
+    pytest.importorskip("aiohttp")
+    from scanner.async_executor import AsyncRequestExecutor
+
+    sessions, base = app
+    sessions.session("Lab", "admin")
+    FakeApp.valid.clear()
+
+    async def run():
+        async with AsyncRequestExecutor() as executor:
+            return await asyncio.gather(*[
+                sessions.fetch(executor, "Lab", "admin", "GET", f"{base}/page") for _ in range(5)
+            ])
+
+    results = asyncio.run(run())
+    assert all(status == 200 and "secret" in text for status, text in results)
+    assert FakeApp.logins == 2
@@ -1,7 +1,16 @@
 import time
 import json
+import re
 import urllib.parse
+import urllib.request
+import urllib.error
+import uuid
+import itertools
+import gzip
+import html
+from string import Template
 import os
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -16,6 +25,119 @@ from selenium.common.exceptions import UnexpectedAlertPresentException, NoAlertP
 # ==========================================
 TARGET_URL = "http://localhost:3000"
 ADMIN_EMAIL = "admin@juice-sh.op"
+PASSWORD_LIST = "passwords.txt"   # one password per line; streamed, optional
+DEFAULT_PASSWORDS = ["admin123"]
+AUTH_WORKERS = 8
+RATE_LIMIT_STATUSES = (429, 503)
+# same lockout wording the credential engine backs off on
+LOCKOUT_RE = re.compile(
+    r"locked|too many (login )?attempts|try again (later|in)|temporarily (blocked|disabled)|captcha|rate limit",
+    re.I
+)
+
+# Report templates, compiled once; every substituted value is HTML-escaped
+REPORT_HEAD = Template("""
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <title>WebScanPro Security Report</title>
+            <style>
+                body { font-family: Arial, sans-serif; margin: 40px; background-color: #f4f4f4; }
+                .container { background-color: white; padding: 20px; border-radius: 8px; box-shadow: 0 0 10px rgba(0,0,0,0.1); }
+                h1 { color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; }
+                .summary { background-color: #ecf0f1; padding: 15px; border-radius: 5px; margin-bottom: 20px; }
+                table { width: 100%; border-collapse: collapse; margin-top: 20px; }
+                th, td { padding: 12px; border: 1px solid #ddd; text-align: left; }
+                th { background-color: #34495e; color: white; }
+                tr:nth-child(even) { background-color: #f9f9f9; }
+                .Critical { color: #c0392b; font-weight: bold; }
+                .High { color: #e67e22; font-weight: bold; }
+                .Medium { color: #f1c40f; font-weight: bold; }
+            </style>
+        </head>
+        <body>
+            <div class="container">
+                <h1>WebScanPro Vulnerability Report</h1>
+                <div class="summary">
+                    <p><strong>Target:</strong> $target</p>
+                    <p><strong>Scan Date:</strong> $scan_date</p>
+                    <p><strong>Total Vulnerabilities Found:</strong> $total</p>
+                </div>
+
+                <h2>Detailed Findings</h2>
+                <table>
+                    <thead>
+                        <tr>
+                            <th>Type</th>
+                            <th>Severity</th>
+                            <th>Location</th>
+                            <th>Description</th>
+                            <th>Suggested Mitigation</th>
+                        </tr>
+                    </thead>
+                    <tbody>
+""")
+
+REPORT_ROW = Template("""
+                        <tr>
+                            <td>$type</td>
+                            <td class="$severity">$severity</td>
+                            <td>$location</td>
+                            <td>$description</td>
+                            <td>$mitigation</td>
+                        </tr>
+""")
+
+REPORT_FOOT = """
+                    </tbody>
+                </table>
+            </div>
+        </body>
+        </html>
+"""
+
+
+def iter_passwords(path=PASSWORD_LIST):
+    if not os.path.exists(path):
+        yield from DEFAULT_PASSWORDS
+        return
+    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+        for line in f:
+            if line.strip():
+                yield line.rstrip("\r\n")
+
+
+def api_login(email, password):
+    """
+    Replays the Angular login form as a JSON POST. Returns (status, body, headers);
+    status is 0 when the request never got an HTTP answer (refused, timed out, ...).
+    """
+    req = urllib.request.Request(
+        f"{TARGET_URL}/rest/user/login",
+        data=json.dumps({"email": email, "password": password}).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST"
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=5) as r:
+            return r.status, r.read().decode("utf-8", "ignore"), r.headers
+    except urllib.error.HTTPError as e:
+        return e.code, e.read().decode("utf-8", "ignore"), e.headers
+    except (urllib.error.URLError, OSError) as e:
+        print(f"[-] Login request failed: {e}")
+        return 0, "", {}
+
+
+def is_locked_out(status, body):
+    return status in RATE_LIMIT_STATUSES or bool(LOCKOUT_RE.search(body))
+
+
+def login_token(body):
+    """authentication.token of a login response, or None for any other body."""
+    try:
+        return (json.loads(body).get("authentication") or {}).get("token")
+    except (ValueError, AttributeError):
+        return None
 
 
 class WebScanPro:
@@ -129,26 +251,67 @@ class WebScanPro:
 
     def module_auth_session(self):
         print("\n=== MODULE 4: AUTH & SESSION ===")
-        # Brute Force
-        passwords = ["admin123"]
-        self.driver.get(f"{TARGET_URL}/#/login")
-        time.sleep(1)
-        self.nuke_popups()
+        # Brute Force over the REST login API instead of typing into the browser.
+        # One request with a random password calibrates what "wrong password" looks like.
+        failure = api_login(ADMIN_EMAIL, uuid.uuid4().hex)[0]
+        passwords = iter_passwords()
+        found = None
+        backoff = 1
+        attempts = 0
+        errors = 0
+        throttled = False
 
-        for pwd in passwords:
-            try:
-                self.wait.until(EC.visibility_of_element_located((By.ID, "email"))).send_keys(ADMIN_EMAIL)
-                self.driver.find_element(By.ID, "password").send_keys(pwd)
-                self.driver.find_element(By.ID, "loginButton").click()
-                time.sleep(2)
-                if "login" not in self.driver.current_url:
-                    print(f"[!!!] SUCCESS: Weak Password Found: {pwd}")
-                    self.add_vuln("Weak Credentials", "High", "/#/login",
-                                  f"Admin password cracked: {pwd}",
-                                  "Enforce strong password complexity policies.")
+        with ThreadPoolExecutor(max_workers=AUTH_WORKERS) as pool:
+            while found is None:
+                batch = [p for _, p in zip(range(AUTH_WORKERS), passwords)]
+                if not batch:
                     break
-            except:
-                pass
+                results = list(pool.map(lambda p: (p, api_login(ADMIN_EMAIL, p)), batch))
+                attempts += len(batch)
+
+                retry = []
+                retry_after = None
+                for pwd, (status, body, headers) in results:
+                    if status == 0:
+                        errors += 1  # no answer: counted as a failed attempt
+                    elif is_locked_out(status, body):
+                        retry.append(pwd)
+                        retry_after = headers.get("Retry-After")
+                    elif status != failure and '"token"' in body:
+                        token = login_token(body)
+                        if token:
+                            found = (pwd, token)
+                            break
+
+                if retry and found is None:
+                    if backoff > 16:
+                        print("[*] Still rate limited / locked out, stopping brute force")
+                        break
+                    throttled = True
+                    delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff
+                    print(f"[*] Rate limited or locked out, backing off {delay}s")
+                    time.sleep(delay)
+                    backoff = min(backoff * 2, 60)
+                    passwords = itertools.chain(retry, passwords)
+                else:
+                    backoff = 1
+
+        print(f"[*] {attempts} login attempts ({errors} without response), "
+              f"rate limiting/lockout {'observed' if throttled else 'not observed'}")
+        if found:
+            pwd, token = found
+            print(f"[!!!] SUCCESS: Weak Password Found: {pwd}")
+            self.add_vuln("Weak Credentials", "High", "/#/login",
+                          f"Admin password cracked: {pwd}",
+                          "Enforce strong password complexity policies.")
+            # Hand the session to the browser so Module 5 runs logged in
+            self.driver.get(TARGET_URL)
+            self.driver.add_cookie({"name": "token", "value": token})
+            self.driver.execute_script("localStorage.setItem('token', arguments[0]);", token)
+        if not throttled and attempts - errors > 1:
+            self.add_vuln("No Brute-Force Protection", "Medium", "/rest/user/login",
+                          f"{attempts} rapid login attempts were accepted without lockout or rate limiting.",
+                          "Implement account lockout and rate limiting on login.")
 
     def module_idor(self):
         print("\n=== MODULE 5: IDOR (Week 6) ===")
@@ -176,7 +339,7 @@ class WebScanPro:
     # =====================================================
     # MODULE 7: REPORTING (New for Week 7)
     # =====================================================
-    def generate_reports(self):
+    def generate_reports(self, compress=False):
         print("\n=== MODULE 7: GENERATING SECURITY REPORT ===")
 
         # 1. JSON Report (Raw Data)
@@ -184,72 +347,22 @@ class WebScanPro:
             json.dump(self.vulnerabilities, f, indent=4)
         print("[+] JSON data saved.")
 
-        # 2. HTML Report (Professional View)
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>WebScanPro Security Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f4f4f4; }}
-                .container {{ background-color: white; padding: 20px; border-radius: 8px; box-shadow: 0 0 10px rgba(0,0,0,0.1); }}
-                h1 {{ color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; }}
-                .summary {{ background-color: #ecf0f1; padding: 15px; border-radius: 5px; margin-bottom: 20px; }}
-                table {{ width: 100%; border-collapse: collapse; margin-top: 20px; }}
-                th, td {{ padding: 12px; border: 1px solid #ddd; text-align: left; }}
-                th {{ background-color: #34495e; color: white; }}
-                tr:nth-child(even) {{ background-color: #f9f9f9; }}
-                .Critical {{ color: #c0392b; font-weight: bold; }}
-                .High {{ color: #e67e22; font-weight: bold; }}
-                .Medium {{ color: #f1c40f; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>WebScanPro Vulnerability Report</h1>
-                <div class="summary">
-                    <p><strong>Target:</strong> {TARGET_URL}</p>
-                    <p><strong>Scan Date:</strong> {self.scan_start_time}</p>
-                    <p><strong>Total Vulnerabilities Found:</strong> {len(self.vulnerabilities)}</p>
-                </div>
-
-                <h2>Detailed Findings</h2>
-                <table>
-                    <thead>
-                        <tr>
-                            <th>Type</th>
-                            <th>Severity</th>
-                            <th>Location</th>
-                            <th>Description</th>
-                            <th>Suggested Mitigation</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-        """
-
-        for vuln in self.vulnerabilities:
-            html_content += f"""
-                        <tr>
-                            <td>{vuln['type']}</td>
-                            <td class="{vuln['severity']}">{vuln['severity']}</td>
-                            <td>{vuln['location']}</td>
-                            <td>{vuln['description']}</td>
-                            <td>{vuln['mitigation']}</td>
-                        </tr>
-            """
-
-        html_content += """
-                    </tbody>
-                </table>
-            </div>
-        </body>
-        </html>
-        """
-
-        with open("security_report.html", "w") as f:
-            f.write(html_content)
+        # 2. HTML Report (Professional View), streamed row by row
+        path = "security_report.html.gz" if compress else "security_report.html"
+        opener = gzip.open if compress else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            f.write(REPORT_HEAD.substitute(
+                target=html.escape(TARGET_URL),
+                scan_date=html.escape(self.scan_start_time),
+                total=len(self.vulnerabilities)
+            ))
+            f.writelines(
+                REPORT_ROW.substitute({k: html.escape(str(v)) for k, v in vuln.items()})
+                for vuln in self.vulnerabilities
+            )
+            f.write(REPORT_FOOT)
 
-        print(f"[+] HTML Report generated: {os.path.abspath('security_report.html')}")
+        print(f"[+] HTML Report generated: {os.path.abspath(path)}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,72 @@
+# injection_registry.py - Shared injection-point registry for Week 3/4 testers
+from urllib.parse import urljoin, urlparse, parse_qs, urlunparse
+
+
+def normalize_action(page_url, action):
+    """Absolute URL, lower-case host, no fragment/query values/trailing slash"""
+    parsed = urlparse(urljoin(page_url, action or page_url))
+    path = parsed.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = "&".join(sorted(parse_qs(parsed.query, keep_blank_values=True).keys()))
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, "", query, ""))
+
+
+def _input_name(inp):
+    return inp.get('name') if isinstance(inp, dict) else inp
+
+
+class InjectionPoint:
+    __slots__ = ("method", "action", "params", "form", "url", "pages", "status")
+
+    def __init__(self, method, action, params, form=None, url=None):
+        self.method = method
+        self.action = action
+        self.params = params
+        self.form = form    # first crawled form dict, passed to the testers unchanged
+        self.url = url      # first crawled URL for GET parameter points
+        self.pages = 1
+        self.status = {}
+
+
+class InjectionRegistry:
+    """Keyed by (method, normalized action, parameter set) so each point is tested once per scan"""
+
+    def __init__(self, crawl_data):
+        self.points = {}
+        for form in crawl_data.get('forms', []):
+            page_url = form.get('page_url') or form.get('url') or ''
+            params = tuple(sorted({n for n in map(_input_name, form.get('inputs', [])) if n}))
+            method = (form.get('method') or 'get').upper()
+            self._add(InjectionPoint(method, normalize_action(page_url, form.get('action')), params, form=form))
+
+        for url in crawl_data.get('pages', []):
+            params = tuple(sorted(parse_qs(urlparse(url).query, keep_blank_values=True).keys()))
+            self._add(InjectionPoint('GET', normalize_action(url, url), params, url=url))
+
+    def _add(self, point):
+        key = (point.method, point.action, point.params)
+        if key in self.points:
+            self.points[key].pages += 1
+        else:
+            self.points[key] = point
+
+    def claim(self, point, check):
+        if point.status.get(check) is not None:
+            return False
+        point.status[check] = 'claimed'
+        return True
+
+    def forms(self, check):
+        """Unique forms still pending for `check`, claimed for the caller"""
+        return [p.form for p in self.points.values() if p.form is not None and self.claim(p, check)]
+
+    def urls(self, check):
+        """Unique page URLs (by path + parameter names) still pending for `check`"""
+        return [p.url for p in self.points.values() if p.url is not None and self.claim(p, check)]
+
+    def summary(self, crawl_data):
+        return (f"{sum(1 for p in self.points.values() if p.form is not None)} unique forms "
+                f"(of {len(crawl_data.get('forms', []))}), "
+                f"{sum(1 for p in self.points.values() if p.url is not None)} unique URLs "
+                f"(of {len(crawl_data.get('pages', []))})")
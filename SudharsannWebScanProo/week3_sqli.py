@@ -1,5 +1,6 @@
 from modules.crawler import IntelligentCrawler
 from modules.sqli_tester import SQLInjectionTester
+from injection_registry import InjectionRegistry
 from colorama import init, Fore
 import json
 
@@ -31,9 +32,11 @@ def run_week3():
             crawler.get_dvwa_vulnerability_pages()
             crawl_data = crawler.save_results()
         
-        # Extract URLs and forms for testing
-        urls = crawl_data['pages']
-        forms = crawl_data['forms']
+        # Extract unique URLs and forms for testing (same form on many pages is tested once)
+        registry = InjectionRegistry(crawl_data)
+        print(f"{Fore.GREEN}[+] Injection points: {registry.summary(crawl_data)}")
+        urls = registry.urls('sqli')
+        forms = registry.forms('sqli')
         
         print(f"{Fore.YELLOW}[*] Testing {len(urls)} URLs for SQL Injection...")
         
@@ -1,6 +1,7 @@
 # week4_xss.py - Week 4: XSS Testing Main Script
 from modules.crawler import IntelligentCrawler
 from modules.xss_tester import XSSTester
+from injection_registry import InjectionRegistry
 from colorama import init, Fore
 import json
 import os
@@ -33,9 +34,11 @@ def run_week4():
             crawler.get_dvwa_vulnerability_pages()
             crawl_data = crawler.save_results()
         
-        # Extract URLs and forms for testing
-        urls = crawl_data['pages']
-        forms = crawl_data['forms']
+        # Extract unique URLs and forms for testing (same form on many pages is tested once)
+        registry = InjectionRegistry(crawl_data)
+        print(f"{Fore.GREEN}[+] Injection points: {registry.summary(crawl_data)}")
+        urls = registry.urls('xss')
+        forms = registry.forms('xss')
         
         print(f"{Fore.YELLOW}[*] Testing {len(urls)} URLs for Reflected XSS...")
         
@@ -1,10 +1,17 @@
 import requests
 import json
 import argparse
-from difflib import SequenceMatcher
+import gzip
+import hashlib
+import html
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
 
 # --- GLOBAL DATA ---
-VULNERABILITY_FINDINGS = []
 XSS_PAYLOADS = ["<script>alert(1)</script>", "<img src=x onerror=alert('XSS')>"]
 
 ACCESS_ENDPOINTS = [
@@ -14,6 +21,17 @@ ACCESS_ENDPOINTS = [
     {"path": "/ftp", "type": "Broken Access Control (Files)"}
 ]
 
+MAX_WORKERS = 8
+SOFT404_SIMILARITY = 0.85   # fingerprint similarity at which a page counts as the soft-404 page
+
+# One pooled session shared by every check (thread-safe for plain GETs)
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS))
+SESSION.mount("https://", HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS))
+
+_BASELINES = {}
+_BASELINE_LOCK = threading.Lock()
+
 # --- WEEK 7: AI CLASSIFICATION & RISK SCORING ---
 
 def ai_classify_vulnerability(v_type, endpoint):
@@ -48,122 +66,134 @@ def calculate_risk_score(severity):
 
 # --- SCANNING MODULES ---
 
-def ml_similarity_analysis(url, path):
-    try:
-        baseline = requests.get(url + "/thispageexistsnever", timeout=3).text
-        current = requests.get(url + path, timeout=3).text
-        return SequenceMatcher(None, baseline, current).ratio()
-    except:
+def page_fingerprint(text):
+    """
+    64-bit SimHash over word tokens: near-identical pages differ in a few bits,
+    unrelated pages in about half of them.
+    """
+    weights = [0] * 64
+    for token in set(re.findall(r"\w+", text.lower())):
+        h = int.from_bytes(hashlib.blake2b(token.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+def get_soft404_baseline(url):
+    """Fingerprint of the page served for a path that cannot exist, fetched once per host."""
+    host = urlparse(url).netloc
+    with _BASELINE_LOCK:
+        if host not in _BASELINES:
+            try:
+                _BASELINES[host] = page_fingerprint(SESSION.get(url + "/thispageexistsnever", timeout=3).text)
+            except requests.RequestException:
+                _BASELINES[host] = None
+        return _BASELINES[host]
+
+def ml_similarity_analysis(url, body):
+    baseline = get_soft404_baseline(url)
+    if baseline is None:
         return 0.0
+    return 1.0 - bin(baseline ^ page_fingerprint(body)).count("1") / 64.0
+
+def check_access_endpoint(url, entry):
+    headers = {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
+    try:
+        res = SESSION.get(url + entry["path"], headers=headers, timeout=5)
+    except requests.RequestException:
+        return None
+    similarity = ml_similarity_analysis(url, res.text)
+
+    if res.status_code == 200 and similarity < SOFT404_SIMILARITY:
+        sev = ai_classify_vulnerability(entry["type"], entry["path"])
+        score = calculate_risk_score(sev)
+
+        mitigation = "Implement Role-Based Access Control (RBAC)."
+        if "IDOR" in entry["type"]:
+            mitigation = "Use UUIDs/Indirect references instead of plain integers."
+
+        return {
+            "type": entry["type"],
+            "status": "VULNERABLE",
+            "severity": sev,
+            "risk_score": score,
+            "details": f"Access to {entry['path']}. Similarity: {similarity:.2f}",
+            "mitigation": mitigation
+        }
+    return {"type": entry["type"], "status": "PASSED", "severity": "LOW", "risk_score": 0.0}
 
 def check_access_control_week6(url):
-    global VULNERABILITY_FINDINGS
     print("[*] Initializing Week 6: AI-Enhanced Access Control Testing...")
-    headers = {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
-    for entry in ACCESS_ENDPOINTS:
-        try:
-            target = url + entry["path"]
-            res = requests.get(target, headers=headers, timeout=5)
-            similarity = ml_similarity_analysis(url, entry["path"])
-            
-            if res.status_code == 200 and similarity < 0.7:
-                sev = ai_classify_vulnerability(entry["type"], entry["path"])
-                score = calculate_risk_score(sev)
-                
-                mitigation = "Implement Role-Based Access Control (RBAC)."
-                if "IDOR" in entry["type"]:
-                    mitigation = "Use UUIDs/Indirect references instead of plain integers."
-                
-                VULNERABILITY_FINDINGS.append({
-                    "type": entry["type"],
-                    "status": "VULNERABLE",
-                    "severity": sev,
-                    "risk_score": score,
-                    "details": f"Access to {entry['path']}. Similarity: {similarity:.2f}",
-                    "mitigation": mitigation
-                })
-            else:
-                VULNERABILITY_FINDINGS.append({"type": entry["type"], "status": "PASSED", "severity": "LOW", "risk_score": 0.0})
-        except:
-            continue
+    get_soft404_baseline(url)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        results = pool.map(lambda entry: check_access_endpoint(url, entry), ACCESS_ENDPOINTS)
+    return [r for r in results if r]
 
 def check_sql_injection(url):
-    global VULNERABILITY_FINDINGS
     payload = "' OR 1=1 --"
     try:
-        res = requests.get(f"{url}/rest/products/search?q={payload}", timeout=5)
+        res = SESSION.get(f"{url}/rest/products/search?q={payload}", timeout=5)
         if res.status_code == 200:
             sev = ai_classify_vulnerability("SQL Injection", "/rest/products/search")
             score = calculate_risk_score(sev)
-            VULNERABILITY_FINDINGS.append({
+            return [{
                 "type": "SQL Injection", 
                 "status": "VULNERABLE", 
                 "severity": sev,
                 "risk_score": score,
                 "mitigation": "Use parameterized queries and ORM."
-            })
-        else:
-            VULNERABILITY_FINDINGS.append({"type": "SQL Injection", "status": "PASSED", "severity": "LOW", "risk_score": 0.0})
-    except: pass
+            }]
+        return [{"type": "SQL Injection", "status": "PASSED", "severity": "LOW", "risk_score": 0.0}]
+    except requests.RequestException:
+        return []
 
 def check_xss(url):
-    global VULNERABILITY_FINDINGS
     try:
-        res = requests.get(f"{url}/search?q={XSS_PAYLOADS[0]}", timeout=5)
+        res = SESSION.get(f"{url}/search?q={XSS_PAYLOADS[0]}", timeout=5)
         if XSS_PAYLOADS[0] in res.text:
             sev = ai_classify_vulnerability("Reflected XSS", "/search")
             score = calculate_risk_score(sev)
-            VULNERABILITY_FINDINGS.append({
+            return [{
                 "type": "Reflected XSS", 
                 "status": "VULNERABLE", 
                 "severity": sev,
                 "risk_score": score,
                 "mitigation": "Input sanitization and Output encoding."
-            })
-        else:
-            VULNERABILITY_FINDINGS.append({"type": "Reflected XSS", "status": "PASSED", "severity": "LOW", "risk_score": 0.0})
-    except: pass
+            }]
+        return [{"type": "Reflected XSS", "status": "PASSED", "severity": "LOW", "risk_score": 0.0}]
+    except requests.RequestException:
+        return []
 
 # --- WEEK 7 REPORTING ENGINE ---
 
-def generate_html_report(url):
-    """
-    Week 7: Generates a professional HTML Security Dashboard.
-    """
-    print("[*] Generating AI-Powered HTML Security Report...")
-    
-    total_found = sum(1 for f in VULNERABILITY_FINDINGS if f.get("status") == "VULNERABLE")
-    critical_count = sum(1 for f in VULNERABILITY_FINDINGS if f.get("severity") == "CRITICAL")
-    high_count = sum(1 for f in VULNERABILITY_FINDINGS if f.get("severity") == "HIGH")
-    
-    html_content = f"""
+# Report templates, compiled once; values are HTML-escaped before substitution
+REPORT_HEAD = Template("""
     <html>
     <head>
         <title>WebScanPro Security Report</title>
         <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; background-color: #f4f4f9; }}
-            .header {{ background-color: #2c3e50; color: white; padding: 20px; text-align: center; border-radius: 8px; }}
-            .summary {{ display: flex; justify-content: space-around; margin: 20px 0; }}
-            .card {{ background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); width: 25%; text-align: center; }}
-            .critical {{ border-top: 5px solid #e74c3c; }}
-            .high {{ border-top: 5px solid #e67e22; }}
-            table {{ width: 100%; border-collapse: collapse; margin-top: 20px; background: white; }}
-            th, td {{ padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }}
-            th {{ background-color: #34495e; color: white; }}
-            .vulnerable {{ color: #e74c3c; font-weight: bold; }}
-            .passed {{ color: #27ae60; }}
+            body { font-family: Arial, sans-serif; margin: 40px; background-color: #f4f4f9; }
+            .header { background-color: #2c3e50; color: white; padding: 20px; text-align: center; border-radius: 8px; }
+            .summary { display: flex; justify-content: space-around; margin: 20px 0; }
+            .card { background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 5px rgba(0,0,0,0.1); width: 25%; text-align: center; }
+            .critical { border-top: 5px solid #e74c3c; }
+            .high { border-top: 5px solid #e67e22; }
+            table { width: 100%; border-collapse: collapse; margin-top: 20px; background: white; }
+            th, td { padding: 12px; text-align: left; border-bottom: 1px solid #ddd; }
+            th { background-color: #34495e; color: white; }
+            .vulnerable { color: #e74c3c; font-weight: bold; }
+            .passed { color: #27ae60; }
         </style>
     </head>
     <body>
         <div class="header">
             <h1>WebScanPro: AI-Driven Security Audit Report</h1>
-            <p>Target URL: {url} | Date: 2025-12-25</p>
+            <p>Target URL: $url | Date: 2025-12-25</p>
         </div>
         
         <div class="summary">
-            <div class="card critical"><h3>Critical Issues</h3><p style="font-size: 24px;">{critical_count}</p></div>
-            <div class="card high"><h3>High Issues</h3><p style="font-size: 24px;">{high_count}</p></div>
-            <div class="card"><h3>Total Detected</h3><p style="font-size: 24px;">{total_found}</p></div>
+            <div class="card critical"><h3>Critical Issues</h3><p style="font-size: 24px;">$critical_count</p></div>
+            <div class="card high"><h3>High Issues</h3><p style="font-size: 24px;">$high_count</p></div>
+            <div class="card"><h3>Total Detected</h3><p style="font-size: 24px;">$total_found</p></div>
         </div>
 
         <table>
@@ -174,38 +204,69 @@ def generate_html_report(url):
                 <th>Risk Score</th>
                 <th>Mitigation Strategy</th>
             </tr>
-    """
-    for f in VULNERABILITY_FINDINGS:
-        color_class = "vulnerable" if f.get("status") == "VULNERABLE" else "passed"
-        mitigation = f.get("mitigation", "Ensure input validation and follow OWASP best practices.")
-        html_content += f"""
+""")
+
+REPORT_ROW = Template("""
             <tr>
-                <td>{f['type']}</td>
-                <td class="{color_class}">{f.get('status')}</td>
-                <td>{f.get('severity')}</td>
-                <td>{f.get('risk_score', 0.0)}</td>
-                <td><i>{mitigation}</i></td>
+                <td>$type</td>
+                <td class="$color_class">$status</td>
+                <td>$severity</td>
+                <td>$risk_score</td>
+                <td><i>$mitigation</i></td>
             </tr>
-        """
-    html_content += """
+""")
+
+REPORT_FOOT = """
         </table>
         <br>
         <p><i>Report generated by WebScanPro AI-Engine. All findings are classified using TF-IDF logic.</i></p>
     </body>
     </html>
+"""
+
+def generate_html_report(url, findings, compress=False):
+    """
+    Week 7: Generates a professional HTML Security Dashboard.
+    Rows are streamed to the file from precompiled templates.
     """
-    with open("final_report.html", "w") as f:
-        f.write(html_content)
-    print("[+] Success: 'final_report.html' created.")
+    print("[*] Generating AI-Powered HTML Security Report...")
+    
+    total_found = sum(1 for f in findings if f.get("status") == "VULNERABLE")
+    critical_count = sum(1 for f in findings if f.get("severity") == "CRITICAL")
+    high_count = sum(1 for f in findings if f.get("severity") == "HIGH")
+    
+    def rows():
+        for f in findings:
+            yield REPORT_ROW.substitute(
+                type=html.escape(str(f['type'])),
+                color_class="vulnerable" if f.get("status") == "VULNERABLE" else "passed",
+                status=html.escape(str(f.get('status'))),
+                severity=html.escape(str(f.get('severity'))),
+                risk_score=f.get('risk_score', 0.0),
+                mitigation=html.escape(f.get("mitigation", "Ensure input validation and follow OWASP best practices."))
+            )
+    
+    path = "final_report.html.gz" if compress else "final_report.html"
+    opener = gzip.open if compress else open
+    with opener(path, "wt") as out:
+        out.write(REPORT_HEAD.substitute(
+            url=html.escape(url),
+            critical_count=critical_count,
+            high_count=high_count,
+            total_found=total_found
+        ))
+        out.writelines(rows())
+        out.write(REPORT_FOOT)
+    print(f"[+] Success: '{path}' created.")
 
-def generate_report(url):
+def generate_report(url, findings):
     print("\n" + "="*95)
     print(f"| WEB SCANNER AI-DRIVEN REPORT | TARGET: {url} |")
     print("="*95)
     print(f"| {'VULNERABILITY TYPE':<30} | {'STATUS':<12} | {'SEVERITY':<10} | {'SCORE':<6} |")
     print("-" * 95)
     total = 0
-    for f in VULNERABILITY_FINDINGS:
+    for f in findings:
         status = f.get("status", "N/A")
         score = f.get("risk_score", 0.0)
         print(f"| {f['type']:<30} | {status:<12} | {f['severity']:<10} | {score:<6} |")
@@ -216,17 +277,17 @@ def generate_report(url):
     print("="*95)
     
     with open("security_report.json", "w") as f:
-        json.dump(VULNERABILITY_FINDINGS, f, indent=4)
+        json.dump(findings, f, indent=4)
 
 def run_scanner(url):
     print(f"--- WebScanPro: Starting Week 7 AI-Driven Security Scan ---")
     try:
-        requests.get(url, timeout=5)
-        check_sql_injection(url)
-        check_xss(url)
-        check_access_control_week6(url)
-        generate_report(url)
-        generate_html_report(url)
+        SESSION.get(url, timeout=5)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            checks = [pool.submit(check, url) for check in (check_sql_injection, check_xss, check_access_control_week6)]
+            findings = [f for c in checks for f in c.result()]
+        generate_report(url, findings)
+        generate_html_report(url, findings)
     except Exception as e:
         print(f"[-] Error: {e}")
 
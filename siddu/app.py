@@ -1,8 +1,10 @@
 # app.py  -- full replacement (creates templates/static if missing, ML or heuristic detector)
 import os
-import joblib
-import re
-from flask import Flask, render_template, request, redirect, url_for, flash
+import threading
+import time
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g
+from scoring_service import Metrics, ScoringService
+from input_filter import InputFilter
 
 # ---------- Project paths ----------
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -133,46 +135,41 @@ try:
 except Exception as e:
     print("Cannot list templates:", e)
 
-# ---------- ML model loader (tries to load joblib model) ----------
-model = None
-vectorizer = None
+# ---------- ML model loader (loaded once; concurrent requests are micro-batched) ----------
+scoring = None
 if os.path.exists(MODEL_PATH):
     try:
-        data = joblib.load(MODEL_PATH)
-        model = data.get("model")
-        vectorizer = data.get("vectorizer")
+        scoring = ScoringService({"xss": MODEL_PATH})
         print("Loaded ML model from:", MODEL_PATH)
     except Exception as e:
         print("Failed loading ML model:", e)
 
-# ---------- Fallback heuristic detector (simple rule-based) ----------
-SUSPICIOUS_TOKENS = [
-    "<script", "onerror", "onload", "javascript:", "<img", "<svg", "<iframe", "alert(", "<body", "document.cookie"
-]
-def is_suspicious_heuristic(text: str) -> bool:
-    if not text:
-        return False
-    t = text.lower()
-    for tok in SUSPICIOUS_TOKENS:
-        if tok in t:
-            return True
-    special_chars = sum(1 for ch in t if ch in "<>\"'")
-    if special_chars >= 4:
-        return True
-    if re.search(r"<\s*script\b|on\w+\s*=|javascript\s*:", t):
-        return True
-    return False
-
-def ml_score(text: str):
-    """Return score 0..1 if ML available, else None."""
-    if model is None or vectorizer is None:
-        return None
-    try:
-        X = vectorizer.transform([text])
-        return float(model.predict_proba(X)[0,1])
-    except Exception as e:
-        print("ML scoring error:", e)
-        return None
+# ---------- Input filter: ML score (LRU-cached) or fallback heuristic detector ----------
+input_filter = InputFilter(scoring, threshold=0.5, cache_size=int(os.environ.get("SCORE_CACHE_SIZE", "10000")))
+MAX_BATCH_INPUTS = 1000
+
+def flash_blocked(verdict):
+    if verdict['source'] == 'ml':
+        flash(f"Input blocked by ML (suspicious score={verdict['score']:.2f})", 'danger')
+    else:
+        flash("Input blocked by heuristic detector (likely XSS).", "danger")
+
+# ---------- Per-endpoint request latency ----------
+route_metrics = {}
+route_metrics_lock = threading.Lock()
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    start = g.get('request_start')
+    if start is not None and request.endpoint not in (None, 'static'):
+        with route_metrics_lock:
+            metrics = route_metrics.setdefault(request.endpoint, Metrics())
+        metrics.record_request(1, time.perf_counter() - start, ok=response.status_code < 500)
+    return response
 
 # ---------- In-memory storage (demo only) ----------
 stored_messages = []
@@ -189,19 +186,11 @@ def stored_xss():
         message = request.form.get('message', '')
         combined = (name + ' ' + message).strip()
 
-        # 1) Try ML model if available
-        score = ml_score(combined)
-        if score is not None:
-            threshold = 0.5
-            if score >= threshold:
-                flash(f"Input blocked by ML (suspicious score={score:.2f})", 'danger')
-                return redirect(url_for('stored_xss'))
-
-        # 2) If ML not available, use heuristic detector
-        else:
-            if is_suspicious_heuristic(combined):
-                flash("Input blocked by heuristic detector (likely XSS).", "danger")
-                return redirect(url_for('stored_xss'))
+        # ML model if available, otherwise the heuristic detector
+        verdict = input_filter.check(combined)
+        if verdict['blocked']:
+            flash_blocked(verdict)
+            return redirect(url_for('stored_xss'))
 
         # Save (vulnerable demonstration; templates use |safe intentionally)
         stored_messages.append({'name': name, 'message': message})
@@ -216,18 +205,33 @@ def reflected_xss():
     if request.method == 'POST':
         q = request.form.get('q', '')
 
-        score = ml_score(q)
-        if score is not None:
-            if score >= 0.5:
-                flash(f"Input blocked by ML (suspicious score={score:.2f})", 'danger')
-                return redirect(url_for('reflected_xss'))
-        else:
-            if is_suspicious_heuristic(q):
-                flash("Input blocked by heuristic detector (likely XSS).", "danger")
-                return redirect(url_for('reflected_xss'))
+        verdict = input_filter.check(q)
+        if verdict['blocked']:
+            flash_blocked(verdict)
+            return redirect(url_for('reflected_xss'))
 
     return render_template('reflected.html', q=q)
 
+@app.route('/score/batch', methods=['POST'])
+def score_batch():
+    """JSON {"inputs": [...]} -> {"results": [{"score", "blocked", "source", "cached"}, ...]}."""
+    payload = request.get_json(silent=True) or {}
+    inputs = payload.get('inputs')
+    if not isinstance(inputs, list):
+        return jsonify({'error': "'inputs' must be a list"}), 400
+    if len(inputs) > MAX_BATCH_INPUTS:
+        return jsonify({'error': f"at most {MAX_BATCH_INPUTS} inputs per call"}), 413
+    return jsonify({'results': input_filter.check_many(inputs)})
+
+@app.route('/metrics')
+def metrics():
+    with route_metrics_lock:
+        routes = {name: m.snapshot() for name, m in route_metrics.items()}
+    out = {'routes': routes, **input_filter.stats()}
+    if scoring is not None:
+        out['models'] = scoring.metrics()
+    return jsonify(out)
+
 # Simple plain route for testing without templates
 @app.route('/plain')
 def plain():
@@ -0,0 +1,247 @@
+# artifact_store.py
+"""
+SQLite-backed artifact store for the SQLi ML pipeline.
+
+Every stage output is a named artifact inside a run:
+  - tables: typed (SCHEMAS), stored once per content hash in their own SQLite
+    table, so a stage can read just the columns/rows it needs with get();
+  - blobs: pickled objects such as the trained model package.
+
+run_stage() caches outputs by a key over the stage code, its parameters and
+the content hashes of its inputs; when nothing changed the cached artifact is
+linked into the new run and the stage function is not called.
+"""
+import hashlib
+import inspect
+import io
+import json
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+
+import joblib
+import pandas as pd
+
+DEFAULT_DB = 'sqli_pipeline.sqlite'
+
+# column -> SQLite type per table artifact; other columns get a type from their dtype
+SCHEMAS = {
+    'raw': {
+        'run_id': 'TEXT', 'url': 'TEXT', 'method': 'TEXT', 'param': 'TEXT', 'payload': 'TEXT',
+        'status': 'INTEGER', 'resp_len': 'INTEGER', 'resp_time': 'REAL',
+        'sql_error_flag': 'INTEGER', 'resp_snippet': 'TEXT',
+    },
+    'features': {
+        'url': 'TEXT', 'method': 'TEXT', 'param': 'TEXT', 'payload': 'TEXT',
+        'status': 'INTEGER', 'resp_len': 'INTEGER', 'resp_time': 'REAL', 'sql_error_flag': 'INTEGER',
+        'baseline_len': 'INTEGER', 'len_diff': 'INTEGER', 'seq_ratio': 'REAL', 'payload_type': 'TEXT',
+        'baseline_snippet': 'TEXT', 'resp_snippet': 'TEXT',
+    },
+    'anomaly_scores': {
+        'url': 'TEXT', 'param': 'TEXT', 'payload': 'TEXT', 'resp_len': 'INTEGER', 'len_diff': 'INTEGER',
+        'sql_error_flag': 'INTEGER', 'resp_time': 'REAL', 'anomaly_score': 'REAL',
+    },
+    'labeled': {
+        'url': 'TEXT', 'param': 'TEXT', 'payload': 'TEXT', 'resp_len': 'INTEGER', 'len_diff': 'INTEGER',
+        'sql_error_flag': 'INTEGER', 'resp_time': 'REAL', 'anomaly_score': 'REAL', 'label': 'INTEGER',
+    },
+    'report': {
+        'url': 'TEXT', 'param': 'TEXT', 'payload': 'TEXT', 'confidence': 'REAL',
+        'evidence': 'TEXT', 'suggested_fix': 'TEXT',
+    },
+}
+
+PANDAS_TYPES = {'TEXT': 'object', 'INTEGER': 'int64', 'REAL': 'float64'}
+
+
+def sql_type(series):
+    kind = series.dtype.kind
+    if kind in 'biu':
+        return 'INTEGER'
+    if kind == 'f':
+        return 'REAL'
+    return 'TEXT'
+
+
+def new_run_id():
+    return time.strftime('%Y%m%d-%H%M%S-') + uuid.uuid4().hex[:6]
+
+
+def frame_hash(df):
+    """Content hash of a DataFrame: column names, dtypes and row values."""
+    h = hashlib.sha256(json.dumps([list(map(str, df.columns)), list(map(str, df.dtypes))]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def apply_schema(name, df):
+    """Casts known columns to their schema types; missing schema columns are an error."""
+    schema = SCHEMAS.get(name)
+    if schema is None:
+        return df
+    missing = [c for c in schema if c not in df.columns]
+    if missing:
+        raise ValueError(f"artifact {name!r} is missing columns {missing}")
+    df = df.copy()
+    for col, sql_type in schema.items():
+        if sql_type == 'TEXT':
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str)).astype(object)
+        else:
+            df[col] = pd.to_numeric(df[col]).astype(PANDAS_TYPES[sql_type])
+    return df
+
+
+class ArtifactStore:
+    def __init__(self, path=DEFAULT_DB):
+        self.path = path
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    run_id TEXT PRIMARY KEY, created REAL NOT NULL, note TEXT
+                );
+                CREATE TABLE IF NOT EXISTS artifacts (
+                    run_id TEXT NOT NULL, name TEXT NOT NULL, kind TEXT NOT NULL,
+                    content_hash TEXT NOT NULL, rows INTEGER, created REAL NOT NULL,
+                    PRIMARY KEY (run_id, name)
+                );
+                CREATE TABLE IF NOT EXISTS blobs (
+                    content_hash TEXT PRIMARY KEY, data BLOB NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS stage_cache (
+                    cache_key TEXT PRIMARY KEY, name TEXT NOT NULL, kind TEXT NOT NULL,
+                    content_hash TEXT NOT NULL, rows INTEGER
+                );
+            """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    # ---------- runs ----------
+    def start_run(self, run_id=None, note=None):
+        run_id = run_id or new_run_id()
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO runs VALUES (?, ?, ?)", (run_id, time.time(), note))
+        return run_id
+
+    def latest_run(self, name=None):
+        query = "SELECT run_id FROM artifacts" + (" WHERE name = ?" if name else "") + " ORDER BY created DESC LIMIT 1"
+        with self._connect() as conn:
+            row = conn.execute(query, (name,) if name else ()).fetchone()
+        return row[0] if row else None
+
+    def runs(self):
+        with self._connect() as conn:
+            return pd.read_sql_query("SELECT * FROM runs ORDER BY created DESC", conn)
+
+    # ---------- artifacts ----------
+    def _register(self, conn, run_id, name, kind, content_hash, rows):
+        conn.execute("INSERT OR IGNORE INTO runs VALUES (?, ?, ?)", (run_id, time.time(), None))
+        conn.execute("INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?)",
+                     (run_id, name, kind, content_hash, rows, time.time()))
+
+    @staticmethod
+    def _table(name, content_hash):
+        return f"t_{name}_{content_hash[:16]}"
+
+    def put(self, name, df, run_id):
+        """Stores a table artifact; identical content is stored only once."""
+        df = apply_schema(name, df).reset_index(drop=True)
+        content_hash = frame_hash(df)
+        table = self._table(name, content_hash)
+        schema = SCHEMAS.get(name, {})
+        with self._connect() as conn:
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+            if not exists:
+                cols = ", ".join(f'"{c}" {schema.get(c) or sql_type(df[c])}' for c in df.columns)
+                conn.execute(f'CREATE TABLE "{table}" ({cols})')
+                df.to_sql(table, conn, if_exists='append', index=False)
+            self._register(conn, run_id, name, 'table', content_hash, len(df))
+        return content_hash
+
+    def put_blob(self, name, obj, run_id):
+        buf = io.BytesIO()
+        joblib.dump(obj, buf)
+        data = buf.getvalue()
+        content_hash = hashlib.sha256(data).hexdigest()
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?)", (content_hash, data))
+            self._register(conn, run_id, name, 'blob', content_hash, None)
+        return content_hash
+
+    def info(self, name, run_id=None):
+        run_id = run_id or self.latest_run(name)
+        with self._connect() as conn:
+            row = conn.execute("SELECT kind, content_hash, rows FROM artifacts WHERE run_id=? AND name=?",
+                               (run_id, name)).fetchone()
+        if row is None:
+            raise KeyError(f"no artifact {name!r} in run {run_id!r}")
+        return {'run_id': run_id, 'name': name, 'kind': row[0], 'content_hash': row[1], 'rows': row[2]}
+
+    def get(self, name, run_id=None, columns=None, where=None, params=(), order_by=None, limit=None):
+        """
+        Reads a table artifact (latest run by default). columns/where/order_by/limit
+        are pushed into the SQL query so only the needed data is loaded.
+        """
+        meta = self.info(name, run_id)
+        cols = ", ".join(f'"{c}"' for c in columns) if columns else "*"
+        query = f'SELECT {cols} FROM "{self._table(name, meta["content_hash"])}"'
+        if where:
+            query += f" WHERE {where}"
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._connect() as conn:
+            return pd.read_sql_query(query, conn, params=params)
+
+    def get_blob(self, name, run_id=None):
+        meta = self.info(name, run_id)
+        with self._connect() as conn:
+            data = conn.execute("SELECT data FROM blobs WHERE content_hash=?", (meta['content_hash'],)).fetchone()[0]
+        return joblib.load(io.BytesIO(data))
+
+    def export_csv(self, name, path, run_id=None):
+        self.get(name, run_id).to_csv(path, index=False)
+
+    # ---------- cached stages ----------
+    def run_stage(self, name, fn, run_id, inputs=(), params=None, code=(), kind='table'):
+        """
+        Runs fn(**params) -> DataFrame (or object for kind='blob') and stores it as
+        `name` in run_id, unless an identical stage ran before: same source of fn
+        and of the helpers in `code`, same params and same content of the
+        `inputs` artifacts. Then the cached output is linked in. Returns True if
+        fn actually ran.
+        """
+        params = params or {}
+        key = hashlib.sha256()
+        key.update(name.encode())
+        for func in (fn, *code):
+            key.update(inspect.getsource(func).encode())
+        key.update(json.dumps(params, sort_keys=True, default=str).encode())
+        for inp in inputs:
+            key.update(self.info(inp, run_id)['content_hash'].encode())
+        cache_key = key.hexdigest()
+
+        with self._connect() as conn:
+            hit = conn.execute("SELECT kind, content_hash, rows FROM stage_cache WHERE cache_key=?",
+                               (cache_key,)).fetchone()
+            if hit:
+                self._register(conn, run_id, name, hit[0], hit[1], hit[2])
+                return False
+
+        result = fn(**params)
+        if kind == 'blob':
+            content_hash, rows = self.put_blob(name, result, run_id), None
+        else:
+            content_hash, rows = self.put(name, result, run_id), len(result)
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO stage_cache VALUES (?, ?, ?, ?, ?)",
+                         (cache_key, name, kind, content_hash, rows))
+        return True
@@ -0,0 +1,86 @@
+# benchmark_feature_builder.py
+"""
+Times feature_builder.build_features on synthetic raw runs (1M rows by
+default) and the old iterrows + difflib implementation on a sample.
+
+    python benchmark_feature_builder.py --rows 1000000 --legacy-rows 20000
+"""
+import argparse
+import difflib
+import time
+
+import numpy as np
+import pandas as pd
+
+import feature_builder
+
+PAYLOADS = ["1", "' OR '1'='1", "' OR '1'='1' --", "' UNION SELECT NULL --", "' AND SLEEP(3) --", '" OR "a"="a']
+WORDS = np.array("select from where user admin error syntax mysql warning login table row page id".split())
+
+
+def synthetic_runs(rows, payloads_per_group=50, seed=0):
+    rng = np.random.default_rng(seed)
+    groups = max(rows // payloads_per_group, 1)
+    gid = np.arange(rows) % groups
+    words = WORDS[rng.integers(0, len(WORDS), size=(rows, 30))]
+    snippets = pd.Series([" ".join(w) for w in words])
+    return pd.DataFrame({
+        'run_id': np.arange(rows).astype(str),
+        'url': pd.Series(gid).map(lambda g: f"http://target/app{g // 10}/?id=1"),
+        'method': np.where(gid % 2, 'GET', 'POST'),
+        'param': pd.Series(gid % 10).map(lambda p: f"p{p}"),
+        'payload': np.array(PAYLOADS)[rng.integers(0, len(PAYLOADS), rows)],
+        'status': rng.choice([200, 500], rows),
+        'resp_len': rng.integers(200, 5000, rows),
+        'resp_time': rng.random(rows) * 3,
+        'sql_error_flag': rng.integers(0, 2, rows),
+        'resp_snippet': snippets,
+    })
+
+
+def legacy_build_features(df):
+    """The previous implementation: Python groupby loop, iterrows and difflib per row."""
+    bases = {}
+    for key, g in df.groupby(['url', 'method', 'param']):
+        ben = g[g['payload'].isin(['1', '0', ''])]
+        row = ben.iloc[0] if len(ben) > 0 else g.loc[g['resp_len'].idxmin()]
+        bases[key] = {'baseline_len': int(row['resp_len']), 'baseline_snippet': row['resp_snippet'][:300]}
+    out_rows = []
+    for _, r in df.iterrows():
+        base = bases[(r['url'], r['method'], r['param'])]
+        seq_ratio = difflib.SequenceMatcher(None, str(base['baseline_snippet'])[:200],
+                                            str(r['resp_snippet'])[:200]).ratio()
+        out_rows.append({'len_diff': int(r['resp_len']) - base['baseline_len'], 'seq_ratio': seq_ratio})
+    return pd.DataFrame(out_rows)
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark feature_builder")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--legacy-rows', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    df, gen_time = timed(synthetic_runs, args.rows)
+    print(f"generated {len(df):,} rows in {gen_time:.1f}s")
+
+    _, single = timed(feature_builder.build_features, df, workers=1)
+    print(f"vectorized, 1 process     : {single:8.1f}s  ({len(df) / single:,.0f} rows/s)")
+    _, pooled = timed(feature_builder.build_features, df, workers=args.workers)
+    print(f"vectorized, process pool  : {pooled:8.1f}s  ({len(df) / pooled:,.0f} rows/s)")
+
+    sample = df.head(args.legacy_rows)
+    _, legacy = timed(legacy_build_features, sample)
+    rate = len(sample) / legacy
+    print(f"legacy on {len(sample):,} rows     : {legacy:8.1f}s  ({rate:,.0f} rows/s, "
+          f"~{len(df) / rate:,.0f}s projected for {len(df):,})")
+
+
+if __name__ == '__main__':
+    main()
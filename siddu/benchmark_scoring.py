@@ -0,0 +1,95 @@
+# benchmark_scoring.py
+"""
+Compares per-request scoring (prepare + predict_proba for every request, as
+app.py did) with the micro-batching ScoringService under concurrent clients.
+
+    python benchmark_scoring.py --model models/xss_detector.joblib --clients 16 --requests 2000
+
+Without --model a small TF-IDF + LogisticRegression model is trained on
+synthetic payloads so the benchmark runs anywhere.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import joblib
+import numpy as np
+
+from scoring_service import ModelEntry, ScoringService
+
+BENIGN = ["hello world", "search shoes", "john doe", "order 1234", "my profile", "contact us"]
+MALICIOUS = ["<script>alert(1)</script>", "<img src=x onerror=alert(1)>", "javascript:alert(document.cookie)",
+             "<svg onload=alert(1)>", "\"><iframe src=javascript:alert(1)>"]
+
+
+def synthetic_texts(n, seed=42):
+    rnd = random.Random(seed)
+    return [rnd.choice(MALICIOUS if rnd.random() < 0.3 else BENIGN) + " " + str(rnd.randint(0, 999))
+            for _ in range(n)]
+
+
+def build_demo_model(path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+    texts = synthetic_texts(2000, seed=1)
+    labels = [int(any(m in t for m in MALICIOUS)) for t in texts]
+    vectorizer = TfidfVectorizer(ngram_range=(1, 3), analyzer='char_wb', max_features=3000)
+    model = LogisticRegression(max_iter=1000).fit(vectorizer.fit_transform(texts), labels)
+    joblib.dump({'model': model, 'vectorizer': vectorizer}, path)
+
+
+def run_clients(fn, inputs, clients):
+    latencies = []
+
+    def one(x):
+        t0 = time.perf_counter()
+        fn(x)
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(one, inputs))
+    elapsed = time.perf_counter() - t0
+    lat = np.array(latencies) * 1000
+    return {
+        'requests_per_sec': len(inputs) / elapsed,
+        'p50_ms': float(np.percentile(lat, 50)),
+        'p95_ms': float(np.percentile(lat, 95)),
+        'p99_ms': float(np.percentile(lat, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request vs micro-batched scoring")
+    parser.add_argument('--model', help="text model package {'model', 'vectorizer'}")
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    path = args.model
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), 'xss_demo.joblib')
+        build_demo_model(path)
+    inputs = synthetic_texts(args.requests)
+
+    entry = ModelEntry(path)
+    per_request = run_clients(lambda x: entry.predict_proba([x]), inputs, args.clients)
+
+    service = ScoringService({'m': path}, max_wait=args.max_wait_ms / 1000)
+    batched = run_clients(lambda x: service.score('m', [x]), inputs, args.clients)
+    stats = service.metrics()['m']
+    service.close()
+
+    print(f"{'mode':<14}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, r in (('per-request', per_request), ('micro-batch', batched)):
+        print(f"{name:<14}{r['requests_per_sec']:>10.0f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+    print(f"avg rows per predict_proba call: {stats['avg_batch_rows']}")
+
+
+if __name__ == '__main__':
+    main()
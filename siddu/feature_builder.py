@@ -5,57 +5,147 @@ Outputs: sqli_runs_features.csv
 Columns:
  url, method, param, payload, status, resp_len, resp_time, sql_error_flag,
  len_diff, seq_ratio, baseline_len, baseline_snippet, payload_type
+
+Everything is column-wise pandas/numpy; rows are split by (url, method, param)
+group across a process pool for large inputs. seq_ratio is the Jaccard
+similarity of hashed 3-char shingles of the first 200 chars of the response
+and its baseline.
 """
+import os
+import numpy as np
 import pandas as pd
-import difflib, csv, json
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 RAW = 'sqli_runs_raw.csv'
 OUT = 'sqli_runs_features.csv'
 
-def detect_payload_type(payload):
-    p = payload.lower()
-    if 'sleep' in p or 'sleep(' in p: return 'time'
-    if 'union' in p: return 'union'
-    if '--' in p or '/*' in p: return 'comment'
-    if "'" in p or '"' in p: return 'quote'
-    return 'normal'
+GROUP_KEYS = ['url', 'method', 'param']
+BENIGN_PAYLOADS = ['1', '0', '']
+SNIPPET_CHARS = 200
+SHINGLE = 3
+SHINGLE_BITS = 1024
+PARALLEL_MIN_ROWS = 200000
+
+OUT_COLUMNS = ['url', 'method', 'param', 'payload', 'status', 'resp_len', 'resp_time', 'sql_error_flag',
+               'baseline_len', 'len_diff', 'seq_ratio', 'payload_type', 'baseline_snippet', 'resp_snippet']
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint16)
+
+
+def detect_payload_type(payloads):
+    p = payloads.fillna('').astype(str).str.lower()
+    conditions = [
+        p.str.contains('sleep', regex=False),
+        p.str.contains('union', regex=False),
+        p.str.contains('--', regex=False) | p.str.contains('/*', regex=False),
+        p.str.contains("'", regex=False) | p.str.contains('"', regex=False),
+    ]
+    return pd.Series(np.select(conditions, ['time', 'union', 'comment', 'quote'], default='normal'),
+                     index=payloads.index)
+
 
 def build_baselines(df):
-    # baseline per (url, method, param) using runs with payload == benign_value
-    # but if benign not present, take min resp_len run as baseline
-    bases = {}
-    groups = df.groupby(['url','method','param'])
-    for key,g in groups:
-        # try to find run with payload that equals '1' or '0' common benign; else pick smallest resp_len
-        ben = g[g['payload'].isin(['1','0',''])]
-        if len(ben)>0:
-            row = ben.iloc[0]
-        else:
-            row = g.loc[g['resp_len'].idxmin()]
-        bases[key] = {'baseline_len': int(row['resp_len']), 'baseline_snippet': row['resp_snippet'][:300]}
-    return bases
+    """
+    Row position of the baseline run for every row: per (url, method, param),
+    the first run whose payload is benign ('1', '0' or empty), otherwise the
+    run with the smallest resp_len.
+    """
+    n = len(df)
+    gid = df.groupby(GROUP_KEYS, sort=False, dropna=False).ngroup().to_numpy()
+    benign = df['payload'].fillna('').isin(BENIGN_PAYLOADS).to_numpy()
+    resp_len = df['resp_len'].to_numpy(dtype=np.int64)
+    position = np.arange(n)
+    # per group: benign rows first (by position), then smallest resp_len (first occurrence)
+    order = np.lexsort((position, np.where(benign, 0, resp_len), ~benign, gid))
+    first = np.ones(n, dtype=bool)
+    first[1:] = gid[order][1:] != gid[order][:-1]
+    baseline_of_group = np.empty(gid.max() + 1 if n else 0, dtype=np.int64)
+    baseline_of_group[gid[order][first]] = order[first]
+    return baseline_of_group[gid]
+
+
+def shingle_bits(snippets, block=20000):
+    """Each snippet's first 200 chars as a packed SHINGLE_BITS-wide bitset of hashed 3-char shingles."""
+    if len(snippets) > block:
+        return np.concatenate([shingle_bits(snippets[i:i + block], block)
+                               for i in range(0, len(snippets), block)])
+    n = len(snippets)
+    raw = [s[:SNIPPET_CHARS].encode('utf-8', 'ignore')[:SNIPPET_CHARS] for s in snippets]
+    lengths = np.fromiter((len(b) for b in raw), dtype=np.int64, count=n)
+    chars = np.zeros((n, SNIPPET_CHARS + SHINGLE), dtype=np.uint32)
+    flat = np.frombuffer(b''.join(raw), dtype=np.uint8)
+    rows = np.repeat(np.arange(n), lengths)
+    cols = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    chars[rows, cols] = flat
+
+    # rolling hash of every 3-char window, folded into SHINGLE_BITS buckets
+    h = chars[:, :-2] * np.uint32(0x9E3779B1) ^ chars[:, 1:-1] * np.uint32(0x85EBCA77) ^ chars[:, 2:] * np.uint32(0xC2B2AE3D)
+    buckets = (h ^ (h >> np.uint32(15))) % SHINGLE_BITS
+    # only windows that start inside the string (a short string still gives one shingle)
+    valid = np.arange(buckets.shape[1])[None, :] < np.maximum(lengths - SHINGLE + 1, np.minimum(lengths, 1))[:, None]
+
+    bits = np.zeros((n, SHINGLE_BITS), dtype=bool)
+    r, c = np.nonzero(valid)
+    bits[r, buckets[r, c]] = True
+    return np.packbits(bits, axis=1)
+
+
+def shingle_similarity(a, b):
+    """Row-wise Jaccard of packed bitsets; two empty snippets count as identical."""
+    inter = _POPCOUNT[a & b].sum(axis=1)
+    union = _POPCOUNT[a | b].sum(axis=1)
+    return np.where(union == 0, 1.0, inter / np.maximum(union, 1))
+
+
+def _features_for_groups(df):
+    """Features for a frame that holds complete (url, method, param) groups."""
+    df = df.reset_index(drop=True)
+    snippets = df['resp_snippet'].fillna('').astype(str)
+    base = build_baselines(df)
+    bits = shingle_bits(snippets.tolist())
+    baseline_len = df['resp_len'].to_numpy(dtype=np.int64)[base]
+    baseline_snippet = snippets.str.slice(0, 300).to_numpy()[base]
+
+    return pd.DataFrame({
+        'url': df['url'], 'method': df['method'], 'param': df['param'], 'payload': df['payload'],
+        'status': df['status'].astype(int), 'resp_len': df['resp_len'].astype(int),
+        'resp_time': df['resp_time'].astype(float), 'sql_error_flag': df['sql_error_flag'].astype(int),
+        'baseline_len': baseline_len, 'len_diff': df['resp_len'].to_numpy(dtype=np.int64) - baseline_len,
+        'seq_ratio': shingle_similarity(bits, bits[base]),
+        'payload_type': detect_payload_type(df['payload']),
+        'baseline_snippet': baseline_snippet, 'resp_snippet': snippets.str.slice(0, 300),
+    }, columns=OUT_COLUMNS)
+
+
+def build_features(df, workers=None, chunk_rows=100000):
+    """
+    Raw runs -> feature frame in the original row order. Inputs above
+    PARALLEL_MIN_ROWS are split into chunks of whole groups and built in a
+    process pool (workers=None uses every CPU, workers=1 stays in-process).
+    """
+    df = df.reset_index(drop=True)
+    if workers == 1 or len(df) < PARALLEL_MIN_ROWS:
+        return _features_for_groups(df)
+
+    gid = df.groupby(GROUP_KEYS, sort=False, dropna=False).ngroup().to_numpy()
+    # contiguous runs of groups with about chunk_rows rows each
+    group_rows = np.bincount(gid)
+    chunk_of_group = np.cumsum(group_rows) // max(chunk_rows, 1)
+    chunk = chunk_of_group[gid]
+    order = np.argsort(chunk, kind='stable')
+    bounds = np.searchsorted(chunk[order], np.unique(chunk), side='left').tolist() + [len(df)]
+    parts = [df.iloc[order[s:e]] for s, e in zip(bounds[:-1], bounds[1:])]
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        built = list(pool.map(_features_for_groups, parts))
+    out = pd.concat(built, ignore_index=True)
+    # back to the input row order
+    out.index = order
+    return out.sort_index()
+
 
 def main():
-    df = pd.read_csv(RAW)
-    # If you included a 'benign_value' per target and ran it, good. If not, baselines inferred.
-    bases = build_baselines(df)
-    out_rows = []
-    for _,r in df.iterrows():
-        key = (r['url'], r['method'], r['param'])
-        base = bases.get(key, {'baseline_len':0,'baseline_snippet':''})
-        len_diff = int(r['resp_len']) - base['baseline_len']
-        # sequence ratio on first 200 chars
-        seq_ratio = difflib.SequenceMatcher(None, str(base['baseline_snippet'])[:200], str(r['resp_snippet'])[:200]).ratio()
-        ptype = detect_payload_type(r['payload'])
-        out_rows.append({
-            'url': r['url'], 'method': r['method'], 'param': r['param'], 'payload': r['payload'],
-            'status': int(r['status']), 'resp_len': int(r['resp_len']), 'resp_time': float(r['resp_time']),
-            'sql_error_flag': int(r['sql_error_flag']),
-            'baseline_len': base['baseline_len'], 'len_diff': len_diff, 'seq_ratio': seq_ratio,
-            'payload_type': ptype, 'baseline_snippet': base['baseline_snippet'][:300], 'resp_snippet': r['resp_snippet'][:300]
-        })
-    out_df = pd.DataFrame(out_rows)
+    out_df = build_features(pd.read_csv(RAW))
     out_df.to_csv(OUT, index=False)
     print("Wrote", OUT, " with shape ", out_df.shape)
 
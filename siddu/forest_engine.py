@@ -0,0 +1,147 @@
+# forest_engine.py
+"""
+Compact random-forest inference without sklearn at scoring time.
+
+export_forest() flattens every tree of a fitted RandomForestClassifier into
+shared contiguous node arrays and writes them as .npy files in a directory;
+CompactForest.load() memory-maps them back and scores whole batches with a
+vectorized traversal that walks all trees of all rows one level at a time.
+
+    python forest_engine.py sqli_model_package.joblib sqli_model.forest
+    python forest_engine.py ../Akhila/models/rf_webscanpro.pkl rf_webscanpro.forest
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+ARRAYS = ('feature', 'threshold', 'left', 'right', 'value', 'roots')
+
+
+def export_forest(forest, out_dir, feature_columns=None):
+    """
+    Writes `forest` to out_dir. Leaves point to themselves (left == right == own
+    index), so a row that reached a leaf stays there while deeper trees finish.
+    Leaf values are stored as per-tree class probabilities, normalized exactly
+    like DecisionTreeClassifier.predict_proba.
+    """
+    trees = [est.tree_ for est in forest.estimators_]
+    sizes = [t.node_count for t in trees]
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+    n_nodes = int(sum(sizes))
+    n_classes = int(forest.n_classes_)
+
+    feature = np.zeros(n_nodes, dtype=np.int32)
+    threshold = np.zeros(n_nodes, dtype=np.float64)
+    left = np.empty(n_nodes, dtype=np.int32)
+    right = np.empty(n_nodes, dtype=np.int32)
+    value = np.empty((n_nodes, n_classes), dtype=np.float64)
+
+    for tree, start in zip(trees, offsets):
+        end = start + tree.node_count
+        own = np.arange(start, end, dtype=np.int32)
+        is_leaf = tree.children_left == -1
+        feature[start:end] = np.where(is_leaf, 0, tree.feature)
+        threshold[start:end] = tree.threshold
+        left[start:end] = np.where(is_leaf, own, tree.children_left + start)
+        right[start:end] = np.where(is_leaf, own, tree.children_right + start)
+        proba = tree.value[:, 0, :].astype(np.float64)
+        normalizer = proba.sum(axis=1)
+        normalizer[normalizer == 0.0] = 1.0
+        value[start:end] = proba / normalizer[:, None]
+
+    if feature_columns is None and hasattr(forest, 'feature_names_in_'):
+        feature_columns = list(forest.feature_names_in_)
+    meta = {
+        'classes': np.asarray(forest.classes_).tolist(),
+        'n_features': int(forest.n_features_in_),
+        'max_depth': int(max(t.max_depth for t in trees)),
+        'feature_columns': list(feature_columns) if feature_columns is not None else None,
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    arrays = {'feature': feature, 'threshold': threshold, 'left': left,
+              'right': right, 'value': value, 'roots': offsets.astype(np.int32)}
+    for name in ARRAYS:
+        np.save(os.path.join(out_dir, name + '.npy'), arrays[name])
+    with open(os.path.join(out_dir, 'meta.json'), 'w', encoding='utf8') as f:
+        json.dump(meta, f)
+    return out_dir
+
+
+class CompactForest:
+    """Read-only forest over flat node arrays; API mirrors predict/predict_proba."""
+
+    def __init__(self, arrays, meta):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.classes_ = np.asarray(meta['classes'])
+        self.n_features_in_ = meta['n_features']
+        self.max_depth = meta['max_depth']
+        self.feature_columns = meta['feature_columns']
+        # children[2 * node + went_left]: one gather per level instead of a where()
+        self._children = np.empty(2 * len(self.left), dtype=np.intp)
+        self._children[0::2] = self.right
+        self._children[1::2] = self.left
+        self._feature = np.asarray(self.feature, dtype=np.intp)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        arrays = {name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r' if mmap else None)
+                  for name in ARRAYS}
+        with open(os.path.join(path, 'meta.json'), encoding='utf8') as f:
+            meta = json.load(f)
+        return cls(arrays, meta)
+
+    def _matrix(self, X):
+        if hasattr(X, 'columns') and self.feature_columns is not None:
+            X = X[self.feature_columns]
+        # sklearn trees compare float32 features against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(f"expected {self.n_features_in_} features, got {X.shape[1]}")
+        return X
+
+    def apply(self, X):
+        """Leaf node index per (row, tree)."""
+        X = self._matrix(X)
+        n, n_features = X.shape
+        flat = np.ascontiguousarray(X).ravel()
+        row_base = (np.arange(n, dtype=np.intp) * n_features)[:, None]
+        nodes = np.broadcast_to(np.asarray(self.roots, dtype=np.intp), (n, len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = np.take(flat, row_base + np.take(self._feature, nodes)) <= np.take(self.threshold, nodes)
+            nodes = np.take(self._children, 2 * nodes + go_left)
+        return nodes
+
+    def predict_proba(self, X):
+        leaves = self.apply(X)
+        # summed tree by tree, in order, so the result matches sklearn bit for bit
+        proba = np.zeros((leaves.shape[0], self.value.shape[1]))
+        for t in range(leaves.shape[1]):
+            proba += self.value[leaves[:, t]]
+        proba /= leaves.shape[1]
+        return proba
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+def main():
+    if len(sys.argv) != 3:
+        raise SystemExit("usage: python forest_engine.py <model.joblib|model.pkl> <out_dir>")
+    import joblib
+
+    pkg = joblib.load(sys.argv[1])
+    if isinstance(pkg, dict):
+        export_forest(pkg['model'], sys.argv[2], pkg.get('feature_columns'))
+    else:
+        export_forest(pkg, sys.argv[2])
+    print("Exported forest to", sys.argv[2])
+
+
+if __name__ == '__main__':
+    main()
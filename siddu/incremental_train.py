@@ -0,0 +1,259 @@
+# incremental_train.py
+"""
+Incremental (online) training for the SQLi and XSS classifiers.
+
+Instead of refitting on the whole CSV, an OnlineModel is updated with
+partial_fit on each new batch of scan runs. Inputs are hashed (no vocabulary
+or column list to refit), every batch is first scored and then trained on
+(test-then-train), and the last `window` predictions form a rolling
+validation window. State, including how far each source has been consumed,
+is checkpointed after every batch.
+
+    python incremental_train.py xss --csv data/xss_dataset.csv --follow
+    python incremental_train.py sqli --store sqli_pipeline.sqlite
+
+--csv resumes after the rows already consumed as long as the file only grew.
+A rewritten file (feature_builder.py and sqlirunner.py rewrite their CSVs
+on every scan) is detected and consumed again from the start; for SQLi scan
+history prefer --store, which trains on each run once.
+"""
+import argparse
+import hashlib
+import os
+import time
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.naive_bayes import GaussianNB, MultinomialNB
+
+from train_xss import make_xss_vectorizer
+from trainmodel import add_heuristic_label
+
+CLASSES = np.array([0, 1])
+SQLI_NUMERIC = ['status', 'resp_len', 'resp_time', 'sql_error_flag', 'len_diff', 'seq_ratio']
+SQLI_CATEGORICAL = ['payload_type']
+CHECKPOINTS = {'xss': 'models/xss_online.joblib', 'sqli': 'models/sqli_online.joblib'}
+FINGERPRINT_BYTES = 1 << 16
+
+
+class OnlineModel:
+    """
+    task 'xss': inputs are texts, hashed as char 1-3 grams (like train_xss.py).
+    task 'sqli': inputs are feature rows, numeric columns signed-log scaled and
+    categoricals hashed as 'column=value'.
+    algo 'sgd' (logistic loss) or 'nb' (multinomial NB for text, Gaussian NB for rows).
+    """
+
+    def __init__(self, task, algo='sgd', window=5000):
+        if task not in CHECKPOINTS:
+            raise ValueError(f"unknown task {task!r}")
+        self.task = task
+        self.algo = algo
+        if task == 'xss':
+            self.hasher = make_xss_vectorizer()
+        else:
+            self.hasher = FeatureHasher(n_features=2 ** 10, input_type='dict', alternate_sign=False)
+        if algo == 'sgd':
+            self.model = SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42)
+        elif algo == 'nb':
+            self.model = MultinomialNB() if task == 'xss' else GaussianNB()
+        else:
+            raise ValueError(f"unknown algo {algo!r}")
+        self.window = deque(maxlen=window)
+        self.seen = 0
+        self.batches = 0
+        self.offsets = {}
+
+    def transform(self, inputs):
+        if self.task == 'xss':
+            return self.hasher.transform([str(t) for t in inputs])
+        frame = inputs if isinstance(inputs, pd.DataFrame) else pd.DataFrame(list(inputs))
+        rows = []
+        for rec in frame.to_dict('records'):
+            row = {}
+            for col in SQLI_NUMERIC:
+                v = float(rec.get(col, 0) or 0)
+                row[col] = np.sign(v) * np.log1p(abs(v))
+            for col in SQLI_CATEGORICAL:
+                if col in rec:
+                    row[f"{col}={rec[col]}"] = 1.0
+            rows.append(row)
+        X = self.hasher.transform(rows)
+        return X.toarray() if isinstance(self.model, GaussianNB) else X
+
+    @property
+    def fitted(self):
+        return self.batches > 0
+
+    def predict_proba(self, inputs):
+        return self.model.predict_proba(self.transform(inputs))[:, 1]
+
+    def update(self, inputs, labels):
+        """Scores the batch with the current model, records it in the window, then trains on it."""
+        y = np.asarray(labels, dtype=int)
+        if len(y) == 0:
+            return self.metrics()
+        X = self.transform(inputs)
+        if self.fitted:
+            proba = self.model.predict_proba(X)[:, 1]
+            self.window.extend(zip(proba.tolist(), y.tolist()))
+        self.model.partial_fit(X, y, classes=CLASSES)
+        self.seen += len(y)
+        self.batches += 1
+        return self.metrics()
+
+    def metrics(self):
+        """Accuracy / AUC over the rolling window of held-out (scored before training) rows."""
+        out = {'seen': self.seen, 'batches': self.batches, 'window': len(self.window)}
+        if self.window:
+            proba, y = map(np.array, zip(*self.window))
+            out['accuracy'] = round(float(((proba >= 0.5) == y).mean()), 4)
+            if len(set(y.tolist())) == 2:
+                out['auc'] = round(float(roc_auc_score(y, proba)), 4)
+        return out
+
+    def save(self, path):
+        """Atomic checkpoint: written to a temp file and renamed over the old one."""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        state = {'task': self.task, 'algo': self.algo, 'model': self.model, 'window': list(self.window),
+                 'window_size': self.window.maxlen, 'seen': self.seen, 'batches': self.batches,
+                 'offsets': self.offsets}
+        tmp = path + '.tmp'
+        joblib.dump(state, tmp)
+        os.replace(tmp, path)
+
+    def export(self, path):
+        """Package loadable by app.py / ScoringService (xss only: {'model', 'vectorizer'})."""
+        if self.task != 'xss':
+            raise ValueError("only the xss model has a text vectorizer package")
+        joblib.dump({'model': self.model, 'vectorizer': self.hasher}, path)
+
+    @classmethod
+    def load_or_create(cls, path, task, algo='sgd', window=5000):
+        if not os.path.exists(path):
+            return cls(task, algo, window)
+        state = joblib.load(path)
+        if state['task'] != task:
+            raise ValueError(f"checkpoint {path} holds a {state['task']} model")
+        model = cls(task, state['algo'], state['window_size'])
+        model.model = state['model']
+        model.window.extend(state['window'])
+        model.seen = state['seen']
+        model.batches = state['batches']
+        model.offsets = state['offsets']
+        return model
+
+
+def labelled_batch(task, df):
+    """(inputs, labels) for a batch; SQLi runs without labels get trainmodel's heuristic labels."""
+    if task == 'xss':
+        return df['text'].astype(str), df['label']
+    if 'label' not in df.columns:
+        df = add_heuristic_label(df.copy())
+    return df, df['label']
+
+
+def csv_fingerprint(path, size):
+    """Hash of the first and last FINGERPRINT_BYTES of the file's first `size` bytes."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        h.update(f.read(min(size, FINGERPRINT_BYTES)))
+        f.seek(max(size - FINGERPRINT_BYTES, 0))
+        h.update(f.read(min(size, FINGERPRINT_BYTES)))
+    return h.hexdigest()
+
+
+def csv_resume_offset(path, progress):
+    """Rows to skip: the consumed count if the consumed prefix is unchanged, else 0 (file was rewritten)."""
+    if not progress:
+        return 0
+    if os.path.getsize(path) < progress['size'] or csv_fingerprint(path, progress['size']) != progress['fingerprint']:
+        print(f"[csv] {path} was rewritten since the last run, consuming it from the start")
+        return 0
+    return progress['rows']
+
+
+def new_csv_rows(path, offset, batch_size):
+    """Yields (batch, new offset) for rows after the first `offset` data rows."""
+    reader = pd.read_csv(path, chunksize=batch_size, skiprows=range(1, offset + 1))
+    for chunk in reader:
+        offset += len(chunk)
+        yield chunk, offset
+
+
+def train_from_csv(model, path, checkpoint, batch_size=1000):
+    key = f"csv:{os.path.abspath(path)}"
+    # the rows consumed below cover at least the first `size` bytes, so that prefix identifies them
+    size = os.path.getsize(path)
+    progress = {'rows': csv_resume_offset(path, model.offsets.get(key)),
+                'size': size, 'fingerprint': csv_fingerprint(path, size)}
+    for batch, offset in new_csv_rows(path, progress['rows'], batch_size):
+        if batch.empty:
+            continue
+        metrics = model.update(*labelled_batch(model.task, batch))
+        model.offsets[key] = dict(progress, rows=offset)
+        model.save(checkpoint)
+        print(f"[{model.task}] +{len(batch)} rows from {path}: {metrics}")
+
+
+def train_from_store(model, store_path, checkpoint):
+    """
+    Trains on the features of every artifact-store run not consumed yet. Runs
+    whose features were served from the stage cache share a content hash and
+    are only trained on once.
+    """
+    from artifact_store import ArtifactStore
+
+    store = ArtifactStore(store_path)
+    done = model.offsets.setdefault(f"store:{os.path.abspath(store_path)}", [])
+    for run_id in reversed(store.runs()['run_id'].tolist()):
+        try:
+            content_hash = store.info('features', run_id)['content_hash']
+        except KeyError:
+            continue
+        if content_hash in done:
+            continue
+        metrics = model.update(*labelled_batch(model.task, store.get('features', run_id)))
+        done.append(content_hash)
+        model.save(checkpoint)
+        print(f"[{model.task}] run {run_id}: {metrics}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental SQLi / XSS training")
+    parser.add_argument('task', choices=sorted(CHECKPOINTS))
+    parser.add_argument('--csv', help="growing CSV of runs (xss: text,label; sqli: feature rows)")
+    parser.add_argument('--store', help="artifact store DB; trains on each new run's features (sqli)")
+    parser.add_argument('--algo', choices=['sgd', 'nb'], default='sgd')
+    parser.add_argument('--checkpoint')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--window', type=int, default=5000)
+    parser.add_argument('--follow', action='store_true', help="keep polling for new rows / runs")
+    parser.add_argument('--interval', type=float, default=30.0)
+    parser.add_argument('--export', help="xss only: write a {'model', 'vectorizer'} package for app.py")
+    args = parser.parse_args()
+    if not args.csv and not args.store:
+        parser.error("give --csv and/or --store")
+
+    checkpoint = args.checkpoint or CHECKPOINTS[args.task]
+    model = OnlineModel.load_or_create(checkpoint, args.task, args.algo, args.window)
+    while True:
+        if args.csv:
+            train_from_csv(model, args.csv, checkpoint, args.batch_size)
+        if args.store:
+            train_from_store(model, args.store, checkpoint)
+        if args.export and model.fitted:
+            model.export(args.export)
+        if not args.follow:
+            break
+        time.sleep(args.interval)
+    print("Checkpoint:", checkpoint, model.metrics())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+# input_filter.py
+"""
+Input filter in front of the XSS model for app.py.
+
+- the heuristic detector is one precompiled pattern (SUSPICIOUS_TOKENS and
+  the old regexes factored into a single alternation), so the lowercased input
+  is scanned once instead of once per token;
+- ML scores are kept in an LRU cache keyed by a hash of the input, so repeated
+  inputs skip the vectorizer and predict_proba;
+- check_many() dedupes a batch and scores every cache miss in one call;
+- latency of every check is recorded in a scoring_service.Metrics.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from scoring_service import Metrics
+
+SUSPICIOUS_TOKENS = [
+    "<script", "onerror", "onload", "javascript:", "<img", "<svg", "<iframe", "alert(", "<body", "document.cookie"
+]
+SPECIAL_CHARS = "<>\"'"
+SPECIAL_CHARS_LIMIT = 4
+
+# matches iff one of SUSPICIOUS_TOKENS or <\s*script\b, on\w+\s*=, javascript\s*: occurs;
+# factored by prefix so the regex engine tries few branches per position
+HEURISTIC_RE = re.compile(r"<(?:script|img|svg|iframe|body)|<\s*script\b|on(?:error|load|\w+\s*=)"
+                          r"|javascript\s*:|alert\(|document\.cookie")
+
+
+def is_suspicious(text):
+    """Same verdict as the old token loop + regexes in app.py."""
+    if not text:
+        return False
+    if sum(text.count(ch) for ch in SPECIAL_CHARS) >= SPECIAL_CHARS_LIMIT:
+        return True
+    return HEURISTIC_RE.search(text.lower()) is not None
+
+
+def input_key(text):
+    return hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+
+class ScoreCache:
+    """Thread-safe LRU of input hash -> score."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.hits += 1
+                return self.items[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self.lock:
+            self.items[key] = value
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {'size': len(self.items), 'maxsize': self.maxsize, 'hits': self.hits,
+                    'misses': self.misses, 'hit_rate': round(self.hits / total, 4) if total else 0.0}
+
+
+class InputFilter:
+    """
+    Verdicts for user inputs. With a ScoringService the "xss" model decides
+    (score >= threshold blocks); without one, or if scoring fails, the
+    heuristic does. Heuristic fallbacks are not cached, so the model is tried
+    again next time.
+    """
+
+    def __init__(self, scoring=None, model='xss', threshold=0.5, cache_size=10000):
+        self.scoring = scoring
+        self.model = model
+        self.threshold = threshold
+        self.cache = ScoreCache(cache_size)
+        self.metrics = Metrics()
+
+    def _verdict(self, text, score, source, cached=False):
+        if score is None:
+            blocked = is_suspicious(text)
+        else:
+            blocked = score >= self.threshold
+        return {'score': score, 'blocked': blocked, 'source': source, 'cached': cached}
+
+    def _score(self, texts):
+        if self.scoring is None or not texts:
+            return None
+        try:
+            return [float(s) for s in self.scoring.score(self.model, texts)]
+        except Exception as e:
+            print("ML scoring error:", e)
+            return None
+
+    def check_many(self, texts):
+        start = time.perf_counter()
+        texts = ['' if t is None else str(t) for t in texts]
+        keys = [input_key(t) for t in texts]
+        scores = {}
+        cached = set()
+        if self.scoring is not None:
+            for key in dict.fromkeys(keys):
+                score = self.cache.get(key)
+                if score is not None:
+                    scores[key] = score
+                    cached.add(key)
+            misses = {k: t for k, t in zip(keys, texts) if k not in scores}
+            fresh = self._score(list(misses.values()))
+            if fresh is not None:
+                for key, score in zip(misses, fresh):
+                    scores[key] = score
+                    self.cache.put(key, score)
+
+        results = [self._verdict(t, scores.get(k), 'ml' if k in scores else 'heuristic', k in cached)
+                   for t, k in zip(texts, keys)]
+        self.metrics.record_batch(len(texts))
+        self.metrics.record_request(len(texts), time.perf_counter() - start)
+        return results
+
+    def check(self, text):
+        return self.check_many([text])[0]
+
+    def stats(self):
+        return {'filter': self.metrics.snapshot(), 'cache': self.cache.stats(),
+                'ml': self.scoring is not None, 'threshold': self.threshold}
@@ -0,0 +1,129 @@
+# pipeline.py
+"""
+Runs the SQLi ML pipeline on top of the artifact store:
+
+  raw -> features -> anomaly_scores -> labeled
+           features -> model -> report
+
+The model stage is trainmodel.py's model: every feature row, with
+trainmodel's heuristic labels (the top-k anomaly labels are exported for
+review but are too few rows to train on).
+
+Every stage reads only the columns it needs from the store and is skipped
+when its code, parameters and inputs are unchanged since an earlier run.
+
+    python pipeline.py                     # raw rows from sqli_runs_raw.csv
+    python pipeline.py --scan              # run the payloads against targets.csv first
+    python pipeline.py --export            # also write the legacy CSV / joblib files
+"""
+import argparse
+import hashlib
+
+import joblib
+import pandas as pd
+
+from artifact_store import ArtifactStore, DEFAULT_DB
+import feature_builder
+import labeltopkfromunsupervised
+import scorereport
+import trainmodel
+import unsupervisedisolation
+from scoring_service import ModelEntry
+
+FEATURE_INPUT_COLUMNS = ['url', 'method', 'param', 'payload', 'status', 'resp_len', 'resp_time',
+                         'sql_error_flag', 'resp_snippet']
+NUMERIC_FEATURES = ['status', 'resp_len', 'resp_time', 'sql_error_flag', 'baseline_len', 'len_diff', 'seq_ratio']
+TRAIN_COLUMNS = ['status', 'resp_len', 'resp_time', 'sql_error_flag', 'len_diff', 'seq_ratio', 'payload_type']
+
+
+def file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def run_pipeline(store, run_id, raw_csv=None, scan=False, k=labeltopkfromunsupervised.K, top=50):
+    ran = {}
+
+    if scan:
+        import sqlirunner
+        rows = sqlirunner.iter_runs(sqlirunner.load_targets(sqlirunner.TARGETS_CSV),
+                                    sqlirunner.load_payloads(sqlirunner.PAYLOADS_TXT))
+        store.put('raw', pd.DataFrame(rows, columns=sqlirunner.RAW_COLUMNS), run_id)
+        ran['raw'] = True
+    else:
+        def load_raw(path, sha256):
+            return pd.read_csv(path)
+        ran['raw'] = store.run_stage('raw', load_raw, run_id,
+                                     params={'path': raw_csv, 'sha256': file_sha256(raw_csv)})
+
+    def features():
+        return feature_builder.build_features(store.get('raw', run_id, columns=FEATURE_INPUT_COLUMNS))
+    ran['features'] = store.run_stage('features', features, run_id, inputs=['raw'],
+                                      code=[feature_builder])
+
+    def anomaly_scores(top):
+        df = store.get('features', run_id, columns=['url', 'param', 'payload'] + NUMERIC_FEATURES)
+        return unsupervisedisolation.score_anomalies(df, top)[0]
+    ran['anomaly_scores'] = store.run_stage('anomaly_scores', anomaly_scores, run_id, inputs=['features'],
+                                            params={'top': top}, code=[unsupervisedisolation.score_anomalies])
+
+    def labeled(k):
+        return labeltopkfromunsupervised.label_top_k(store.get('anomaly_scores', run_id), k)
+    ran['labeled'] = store.run_stage('labeled', labeled, run_id, inputs=['anomaly_scores'],
+                                     params={'k': k}, code=[labeltopkfromunsupervised.label_top_k])
+
+    def model():
+        # same as trainmodel.py: all feature rows, heuristic labels
+        features = store.get('features', run_id, columns=TRAIN_COLUMNS)
+        return trainmodel.train(trainmodel.add_heuristic_label(features))
+    ran['model'] = store.run_stage('model', model, run_id, inputs=['features'], kind='blob',
+                                   code=[trainmodel.train, trainmodel.preprocess, trainmodel.add_heuristic_label])
+
+    def report():
+        entry = ModelEntry.from_package(store.get_blob('model', run_id))
+        return scorereport.build_report(store.get('features', run_id), entry)
+    ran['report'] = store.run_stage('report', report, run_id, inputs=['features', 'model'],
+                                    code=[scorereport.build_report])
+    return ran
+
+
+def export_legacy(store, run_id):
+    """Writes the files the standalone scripts and week7report.py read."""
+    store.export_csv('features', feature_builder.OUT, run_id)
+    store.export_csv('anomaly_scores', labeltopkfromunsupervised.SRC, run_id)
+    store.export_csv('labeled', labeltopkfromunsupervised.OUT, run_id)
+    joblib.dump(store.get_blob('model', run_id), trainmodel.OUT)
+    report = store.get('report', run_id)
+    report.to_csv(scorereport.OUT_CSV, index=False)
+    with open(scorereport.OUT_HTML, 'w', encoding='utf8') as f:
+        f.write(scorereport.render_html(report))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebScanPro SQLi ML pipeline")
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--run-id')
+    parser.add_argument('--raw-csv', default=feature_builder.RAW)
+    parser.add_argument('--scan', action='store_true', help="run sqlirunner instead of reading --raw-csv")
+    parser.add_argument('--k', type=int, default=labeltopkfromunsupervised.K)
+    parser.add_argument('--export', action='store_true', help="write the legacy CSV / joblib outputs")
+    args = parser.parse_args()
+
+    store = ArtifactStore(args.db)
+    run_id = store.start_run(args.run_id)
+    ran = run_pipeline(store, run_id, args.raw_csv, args.scan, args.k)
+    print("Run", run_id)
+    for stage, did_run in ran.items():
+        meta = store.info(stage, run_id)
+        rows = f"{meta['rows']} rows" if meta['rows'] is not None else meta['kind']
+        print(f"  {stage:<15} {'ran' if did_run else 'cached':<7} {rows:<10} {meta['content_hash'][:12]}")
+    if args.export:
+        export_legacy(store, run_id)
+        print("Exported legacy files")
+
+
+if __name__ == '__main__':
+    main()
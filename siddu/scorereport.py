@@ -1,6 +1,7 @@
 # score_report.py
-import pandas as pd, joblib, os
+import pandas as pd, os
 from jinja2 import Template
+from scoring_service import ModelEntry
 
 MODEL_PACKAGE = 'sqli_model_package.joblib'
 FEATURES_CSV = 'sqli_runs_features.csv'
@@ -26,22 +27,10 @@ tpl = """
 </body></html>
 """
 
-def main():
-    pkg = joblib.load(MODEL_PACKAGE)
-    clf = pkg['model']; feature_columns = pkg['feature_columns']
-    df = pd.read_csv(FEATURES_CSV)
-    # Build X same as during training: keep same columns
-    X = df.copy()
-    # if payload_type present and one-hot encoding was used, create dummies and align columns
-    if 'payload_type' in X.columns:
-        X = pd.get_dummies(X, columns=['payload_type'], drop_first=True)
-    # Ensure we have all feature columns
-    for c in feature_columns:
-        if c not in X.columns:
-            X[c] = 0
-    X = X[feature_columns]
-    probs = clf.predict_proba(X)[:,1]
-    df['confidence'] = probs
+def build_report(df, model):
+    """Scored findings sorted by confidence; model is a ModelEntry."""
+    # one predict_proba call; columns are aligned/one-hot encoded like during training
+    df = df.assign(confidence=model.predict_proba(df))
     # pick best evidence and suggestion
     rows = []
     for _,r in df.iterrows():
@@ -52,11 +41,17 @@ def main():
         suggested_fix = 'Use parameterized queries / ORM + input validation'
         rows.append({'url': r['url'], 'param': r['param'], 'payload': r['payload'], 'confidence': float(r['confidence']),
                      'evidence': '; '.join(evidence) if evidence else 'no clear heuristic', 'suggested_fix': suggested_fix})
+    return pd.DataFrame(rows).sort_values('confidence', ascending=False)
+
+def render_html(out_df):
+    return Template(tpl).render(rows=out_df.to_dict('records'))
+
+def main():
+    out_df = build_report(pd.read_csv(FEATURES_CSV), ModelEntry(MODEL_PACKAGE))
     # save CSV
-    out_df = pd.DataFrame(rows).sort_values('confidence', ascending=False)
     out_df.to_csv(OUT_CSV, index=False)
     # save HTML
-    html = Template(tpl).render(rows=out_df.to_dict('records'))
+    html = render_html(out_df)
     with open(OUT_HTML, 'w', encoding='utf8') as f:
         f.write(html)
     print("Wrote", OUT_CSV, "and", OUT_HTML)
@@ -0,0 +1,314 @@
+# scoring_service.py
+"""
+Long-lived scoring service: every model is loaded once (arrays memory-mapped)
+and concurrent requests are micro-batched into one predict_proba call.
+
+In-process:
+    service = ScoringService({'xss': 'models/xss_detector.joblib'})
+    service.score('xss', ['<script>alert(1)</script>'])
+
+HTTP:
+    python scoring_service.py --model xss=models/xss_detector.joblib \
+        --model sqli=sqli_model_package.joblib --port 5001
+    POST /score/<name>  {"inputs": [...]}  ->  {"scores": [...]}
+    GET  /metrics, GET /models
+"""
+import argparse
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+class ModelEntry:
+    """
+    One loaded model package. Handles the shapes used in this folder:
+    {'model', 'vectorizer'} (text in), {'model', 'feature_columns'} (rows in),
+    a bare estimator (rows in, columns from feature_names_in_) and a forest
+    directory written by forest_engine.export_forest (rows in, no sklearn).
+    """
+
+    def __init__(self, path, mmap=True, package=None):
+        self.path = path
+        self.vectorizer = None
+        self.feature_columns = None
+        if package is None and os.path.isdir(path):
+            from forest_engine import CompactForest
+            self.model = CompactForest.load(path, mmap=mmap)
+            self.feature_columns = self.model.feature_columns
+        else:
+            pkg = package if package is not None else joblib.load(path, mmap_mode='r' if mmap else None)
+            if isinstance(pkg, dict):
+                self.model = pkg['model']
+                self.vectorizer = pkg.get('vectorizer')
+                self.feature_columns = pkg.get('feature_columns')
+            else:
+                self.model = pkg
+                names = getattr(pkg, 'feature_names_in_', None)
+                self.feature_columns = list(names) if names is not None else None
+        classes = list(getattr(self.model, 'classes_', []))
+        self.positive = classes.index(1) if 1 in classes else -1
+
+    @classmethod
+    def from_package(cls, package, name='<memory>'):
+        """Wraps an already loaded package (e.g. from the artifact store)."""
+        return cls(name, package=package)
+
+    def prepare(self, inputs):
+        """Inputs -> model matrix: strings for a vectorizer model, dicts (or a DataFrame) otherwise."""
+        if self.vectorizer is not None:
+            return self.vectorizer.transform([str(t) for t in inputs])
+        frame = inputs if isinstance(inputs, pd.DataFrame) else pd.DataFrame(list(inputs))
+        if self.feature_columns is None:
+            return frame
+        return align_features(frame, self.feature_columns)
+
+    def predict_proba(self, inputs):
+        """Positive-class probability for each input."""
+        return self.model.predict_proba(self.prepare(inputs))[:, self.positive]
+
+
+def align_features(frame, feature_columns):
+    """
+    Builds exactly `feature_columns` from a raw frame, one-hot encoding
+    categorical columns the way pd.get_dummies(drop_first=True) named them
+    at training time. Works row by row, so a batch of one is encoded the
+    same way as the full CSV.
+    """
+    categorical = [c for c in frame.columns if not pd.api.types.is_numeric_dtype(frame[c])]
+    out = {}
+    for col in feature_columns:
+        if col in frame.columns:
+            out[col] = frame[col].to_numpy()
+            continue
+        # longest prefix wins: 'payload_type_time' comes from payload_type, not payload
+        source = max((c for c in categorical if col.startswith(c + '_')), key=len, default=None)
+        if source is not None:
+            out[col] = (frame[source].astype(str) == col[len(source) + 1:]).to_numpy(dtype=np.uint8)
+        else:
+            out[col] = np.zeros(len(frame), dtype=np.uint8)
+    return pd.DataFrame(out, columns=feature_columns, index=frame.index)
+
+
+class Metrics:
+    """Counters plus a window of recent request latencies; safe to update from any thread."""
+
+    def __init__(self, window=10000):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+
+    def record_batch(self, size):
+        with self.lock:
+            self.batches += 1
+            self.batch_sizes.append(size)
+
+    def record_request(self, rows, latency, ok=True):
+        with self.lock:
+            self.requests += 1
+            self.rows += rows
+            self.latencies.append(latency)
+            if not ok:
+                self.errors += 1
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            lat = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+            return {
+                'requests': self.requests,
+                'rows': self.rows,
+                'batches': self.batches,
+                'errors': self.errors,
+                'requests_per_sec': round(self.requests / elapsed, 2),
+                'rows_per_sec': round(self.rows / elapsed, 2),
+                'avg_batch_rows': round(float(np.mean(self.batch_sizes)), 2) if self.batch_sizes else 0.0,
+                'latency_ms': {
+                    'p50': round(float(np.percentile(lat, 50)), 3),
+                    'p95': round(float(np.percentile(lat, 95)), 3),
+                    'p99': round(float(np.percentile(lat, 99)), 3),
+                    'max': round(float(lat.max()), 3),
+                },
+            }
+
+
+class MicroBatcher:
+    """
+    Background thread that drains pending requests for one model. It waits at
+    most `max_wait` seconds after the first request for more to arrive, up to
+    `max_rows`, then scores them all in one predict_proba call and resolves
+    each request's Future with its own slice. If that call fails, each
+    request is scored on its own, so only the requests that fail by
+    themselves get the exception.
+    """
+
+    def __init__(self, entry, max_rows=256, max_wait=0.005):
+        self.entry = entry
+        self.max_rows = max_rows
+        self.max_wait = max_wait
+        self.metrics = Metrics()
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, inputs):
+        fut = Future()
+        self.pending.put((list(inputs), fut, time.perf_counter()))
+        return fut
+
+    def _collect(self):
+        batch = [self.pending.get()]
+        if batch[0] is None:
+            return None
+        rows = len(batch[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while rows < self.max_rows:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self.pending.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self.pending.put(None)
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def _score(self, inputs):
+        self.metrics.record_batch(len(inputs))
+        return self.entry.predict_proba(inputs) if inputs else np.zeros(0)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            try:
+                scores = self._score([x for items, _, _ in batch for x in items])
+                error = None
+            except Exception as e:
+                scores, error = None, e
+
+            start = 0
+            for items, fut, submitted in batch:
+                result = None
+                if scores is not None:
+                    result = scores[start:start + len(items)].tolist()
+                    start += len(items)
+                elif len(batch) > 1:
+                    try:
+                        result = self._score(items).tolist()
+                    except Exception as e:
+                        error = e
+                latency = time.perf_counter() - submitted
+                if result is None:
+                    self.metrics.record_request(len(items), latency, ok=False)
+                    fut.set_exception(error)
+                    continue
+                fut.set_result(result)
+                self.metrics.record_request(len(items), latency)
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+
+
+class ScoringService:
+    """Named models, each with its own micro-batcher."""
+
+    def __init__(self, models, max_rows=256, max_wait=0.005, mmap=True):
+        self.batchers = {
+            name: MicroBatcher(ModelEntry(path, mmap=mmap), max_rows, max_wait)
+            for name, path in models.items()
+        }
+
+    def submit(self, name, inputs):
+        return self.batchers[name].submit(inputs)
+
+    def score(self, name, inputs, timeout=30):
+        return self.submit(name, inputs).result(timeout)
+
+    def score_frame(self, name, frame):
+        """Scores a whole DataFrame in one call (batch jobs such as the report scripts)."""
+        return self.batchers[name].entry.predict_proba(frame)
+
+    def models(self):
+        return {name: b.entry.path for name, b in self.batchers.items()}
+
+    def metrics(self):
+        return {name: b.metrics.snapshot() for name, b in self.batchers.items()}
+
+    def close(self):
+        for b in self.batchers.values():
+            b.close()
+
+
+def create_app(service):
+    from flask import Flask, jsonify, request
+
+    app = Flask(__name__)
+
+    @app.route('/score/<name>', methods=['POST'])
+    def score(name):
+        if name not in service.batchers:
+            return jsonify({'error': f'unknown model {name}'}), 404
+        payload = request.get_json(silent=True) or {}
+        inputs = payload.get('inputs')
+        if not isinstance(inputs, list):
+            return jsonify({'error': "'inputs' must be a list"}), 400
+        try:
+            return jsonify({'scores': service.score(name, inputs)})
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
+
+    @app.route('/metrics')
+    def metrics():
+        return jsonify(service.metrics())
+
+    @app.route('/models')
+    def models():
+        return jsonify(service.models())
+
+    return app
+
+
+def parse_models(specs):
+    models = {}
+    for spec in specs:
+        name, _, path = spec.partition('=')
+        if not path:
+            raise SystemExit(f"--model expects name=path, got {spec!r}")
+        models[name] = path
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WebScanPro model scoring service")
+    parser.add_argument('--model', action='append', required=True, help="name=path/to/model.joblib")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5001)
+    parser.add_argument('--max-rows', type=int, default=256)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    service = ScoringService(parse_models(args.model), args.max_rows, args.max_wait_ms / 1000)
+    print("Loaded models:", service.models())
+    create_app(service).run(host=args.host, port=args.port, threaded=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 # simple_report_from_model.py
-import pandas as pd, joblib
+import pandas as pd
 from jinja2 import Template
+from scoring_service import ModelEntry
 
 MODEL_PKG = 'sqli_model_package.joblib'   # produced by train_model.py
 FEATURES_CSV = 'sqli_runs_features.csv'   # ensured above
@@ -24,20 +25,11 @@ tpl = """
 </table></body></html>
 """
 
-pkg = joblib.load(MODEL_PKG)
-clf = pkg['model']; feature_columns = pkg['feature_columns']
+model = ModelEntry(MODEL_PKG)
 df = pd.read_csv(FEATURES_CSV)
 
-# Prepare X -> one-hot payload_type if present (simple)
-X = df.copy()
-if 'payload_type' in X.columns:
-    X = pd.get_dummies(X, columns=['payload_type'], drop_first=True)
-for c in feature_columns:
-    if c not in X.columns:
-        X[c] = 0
-X = X[feature_columns]
-probs = clf.predict_proba(X)[:,1]
-df['confidence'] = probs
+# ModelEntry one-hot encodes payload_type and aligns the feature columns
+df['confidence'] = model.predict_proba(df)
 rows = []
 for _,r in df.iterrows():
     evidence = []
@@ -64,20 +64,26 @@ def run_one(target, payload):
     snippet = text[:500].replace('\n',' ')
     return resp.status_code, len(text), elapsed, sql_err, snippet
 
+RAW_COLUMNS = ['run_id','url','method','param','payload','status','resp_len','resp_time','sql_error_flag','resp_snippet']
+
+def iter_runs(targets, payloads):
+    """Yields one raw row (RAW_COLUMNS order) per target x payload."""
+    for t in tqdm(targets, desc='targets'):
+        for p in payloads:
+            run_id = str(uuid.uuid4())
+            try:
+                status, rlen, rtime, sql_err, snippet = run_one(t, p)
+            except Exception as e:
+                status, rlen, rtime, sql_err, snippet = -1, 0, 0.0, False, f'ERROR:{e}'
+            yield [run_id, t['url'], t['method'], t['param'], p, status, rlen, rtime, int(sql_err), snippet]
+
 def main():
     targets = load_targets(TARGETS_CSV)
     payloads = load_payloads(PAYLOADS_TXT)
     with open(OUT_CSV, 'w', newline='', encoding='utf-8') as out:
         writer = csv.writer(out)
-        writer.writerow(['run_id','url','method','param','payload','status','resp_len','resp_time','sql_error_flag','resp_snippet'])
-        for t in tqdm(targets, desc='targets'):
-            for p in payloads:
-                run_id = str(uuid.uuid4())
-                try:
-                    status, rlen, rtime, sql_err, snippet = run_one(t, p)
-                except Exception as e:
-                    status, rlen, rtime, sql_err, snippet = -1, 0, 0.0, False, f'ERROR:{e}'
-                writer.writerow([run_id, t['url'], t['method'], t['param'], p, status, rlen, rtime, int(sql_err), snippet])
+        writer.writerow(RAW_COLUMNS)
+        writer.writerows(iter_runs(targets, payloads))
 
 if __name__ == '__main__':
     main()
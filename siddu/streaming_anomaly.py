@@ -0,0 +1,255 @@
+# streaming_anomaly.py
+"""
+Streaming anomaly scoring for SQLi runs.
+
+Instead of re-running unsupervisedisolation.py on the whole features CSV after
+each scan, runs are featurized and scored in batches as sqlirunner produces
+them, with the persisted isof_package.joblib. The K most anomalous runs are
+kept in a min-heap (and rewritten to the scores CSV after every batch), and a
+reservoir sample of all feature rows seen is used to refit the IsolationForest
+in a background thread every `refit_every` rows. When a refit finishes the
+model is swapped in, the heap is rescored with it and the package is saved.
+
+    python streaming_anomaly.py --scan
+    python streaming_anomaly.py --raw-csv sqli_runs_raw.csv --k 50
+"""
+import argparse
+import heapq
+import itertools
+import os
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+
+import feature_builder
+from unsupervisedisolation import ISOF_PARAMS, SCORE_COLUMNS
+
+PACKAGE = 'isof_package.joblib'
+OUT = 'sqli_unsupervised_scores.csv'
+FEATURE_COLUMNS = ['status', 'resp_len', 'resp_time', 'sql_error_flag', 'baseline_len', 'len_diff', 'seq_ratio']
+MIN_FIT_ROWS = 64
+
+
+class StreamingFeatures:
+    """
+    feature_builder's features for raw runs arriving in batches. The baseline
+    of each (url, method, param) is kept across batches and follows the same
+    preference as build_baselines (first benign run, else smallest resp_len),
+    but only over the runs seen so far.
+    """
+
+    def __init__(self):
+        self.baselines = {}  # key -> (benign, resp_len, shingle bits, snippet)
+
+    def transform(self, raw):
+        df = raw.reset_index(drop=True)
+        snippets = df['resp_snippet'].fillna('').astype(str)
+        bits = feature_builder.shingle_bits(snippets.tolist())
+        benign = df['payload'].fillna('').isin(feature_builder.BENIGN_PAYLOADS).to_numpy()
+        resp_len = df['resp_len'].to_numpy(dtype=np.int64)
+        keys = list(zip(df['url'], df['method'], df['param']))
+        for i, key in enumerate(keys):
+            cur = self.baselines.get(key)
+            if cur is None or (benign[i] and not cur[0]) or (not benign[i] and not cur[0] and resp_len[i] < cur[1]):
+                self.baselines[key] = (bool(benign[i]), int(resp_len[i]), bits[i], snippets.iat[i][:300])
+        base = [self.baselines[k] for k in keys]
+        baseline_len = np.array([b[1] for b in base], dtype=np.int64)
+        base_bits = np.stack([b[2] for b in base]) if base else bits
+
+        return pd.DataFrame({
+            'url': df['url'], 'method': df['method'], 'param': df['param'], 'payload': df['payload'],
+            'status': df['status'].astype(int), 'resp_len': resp_len,
+            'resp_time': df['resp_time'].astype(float), 'sql_error_flag': df['sql_error_flag'].astype(int),
+            'baseline_len': baseline_len, 'len_diff': resp_len - baseline_len,
+            'seq_ratio': feature_builder.shingle_similarity(bits, base_bits),
+            'payload_type': feature_builder.detect_payload_type(df['payload']),
+        })
+
+
+class StreamingAnomalyScorer:
+    """
+    Scores feature batches with the current IsolationForest and keeps the top
+    K. Without a package the first MIN_FIT_ROWS rows are held back until the
+    reservoir is large enough for an initial (foreground) fit.
+    """
+
+    def __init__(self, package_path=PACKAGE, k=50, reservoir_size=5000, refit_every=1000,
+                 min_fit_rows=MIN_FIT_ROWS, save=True, seed=42):
+        self.package_path = package_path
+        self.k = k
+        self.reservoir_size = reservoir_size
+        self.refit_every = refit_every
+        self.min_fit_rows = min_fit_rows
+        self.save = save
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.Lock()
+        self.features = StreamingFeatures()
+        self.heap = []  # (score, seq, feature row, record), smallest score first
+        self.seq = itertools.count()
+        self.reservoir = []
+        self.held = []  # (feature rows, records) waiting for a first model
+        self.seen = 0
+        self.since_refit = 0
+        self.refits = 0
+        self.refit_thread = None
+
+        self.model, self.feature_cols, self.fill = None, FEATURE_COLUMNS, {}
+        if package_path and os.path.exists(package_path):
+            package = joblib.load(package_path)
+            self.model = package['isof']
+            self.feature_cols = package['feature_cols']
+            self.fill = package.get('fill', {})
+
+    def _matrix(self, feats):
+        X = feats.reindex(columns=self.feature_cols).apply(pd.to_numeric, errors='coerce')
+        return X.fillna(self.fill).fillna(0).to_numpy(dtype=float)
+
+    def _sample(self, X):
+        # reservoir sampling (algorithm R) over every row seen
+        for row in X:
+            self.seen += 1
+            if len(self.reservoir) < self.reservoir_size:
+                self.reservoir.append(row)
+            else:
+                j = self.rng.integers(0, self.seen)
+                if j < self.reservoir_size:
+                    self.reservoir[j] = row
+
+    def _scores(self, model, X):
+        return -model.decision_function(pd.DataFrame(X, columns=self.feature_cols))  # higher => more anomalous
+
+    def _push(self, scores, X, records):
+        for score, row, rec in zip(scores, X, records):
+            item = (float(score), next(self.seq), row, rec)
+            if len(self.heap) < self.k:
+                heapq.heappush(self.heap, item)
+            elif item[0] > self.heap[0][0]:
+                heapq.heapreplace(self.heap, item)
+
+    def score_raw(self, raw):
+        """Featurizes and scores a batch of raw runs (DataFrame or rows in sqlirunner.RAW_COLUMNS order)."""
+        if not isinstance(raw, pd.DataFrame):
+            from sqlirunner import RAW_COLUMNS
+            raw = pd.DataFrame(list(raw), columns=RAW_COLUMNS)
+        return self.score_features(self.features.transform(raw))
+
+    def score_features(self, feats):
+        """Scores a feature batch; returns the anomaly scores (None while no model exists yet)."""
+        if feats.empty:
+            return np.zeros(0)
+        X = self._matrix(feats)
+        records = feats.reindex(columns=SCORE_COLUMNS[:-1]).to_dict('records')
+        self._sample(X)
+        if self.model is None:
+            self.held.append((X, records))
+            if len(self.reservoir) < self.min_fit_rows:
+                return None
+            self._fit_held(score_last=False)
+        with self.lock:
+            scores = self._scores(self.model, X)
+            self._push(scores, X, records)
+        self.since_refit += len(X)
+        if self.refit_every and self.since_refit >= self.refit_every and not self.refitting:
+            self.refit_async()
+        return scores
+
+    def _fit_held(self, score_last=True):
+        self._swap(self._fit(np.array(self.reservoir)))
+        held, self.held = self.held, []
+        for X_held, rec_held in (held if score_last else held[:-1]):
+            with self.lock:
+                self._push(self._scores(self.model, X_held), X_held, rec_held)
+
+    def finish(self):
+        """End of stream: fits on held-back rows if there never were enough, and waits for a running refit."""
+        if self.model is None and self.held:
+            self._fit_held()
+        self.wait()
+
+    @property
+    def refitting(self):
+        return self.refit_thread is not None and self.refit_thread.is_alive()
+
+    def _fit(self, sample):
+        params = self.model.get_params() if self.model is not None else dict(ISOF_PARAMS)
+        fill = dict(zip(self.feature_cols, np.median(sample, axis=0).tolist()))
+        return IsolationForest(**params).fit(pd.DataFrame(sample, columns=self.feature_cols)), fill
+
+    def _swap(self, fitted):
+        model, fill = fitted
+        with self.lock:
+            self.model, self.fill = model, fill
+            # scores from different forests are not comparable: rescore the kept top K
+            if self.heap:
+                rescored = self._scores(model, np.array([item[2] for item in self.heap]))
+                self.heap = [(float(s), seq, row, rec) for s, (_, seq, row, rec) in zip(rescored, self.heap)]
+                heapq.heapify(self.heap)
+            self.refits += 1
+        if self.save and self.package_path:
+            tmp = self.package_path + '.tmp'
+            joblib.dump({'isof': model, 'feature_cols': self.feature_cols, 'fill': fill}, tmp)
+            os.replace(tmp, self.package_path)
+
+    def refit_async(self):
+        """Refits on a snapshot of the reservoir in a background thread."""
+        self.since_refit = 0
+        sample = np.array(self.reservoir)
+        self.refit_thread = threading.Thread(target=lambda: self._swap(self._fit(sample)), daemon=True)
+        self.refit_thread.start()
+
+    def wait(self):
+        if self.refit_thread is not None:
+            self.refit_thread.join()
+
+    def top(self):
+        with self.lock:
+            items = sorted(self.heap, key=lambda item: (-item[0], item[1]))
+        return pd.DataFrame([{**rec, 'anomaly_score': score} for score, _, _, rec in items], columns=SCORE_COLUMNS)
+
+    def write_top(self, path):
+        tmp = path + '.tmp'
+        self.top().to_csv(tmp, index=False)
+        os.replace(tmp, path)
+
+
+def batched(rows, size):
+    it = iter(rows)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming IsolationForest scoring of SQLi runs")
+    parser.add_argument('--scan', action='store_true', help="run sqlirunner and score runs as they complete")
+    parser.add_argument('--raw-csv', default='sqli_runs_raw.csv', help="replay a finished scan instead")
+    parser.add_argument('--package', default=PACKAGE)
+    parser.add_argument('--out', default=OUT)
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--batch-size', type=int, default=20)
+    parser.add_argument('--reservoir', type=int, default=5000)
+    parser.add_argument('--refit-every', type=int, default=1000, help="rows between background refits (0: never)")
+    args = parser.parse_args()
+
+    scorer = StreamingAnomalyScorer(args.package, args.k, args.reservoir, args.refit_every)
+    if args.scan:
+        import sqlirunner
+        batches = batched(sqlirunner.iter_runs(sqlirunner.load_targets(sqlirunner.TARGETS_CSV),
+                                               sqlirunner.load_payloads(sqlirunner.PAYLOADS_TXT)), args.batch_size)
+    else:
+        batches = pd.read_csv(args.raw_csv, chunksize=args.batch_size)
+    for batch in batches:
+        if scorer.score_raw(batch) is not None:
+            scorer.write_top(args.out)
+    scorer.finish()
+    scorer.write_top(args.out)
+    print(f"Scored {scorer.seen} runs ({scorer.refits} model fits); top {args.k} in {args.out}")
+
+
+if __name__ == '__main__':
+    main()
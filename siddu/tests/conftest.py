@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+BENIGN = ["hello world", "my order 12", "contact page", "john doe"]
+XSS = ["<script>alert(1)</script>", "<img src=x onerror=alert(1)>", "\"><svg onload=alert(1)>"]
+
+
+@pytest.fixture
+def xss_corpus():
+    """corpus(n, start=0): text,label frame alternating benign (0) and XSS (1) rows, numbered from start."""
+    pd = pytest.importorskip("pandas")
+
+    def corpus(n, start=0):
+        index = range(start, start + n)
+        texts = [(XSS[i % len(XSS)] if i % 2 else BENIGN[i % len(BENIGN)]) + f" {i}" for i in index]
+        return pd.DataFrame({"text": texts, "label": [i % 2 for i in index]})
+
+    return corpus
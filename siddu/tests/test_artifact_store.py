@@ -0,0 +1,85 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("joblib")
+
+from artifact_store import ArtifactStore  # noqa: E402
+
+
+def raw_frame(n=4):
+    return pd.DataFrame({
+        "run_id": [f"r{i}" for i in range(n)],
+        "url": ["http://t/?id=1"] * n,
+        "method": ["GET"] * n,
+        "param": ["id"] * n,
+        "payload": [f"p{i}" for i in range(n)],
+        "status": ["200"] * n,
+        "resp_len": [100 + i for i in range(n)],
+        "resp_time": [0.1 * i for i in range(n)],
+        "sql_error_flag": [i % 2 for i in range(n)],
+        "resp_snippet": ["x"] * n,
+    })
+
+
+def test_put_applies_schema_and_reads_selected_columns(tmp_path):
+    store = ArtifactStore(str(tmp_path / "a.sqlite"))
+    run = store.start_run()
+    store.put("raw", raw_frame(), run)
+
+    df = store.get("raw", run, columns=["payload", "status"], where="sql_error_flag = ?", params=(1,))
+    assert list(df.columns) == ["payload", "status"]
+    assert df["payload"].tolist() == ["p1", "p3"]
+    assert df["status"].dtype.kind == "i"
+
+
+def test_missing_schema_column_is_rejected(tmp_path):
+    store = ArtifactStore(str(tmp_path / "a.sqlite"))
+    with pytest.raises(ValueError):
+        store.put("raw", raw_frame().drop(columns=["payload"]), "run")
+
+
+def test_unchanged_stage_is_served_from_cache(tmp_path):
+    store = ArtifactStore(str(tmp_path / "a.sqlite"))
+    calls = []
+
+    def double(factor):
+        calls.append(factor)
+        df = store.get("raw", run)
+        return df.assign(resp_len=df["resp_len"] * factor)
+
+    for run in ("run1", "run2"):
+        store.put("raw", raw_frame(), run)
+        store.run_stage("doubled", double, run, inputs=["raw"], params={"factor": 2})
+    assert calls == [2]
+    assert store.info("doubled", "run2")["content_hash"] == store.info("doubled", "run1")["content_hash"]
+
+    run = "run3"
+    store.put("raw", raw_frame(5), run)
+    assert store.run_stage("doubled", double, run, inputs=["raw"], params={"factor": 2})
+    assert store.get("doubled", run)["resp_len"].tolist() == [200, 202, 204, 206, 208]
+
+
+def test_blob_roundtrip(tmp_path):
+    store = ArtifactStore(str(tmp_path / "a.sqlite"))
+    store.put_blob("model", {"feature_columns": ["a", "b"]}, "run1")
+    assert store.get_blob("model")["feature_columns"] == ["a", "b"]
+
+
+def test_pipeline_model_matches_standalone_trainmodel(tmp_path):
+    pytest.importorskip("sklearn")
+    import feature_builder
+    import trainmodel
+    from benchmark_feature_builder import synthetic_runs
+    from pipeline import run_pipeline
+
+    raw_csv = tmp_path / "raw.csv"
+    synthetic_runs(600, seed=5).to_csv(raw_csv, index=False)
+    store = ArtifactStore(str(tmp_path / "a.sqlite"))
+    run_id = store.start_run()
+    run_pipeline(store, run_id, str(raw_csv))
+
+    standalone = trainmodel.train(trainmodel.add_heuristic_label(feature_builder.build_features(pd.read_csv(raw_csv))))
+    package = store.get_blob("model", run_id)
+    assert package["feature_columns"] == standalone["feature_columns"]
+    assert {"status", "seq_ratio"} <= set(package["feature_columns"])
+    assert any(c.startswith("payload_type") for c in package["feature_columns"])
@@ -0,0 +1,60 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+import feature_builder  # noqa: E402
+from benchmark_feature_builder import legacy_build_features, synthetic_runs  # noqa: E402
+
+
+def runs(rows):
+    """rows: (url, payload, resp_len) tuples on one method/param."""
+    return pd.DataFrame({
+        "url": [u for u, _, _ in rows], "method": "GET", "param": "id",
+        "payload": [p for _, p, _ in rows], "resp_len": [n for _, _, n in rows],
+    })
+
+
+def test_baseline_is_first_benign_run_else_smallest_response():
+    df = runs([
+        ("a", "' OR 1=1", 50),   # 0: smaller, but not benign
+        ("a", "1", 300),         # 1: first benign run of a
+        ("b", "' --", 90),       # 2
+        ("a", "0", 100),         # 3: benign, but after 1
+        ("b", "' UNION", 40),    # 4: smallest of b (no benign run)
+        ("b", "'", 40),          # 5: same length, later
+        ("c", None, 500),        # 6: missing payload counts as benign ('')
+        ("c", "'", 10),          # 7
+    ])
+    assert feature_builder.build_baselines(df).tolist() == [1, 1, 4, 1, 4, 4, 6, 6]
+
+
+def legacy_payload_type(payload):
+    """The old per-row detect_payload_type."""
+    p = payload.lower()
+    if 'sleep' in p:
+        return 'time'
+    if 'union' in p:
+        return 'union'
+    if '--' in p or '/*' in p:
+        return 'comment'
+    if "'" in p or '"' in p:
+        return 'quote'
+    return 'normal'
+
+
+def test_len_diff_and_baseline_len_match_the_legacy_rows():
+    df = synthetic_runs(3000, payloads_per_group=30, seed=5).sample(frac=1, random_state=1).reset_index(drop=True)
+    new = feature_builder.build_features(df, workers=1)
+    legacy = legacy_build_features(df)
+    assert new["len_diff"].tolist() == legacy["len_diff"].tolist()
+    assert (new["baseline_len"] == df["resp_len"] - legacy["len_diff"]).all()
+    assert new["payload_type"].tolist() == [legacy_payload_type(p) for p in df["payload"]]
+
+
+def test_parallel_output_equals_serial_output(monkeypatch):
+    df = synthetic_runs(4000, payloads_per_group=40, seed=2).sample(frac=1, random_state=3).reset_index(drop=True)
+    monkeypatch.setattr(feature_builder, "PARALLEL_MIN_ROWS", 0)
+    serial = feature_builder.build_features(df, workers=1)
+    parallel = feature_builder.build_features(df, workers=2, chunk_rows=500)
+    pd.testing.assert_frame_equal(parallel, serial)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pd = pytest.importorskip("pandas")
+
+from sklearn.datasets import make_classification  # noqa: E402
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+
+from forest_engine import CompactForest, export_forest  # noqa: E402
+
+
+def fitted_forest(n_classes=2, **params):
+    X, y = make_classification(n_samples=600, n_features=9, n_informative=5,
+                               n_classes=n_classes, random_state=0)
+    clf = RandomForestClassifier(random_state=0, **params).fit(X, y)
+    return clf, X
+
+
+def roundtrip(clf, tmp_path, **kwargs):
+    return CompactForest.load(export_forest(clf, str(tmp_path / "model.forest"), **kwargs))
+
+
+def test_predict_proba_matches_sklearn_exactly(tmp_path):
+    clf, X = fitted_forest(n_estimators=200, max_depth=12)
+    forest = roundtrip(clf, tmp_path)
+    np.testing.assert_array_equal(forest.predict_proba(X), clf.predict_proba(X))
+    np.testing.assert_array_equal(forest.predict(X), clf.predict(X))
+
+
+def test_unbounded_depth_and_multiclass(tmp_path):
+    clf, X = fitted_forest(n_classes=3, n_estimators=25)
+    forest = roundtrip(clf, tmp_path)
+    np.testing.assert_array_equal(forest.predict_proba(X), clf.predict_proba(X))
+
+
+def test_threshold_ties_follow_sklearn(tmp_path):
+    # values exactly on a split threshold go left, including after float32 rounding
+    rng = np.random.default_rng(1)
+    X = rng.integers(0, 4, size=(300, 3)).astype(float) / 3
+    y = (X[:, 0] + X[:, 1] > 0.9).astype(int)
+    clf = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    forest = roundtrip(clf, tmp_path)
+    np.testing.assert_array_equal(forest.predict_proba(X), clf.predict_proba(X))
+
+
+def test_single_row_and_dataframe_column_order(tmp_path):
+    clf, X = fitted_forest(n_estimators=20)
+    columns = [f"f{i}" for i in range(X.shape[1])]
+    clf.fit(pd.DataFrame(X, columns=columns), clf.predict(X))
+    forest = roundtrip(clf, tmp_path)
+
+    shuffled = pd.DataFrame(X, columns=columns)[columns[::-1]]
+    np.testing.assert_array_equal(forest.predict_proba(shuffled),
+                                  clf.predict_proba(pd.DataFrame(X, columns=columns)))
+    np.testing.assert_array_equal(forest.predict_proba(X[0]), clf.predict_proba(pd.DataFrame(X[:1], columns=columns)))
+
+
+def test_wrong_feature_count_is_rejected(tmp_path):
+    clf, X = fitted_forest(n_estimators=5)
+    forest = roundtrip(clf, tmp_path)
+    with pytest.raises(ValueError):
+        forest.predict_proba(X[:, :4])
+
+
+def test_scoring_service_serves_exported_forest(tmp_path):
+    from scoring_service import ModelEntry
+
+    clf, X = fitted_forest(n_estimators=20)
+    columns = [f"f{i}" for i in range(X.shape[1])]
+    path = export_forest(clf, str(tmp_path / "model.forest"), feature_columns=columns)
+    rows = pd.DataFrame(X, columns=columns).to_dict("records")
+    np.testing.assert_array_equal(ModelEntry(path).predict_proba(rows), clf.predict_proba(X)[:, 1])
@@ -0,0 +1,62 @@
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("pandas")
+
+from incremental_train import OnlineModel, train_from_csv  # noqa: E402
+
+
+def test_window_only_holds_rows_scored_before_training():
+    model = OnlineModel("xss", window=50)
+    model.update(["hello", "<script>alert(1)</script>"], [0, 1])
+    assert model.metrics()["window"] == 0
+    model.update(["bye", "<svg onload=alert(1)>"], [0, 1])
+    assert model.metrics()["window"] == 2
+    assert model.seen == 4
+
+
+def test_checkpoint_resumes_from_appended_rows(tmp_path, xss_corpus):
+    csv, checkpoint = tmp_path / "xss.csv", str(tmp_path / "ck.joblib")
+    xss_corpus(30).to_csv(csv, index=False)
+
+    model = OnlineModel.load_or_create(checkpoint, "xss")
+    train_from_csv(model, str(csv), checkpoint, batch_size=10)
+    assert model.seen == 30
+
+    xss_corpus(12, start=30).to_csv(csv, mode="a", header=False, index=False)
+    resumed = OnlineModel.load_or_create(checkpoint, "xss")
+    train_from_csv(resumed, str(csv), checkpoint, batch_size=10)
+    assert resumed.seen == 42
+    assert resumed.batches == 5
+    assert resumed.predict_proba(["<script>alert(7)</script>"])[0] > resumed.predict_proba(["hello world"])[0]
+
+
+def test_rewritten_csv_is_consumed_again_from_the_start(tmp_path, xss_corpus):
+    csv, checkpoint = tmp_path / "xss.csv", str(tmp_path / "ck.joblib")
+    xss_corpus(30).to_csv(csv, index=False)
+    model = OnlineModel.load_or_create(checkpoint, "xss")
+    train_from_csv(model, str(csv), checkpoint, batch_size=10)
+
+    # a new scan rewrites the file with the same number of rows, then with more
+    xss_corpus(30, start=100).to_csv(csv, index=False)
+    train_from_csv(model, str(csv), checkpoint, batch_size=10)
+    assert model.seen == 60
+    xss_corpus(40, start=200).to_csv(csv, index=False)
+    train_from_csv(model, str(csv), checkpoint, batch_size=10)
+    assert model.seen == 100
+
+    train_from_csv(model, str(csv), checkpoint, batch_size=10)
+    assert model.seen == 100
+
+
+def test_sqli_rows_get_heuristic_labels(tmp_path):
+    import feature_builder
+    from benchmark_feature_builder import synthetic_runs
+
+    checkpoint, csv = str(tmp_path / "sqli.joblib"), tmp_path / "features.csv"
+    # synthetic runs have random sql_error_flag, so every batch holds both heuristic classes
+    feature_builder.build_features(synthetic_runs(60, seed=1)).to_csv(csv, index=False)
+    model = OnlineModel.load_or_create(checkpoint, "sqli", algo="nb")
+    train_from_csv(model, str(csv), checkpoint, batch_size=20)
+    assert model.seen == 60
+    assert model.metrics()["window"] == 40
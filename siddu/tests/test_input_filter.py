@@ -0,0 +1,59 @@
+import re
+
+from input_filter import SUSPICIOUS_TOKENS, InputFilter, is_suspicious
+
+
+def legacy_is_suspicious(text):
+    if not text:
+        return False
+    t = text.lower()
+    if any(tok in t for tok in SUSPICIOUS_TOKENS):
+        return True
+    if sum(1 for ch in t if ch in "<>\"'") >= 4:
+        return True
+    return re.search(r"<\s*script\b|on\w+\s*=|javascript\s*:", t) is not None
+
+
+class CountingScorer:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def score(self, name, texts):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("model unavailable")
+        return [0.9 if "<" in t else 0.1 for t in texts]
+
+
+def test_heuristic_matches_legacy_detector():
+    samples = ["", "hello", "<SCRIPT>alert(1)</SCRIPT>", "< script src=x>", "x OnMouseOver = y", "JavaScript :void",
+               "a'b'c'd", "<b>\"x\"", "document.COOKIE", "plain <i>text", "onion=1", "it's fine"]
+    assert [is_suspicious(s) for s in samples] == [legacy_is_suspicious(s) for s in samples]
+
+
+def test_repeated_inputs_are_served_from_cache():
+    scorer = CountingScorer()
+    f = InputFilter(scorer)
+    first = f.check_many(["<b>x</b>", "hi", "<b>x</b>"])
+    assert scorer.calls == [["<b>x</b>", "hi"]]
+    assert [r["blocked"] for r in first] == [True, False, True]
+    again = f.check("hi")
+    assert again["cached"] and again["score"] == 0.1
+    assert len(scorer.calls) == 1
+    assert f.cache.stats()["hits"] == 1
+
+
+def test_cache_is_bounded():
+    f = InputFilter(CountingScorer(), cache_size=2)
+    f.check_many(["a", "b", "c"])
+    assert f.cache.stats()["size"] == 2
+    assert not f.check("a")["cached"]
+
+
+def test_scoring_errors_fall_back_to_heuristic_uncached():
+    f = InputFilter(CountingScorer(fail=True))
+    result = f.check("<svg onload=alert(1)>")
+    assert result == {"score": None, "blocked": True, "source": "heuristic", "cached": False}
+    assert f.cache.stats()["size"] == 0
+    assert f.stats()["filter"]["requests"] == 1
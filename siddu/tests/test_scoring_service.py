@@ -0,0 +1,77 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+joblib = pytest.importorskip("joblib")
+pytest.importorskip("sklearn")
+
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+
+from scoring_service import MicroBatcher, ScoringService  # noqa: E402
+from train_xss import make_xss_vectorizer  # noqa: E402
+
+
+class FakeEntry:
+    """predict_proba = len(text) / 100; fails on any batch containing "bad"."""
+
+    def __init__(self):
+        self.calls = []
+
+    def predict_proba(self, inputs):
+        self.calls.append(list(inputs))
+        if "bad" in inputs:
+            raise ValueError("malformed input")
+        return np.array([len(t) / 100 for t in inputs])
+
+
+def submit_together(requests):
+    """A batcher that waits until every row of `requests` has arrived, so they form one batch."""
+    batcher = MicroBatcher(FakeEntry(), max_rows=sum(map(len, requests)), max_wait=5.0)
+    return batcher, [batcher.submit(r) for r in requests]
+
+
+def test_concurrent_requests_are_coalesced_into_one_call():
+    batcher, futures = submit_together([["a"], ["bb", "ccc"], ["dddd"]])
+    assert [f.result(5) for f in futures] == [[0.01], [0.02, 0.03], [0.04]]
+    assert batcher.entry.calls == [["a", "bb", "ccc", "dddd"]]
+    batcher.close()
+
+
+def test_a_failing_request_does_not_fail_the_rest_of_its_batch():
+    batcher, (good, bad, other) = submit_together([["a"], ["bad"], ["cc"]])
+    assert good.result(5) == [0.01]
+    assert other.result(5) == [0.02]
+    with pytest.raises(ValueError):
+        bad.result(5)
+    # one failed batch call, then each request on its own
+    assert batcher.entry.calls == [["a", "bad", "cc"], ["a"], ["bad"], ["cc"]]
+    batcher.close()
+
+
+def test_metrics_count_requests_rows_batches_and_errors():
+    batcher, futures = submit_together([["a", "b"], ["bad"]])
+    for f in futures:
+        f.exception(5)
+    batcher.close()
+
+    snap = batcher.metrics.snapshot()
+    assert snap["requests"] == 2
+    assert snap["rows"] == 3
+    assert snap["errors"] == 1
+    assert snap["batches"] == 3
+    assert snap["latency_ms"]["max"] >= snap["latency_ms"]["p50"] >= 0
+
+
+def test_service_scores_a_text_model_package_like_the_model(tmp_path):
+    texts = ["<script>alert(1)</script>", "hello world", "<img onerror=x>", "my order"]
+    vectorizer = make_xss_vectorizer(2 ** 10)
+    model = LogisticRegression().fit(vectorizer.transform(texts), [1, 0, 1, 0])
+    path = tmp_path / "xss.joblib"
+    joblib.dump({"model": model, "vectorizer": vectorizer}, path)
+
+    service = ScoringService({"xss": str(path)})
+    try:
+        expected = model.predict_proba(vectorizer.transform(texts))[:, 1]
+        assert np.allclose(service.score("xss", texts), expected)
+        assert service.metrics()["xss"]["requests"] == 1
+    finally:
+        service.close()
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("sklearn")
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+joblib = pytest.importorskip("joblib")
+
+import feature_builder  # noqa: E402
+from benchmark_feature_builder import synthetic_runs  # noqa: E402
+from streaming_anomaly import StreamingAnomalyScorer, StreamingFeatures  # noqa: E402
+from unsupervisedisolation import score_anomalies  # noqa: E402
+
+
+def test_streaming_features_match_batch_features_when_baselines_come_first():
+    raw = synthetic_runs(600, payloads_per_group=20, seed=3)
+    raw = raw.sort_values('payload', key=lambda p: ~p.isin(feature_builder.BENIGN_PAYLOADS), kind='stable')
+    raw = raw.reset_index(drop=True)
+    expected = feature_builder.build_features(raw)
+    stream = StreamingFeatures()
+    got = pd.concat([stream.transform(raw.iloc[i:i + 50]) for i in range(0, len(raw), 50)], ignore_index=True)
+    for col in ['baseline_len', 'len_diff', 'seq_ratio', 'payload_type']:
+        assert (got[col].to_numpy() == expected[col].to_numpy()).all(), col
+
+
+def test_top_k_matches_batch_scoring_with_a_fixed_model(tmp_path):
+    raw = synthetic_runs(1000, seed=1)
+    feats = feature_builder.build_features(raw)
+    _, package = score_anomalies(feats)
+    path = tmp_path / "isof.joblib"
+    joblib.dump(package, path)
+
+    scorer = StreamingAnomalyScorer(str(path), k=10, refit_every=0, save=False)
+    for i in range(0, len(feats), 64):
+        scorer.score_features(feats.iloc[i:i + 64])
+    expected, _ = score_anomalies(feats, top=10)
+    assert scorer.top()['anomaly_score'].round(10).tolist() == expected['anomaly_score'].round(10).tolist()
+
+
+def test_background_refit_uses_a_bounded_reservoir_and_saves_the_package(tmp_path):
+    path = tmp_path / "isof.joblib"
+    scorer = StreamingAnomalyScorer(str(path), k=5, reservoir_size=300, refit_every=500, min_fit_rows=100)
+    raw = synthetic_runs(1200, seed=2)
+    assert scorer.score_raw(raw.iloc[:50]) is None
+    for i in range(50, len(raw), 100):
+        scorer.score_raw(raw.iloc[i:i + 100])
+    scorer.wait()
+    assert scorer.seen == 1200 and len(scorer.reservoir) == 300
+    assert scorer.refits >= 2
+    assert len(scorer.top()) == 5
+    assert set(joblib.load(path)) == {'isof', 'feature_cols', 'fill'}
+
+
+def test_short_stream_is_scored_on_finish(tmp_path):
+    scorer = StreamingAnomalyScorer(str(tmp_path / "isof.joblib"), k=5, min_fit_rows=64)
+    assert scorer.score_raw(synthetic_runs(12, seed=4)) is None
+    scorer.finish()
+    assert len(scorer.top()) == 5
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("pandas")
+
+from train_xss import iter_chunks, make_xss_vectorizer, train  # noqa: E402
+
+
+def test_vectorizer_dimension_does_not_depend_on_corpus(xss_corpus):
+    small = make_xss_vectorizer(2 ** 12).transform(["a"])
+    large = make_xss_vectorizer(2 ** 12).transform(xss_corpus(700)["text"])
+    assert small.shape[1] == large.shape[1] == 2 ** 12
+
+
+def test_holdout_rows_are_the_same_across_chunk_sizes(tmp_path, xss_corpus):
+    path = tmp_path / "xss.csv"
+    xss_corpus(103).to_csv(path, index=False)
+    held = lambda size: [t for _, _, texts, _ in iter_chunks(path, size, 5) for t in texts]  # noqa: E731
+    assert held(10) == held(1000)
+    assert len(held(10)) == 21
+
+
+def test_streaming_training_separates_classes(tmp_path, xss_corpus):
+    path = tmp_path / "xss.csv"
+    xss_corpus(400).to_csv(path, index=False)
+    model, vectorizer = train(path, epochs=2, chunk_size=64, n_features=2 ** 14)
+    proba = model.predict_proba(vectorizer.transform(["<script>alert(7)</script>", "hello world 7"]))[:, 1]
+    assert proba[0] > 0.5 > proba[1]
@@ -33,9 +33,10 @@ def preprocess(df, feature_cols):
         X = pd.get_dummies(X, columns=obj_cols, drop_first=True)
     return X
 
-def main():
-    df = pd.read_csv(IN)
-    df = add_heuristic_label(df)
+def train(df):
+    """Returns the {'model', 'feature_columns'} package; df gets heuristic labels if it has none."""
+    if LABEL_COL not in df.columns:
+        df = add_heuristic_label(df.copy())
     # define feature columns we want to use
     feature_cols = ['status','resp_len','resp_time','sql_error_flag','len_diff','seq_ratio','payload_type']
     # if payload_type is present only as object, it will be one-hoted
@@ -56,8 +57,12 @@ def main():
     clf.fit(X_train, y_train)
     print("Test accuracy:", clf.score(X_test, y_test))
     print(classification_report(y_test, clf.predict(X_test)))
-    # Save model + feature list
-    package = {'model': clf, 'feature_columns': X.columns.tolist()}
+    # model + feature list
+    return {'model': clf, 'feature_columns': X.columns.tolist()}
+
+def main():
+    df = add_heuristic_label(pd.read_csv(IN))
+    package = train(df)
     joblib.dump(package, OUT)
     print("Saved model package to", OUT)
 